@@ -4,13 +4,21 @@ Fornece dados agregados de P&L, clientes e bankers
 Wrapper para rodar na raiz com caminhos ajustados
 """
 
-import json
+import glob
+import hmac
 import os
-from typing import Dict, List, Any
-from flask import Flask, jsonify
+import tempfile
+from typing import Any
+from flask import Flask, Response, jsonify, request
+from werkzeug.wsgi import ClosingIterator
 from flask_cors import CORS
 from dotenv import load_dotenv
 
+from dashboard import http_cache, materialize, panels, profiling, serialization, telemetry
+from dashboard.datastore import DataStore, Snapshot
+from dashboard.single_flight import SharedRenders
+from dashboard.stream import StreamSlots, VersionBroadcaster, event_stream, format_event
+
 # Carrega variáveis de ambiente
 load_dotenv()
 
@@ -21,727 +29,395 @@ cors_origins = os.getenv("CORS_ORIGINS", "*").split(",")
 CORS(app, resources={r"/api/*": {"origins": cors_origins}})
 
 # Carregando dados de P&L - ajustar para raiz
+# (caminhos podem ser trocados por variáveis de ambiente, ex.: benchmarks)
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
 DATA_DIR = os.path.join(BASE_DIR, "backend", "data")
-PL_JSON_PATH = os.path.join(DATA_DIR, "PL", "json", "evolucao_pl_diaria.json")
-CLIENTE_PERFIL_PATH = os.path.join(BASE_DIR, "frontend", "data", "cliente_perfil.txt")
-NETINFLOW_PATH = os.path.join(DATA_DIR, "NetInflow", "json", "net_inflow_raw.json")
-
-
-def load_pl_data() -> List[Dict[str, Any]]:
-    """Carrega dados de P&L do arquivo JSON"""
+PL_JSON_PATH = os.getenv(
+    "PL_JSON_PATH", os.path.join(DATA_DIR, "PL", "json", "evolucao_pl_diaria.json")
+)
+CLIENTE_PERFIL_PATH = os.getenv(
+    "CLIENTE_PERFIL_PATH", os.path.join(BASE_DIR, "frontend", "data", "cliente_perfil.txt")
+)
+NETINFLOW_PATH = os.getenv(
+    "NETINFLOW_PATH", os.path.join(DATA_DIR, "NetInflow", "json", "net_inflow_raw.json")
+)
+
+
+# Recarga em segundo plano: intervalo entre verificações dos arquivos e tempo
+# que um arquivo alterado precisa ficar parado antes de ser lido
+DATA_WATCH_INTERVAL = float(os.getenv("DATA_WATCH_INTERVAL", "5"))
+DATA_SETTLE_SECONDS = float(os.getenv("DATA_SETTLE_SECONDS", "2"))
+# Recargas cujas diferenças do P&L ficam guardadas para ?since=
+DATA_DIFF_HISTORY = int(os.getenv("DATA_DIFF_HISTORY", "7"))
+# Estado montado dos dados (.npz + manifesto) para partidas a quente e para
+# ?since= depois de um deploy. Desligado por padrão (vazio): em produção
+# apontar para um diretório que sobreviva aos deploys (ex.: volume)
+WARM_START_DIR = os.getenv("WARM_START_DIR", "")
+
+data_store = DataStore(
+    PL_JSON_PATH,
+    NETINFLOW_PATH,
+    CLIENTE_PERFIL_PATH,
+    settle_seconds=DATA_SETTLE_SECONDS,
+    diff_history=DATA_DIFF_HISTORY,
+    warm_start_dir=WARM_START_DIR or None,
+)
+# Cálculos de respostas compartilhados entre os workers (vazio desliga) e
+# espera máxima pelo cálculo de outro worker antes de calcular localmente
+SINGLE_FLIGHT_DIR = os.getenv(
+    "SINGLE_FLIGHT_DIR", os.path.join(tempfile.gettempdir(), "dashboard-renders")
+)
+SINGLE_FLIGHT_TIMEOUT = float(os.getenv("SINGLE_FLIGHT_TIMEOUT", "30"))
+if SINGLE_FLIGHT_DIR:
+    panels.shared_renders = SharedRenders(SINGLE_FLIGHT_DIR, SINGLE_FLIGHT_TIMEOUT)
+
+# Snapshot novo chega com índices e respostas padrão já calculados
+data_store.prepare_hooks.append(lambda snap: panels.warm_up(panels.get_context(snap)))
+
+# /api/stream: keepalive e duração máxima de cada conexão SSE
+STREAM_KEEPALIVE_SECONDS = float(os.getenv("STREAM_KEEPALIVE_SECONDS", "15"))
+STREAM_MAX_SECONDS = float(os.getenv("STREAM_MAX_SECONDS", "300"))
+# Conexões SSE simultâneas por processo: cada uma ocupa uma thread, então o
+# padrão deixa metade das threads do worker livre para a API
+STREAM_MAX_CONNECTIONS = int(
+    os.getenv("STREAM_MAX_CONNECTIONS", str(int(os.getenv("GUNICORN_THREADS", "4")) // 2))
+)
+# Intervalo sugerido aos clientes recusados para consultar /api/health
+STREAM_POLL_SECONDS = int(os.getenv("STREAM_POLL_SECONDS", "60"))
+
+stream_slots = StreamSlots(STREAM_MAX_CONNECTIONS)
+
+broadcaster = VersionBroadcaster()
+
+
+def publish_version(snapshot: Snapshot) -> None:
+    """Serializa uma única vez o evento da versão nova para todos os clientes"""
+    event = {"version": snapshot.version, "loadedAt": snapshot.loaded_at}
+    payload, status = panels.run_panel("metrics", panels.get_context(snapshot))
+    with_metrics = dict(event, metrics=payload.get("metrics") if status == 200 else None)
+    broadcaster.publish(
+        snapshot.version,
+        format_event("version", snapshot.version, serialization.dumps(event)),
+        format_event("version", snapshot.version, serialization.dumps(with_metrics)),
+    )
+
+
+data_store.publish_hooks.append(publish_version)
+data_store.publish_hooks.append(
+    lambda snap: telemetry.DATA_LOAD_SECONDS.observe(data_store.last_load_seconds)
+)
+
+# Token exigido por /api/metrics/internal; vazio, a rota só atende conexões
+# locais (LOCAL_ADDRS). Com um proxy reverso na mesma máquina toda conexão é
+# local: nesse caso configure o token
+INTERNAL_METRICS_TOKEN = os.getenv("INTERNAL_METRICS_TOKEN", "")
+LOCAL_ADDRS = {"127.0.0.1", "::1"}
+
+
+telemetry.REGISTRY.register(
+    telemetry.Gauge(
+        "dashboard_data_version_info",
+        "Versão do snapshot de dados em uso (valor sempre 1)",
+        lambda: [((data_store.status()["version"] or "",), 1)],
+        ("version",),
+    )
+)
+telemetry.REGISTRY.register(
+    telemetry.Gauge(
+        "dashboard_data_loaded_timestamp_seconds",
+        "Momento da última carga do snapshot de dados",
+        lambda: [((), data_store.loaded_at or 0)],
+    )
+)
+telemetry.REGISTRY.register(
+    telemetry.CounterFunc(
+        "dashboard_data_reloads_total",
+        "Snapshots de dados montados por este processo",
+        lambda: [((), data_store.reload_count)],
+    )
+)
+telemetry.REGISTRY.register(
+    telemetry.Gauge(
+        "dashboard_data_file_error",
+        "1 se a última leitura do arquivo falhou",
+        lambda: [((name,), int(f.error is not None)) for name, f in data_store.files.items()],
+        ("file",),
+    )
+)
+telemetry.REGISTRY.register(
+    telemetry.CounterFunc(
+        "dashboard_cache_requests_total",
+        "Consultas ao cache de respostas renderizadas dos painéis",
+        lambda: list(zip((("hit",), ("miss",), ("coalesced",)), panels.cache_stats())),
+        ("result",),
+    )
+)
+telemetry.REGISTRY.register(
+    telemetry.Gauge(
+        "dashboard_stream_connections",
+        "Conexões abertas no /api/stream",
+        lambda: [((), stream_slots.active)],
+    )
+)
+telemetry.REGISTRY.register(
+    telemetry.CounterFunc(
+        "dashboard_stream_rejected_total",
+        "Conexões no /api/stream recusadas por limite (503)",
+        lambda: [((), stream_slots.rejected)],
+    )
+)
+telemetry.REGISTRY.register(
+    telemetry.CounterFunc(
+        "dashboard_cache_shared_total",
+        "Respostas lidas de outro worker ou calculadas após esperar demais",
+        lambda: (
+            [
+                (("shared",), panels.shared_renders.shared_hits),
+                (("timeout",), panels.shared_renders.timeouts),
+            ]
+            if panels.shared_renders is not None
+            else []
+        ),
+        ("result",),
+    )
+)
+
+
+def start_background_reload() -> None:
+    """
+    Liga o watcher de dados no processo que recarrega: o próprio servidor
+    (ASGI, desenvolvimento) ou o master do gunicorn, que troca os workers
+    """
+    if DATA_WATCH_INTERVAL > 0:
+        data_store.start_watcher(DATA_WATCH_INTERVAL)
+
+
+# Instrumentação registrada antes do http_cache para medir também os 304
+telemetry.init_app(app, skip_paths={"/api/metrics/internal"})
+
+# ?profile=1 e amostragem de perfis (só registrado se configurado)
+profiling.init_app(app)
+
+# Código e configuração que mudam as respostas: um deploy sem dados novos
+# também invalida ETags e respostas pré-renderizadas
+BUILD_FINGERPRINT = http_cache.build_fingerprint(
+    [os.path.abspath(__file__)] + glob.glob(os.path.join(BASE_DIR, "dashboard", "*.py"))
+)
+
+
+def response_version() -> str:
+    """Versão das respostas da API: versão dos dados + versão do build"""
+    return f"{data_store.snapshot().version}-{BUILD_FINGERPRINT}"
+
+
+# ETag por versão das respostas; o navegador revalida a cada uso (no-cache)
+http_cache.init_app(app, response_version)
+
+# Respostas pré-renderizadas no build do deploy (python -m dashboard.materialize)
+MATERIALIZED_DIR = os.getenv("MATERIALIZED_DIR", os.path.join(DATA_DIR, "materialized"))
+materialize.init_app(app, MATERIALIZED_DIR, response_version)
+
+
+def _json_response(body: bytes, status: int = 200) -> Response:
+    return Response(body, status=status, mimetype="application/json")
+
+
+def _bad_request(message: str, **extra: Any) -> Response:
+    """400 no formato de erro da API; extra entra no corpo (ex.: opções válidas)"""
+    body = serialization.dumps({"success": False, "error": message, **extra}) + b"\n"
+    return _json_response(body, 400)
+
+
+def panel_response(name: str) -> Response:
+    """
+    Resposta de uma rota /api a partir do painel correspondente
+
+    Query params (séries temporais):
+        start, end: janela de datas YYYY-MM-DD (inclusivas)
+        as_of: considera apenas dados até esta data
+        granularity: day, week, month ou quarter
+        points: máximo de pontos por série (evolução do P&L)
+        format: json, columnar ou binary (evolução do P&L)
+        since: versão dos dados ou data; só os pontos novos ou alterados
+            desde ela (evolução de clientes e bankers)
+    """
     try:
-        with open(PL_JSON_PATH, "r") as f:
-            return json.load(f)
-    except FileNotFoundError:
-        print(f"Erro: arquivo não encontrado em {PL_JSON_PATH}")
-        return []
-
-
-def load_cliente_emails() -> Dict[str, str]:
-    """Carrega emails dos clientes do arquivo cliente_perfil.txt"""
-    emails = {}
-    try:
-        with open(CLIENTE_PERFIL_PATH, "r", encoding="utf-8") as f:
-            lines = f.readlines()
-            # Pula o header (primeira linha)
-            for line in lines[1:]:
-                parts = [p.strip() for p in line.split(",")]
-                if len(parts) >= 3:
-                    nome = parts[0]
-                    email = parts[2]
-                    emails[nome] = email
-    except Exception as e:
-        print(f"Erro ao carregar cliente_perfil.txt: {e}")
-    return emails
-
-
-def load_cliente_bankers() -> Dict[str, str]:
-    """Carrega bankers dos clientes do arquivo cliente_perfil.txt"""
-    bankers = {}
-    try:
-        with open(CLIENTE_PERFIL_PATH, "r", encoding="utf-8") as f:
-            lines = f.readlines()
-            # Pula o header (primeira linha)
-            for line in lines[1:]:
-                parts = [p.strip() for p in line.split(",")]
-                if len(parts) >= 2:
-                    nome = parts[0]
-                    banker = parts[1] if len(parts) > 1 else "Sem Banker"
-                    bankers[nome] = banker
-    except Exception as e:
-        print(f"Erro ao carregar cliente_perfil.txt: {e}")
-    return bankers
-
-
-def aggregate_total_pl(data: List[Dict[str, Any]]) -> Dict[str, float]:
-    """Agrega P&L total de todos os clientes por data"""
-    pl_total = {}
-    for cliente in data:
-        for key, value in cliente.items():
-            if key in ["Cliente", "CPF", "Banker"]:
-                continue
-            if (
-                isinstance(key, str)
-                and len(key) == 10
-                and key[4] == "-"
-                and key[7] == "-"
-            ):
-                if value is not None:
-                    if key not in pl_total:
-                        pl_total[key] = 0
-                    try:
-                        pl_total[key] += float(value)
-                    except (ValueError, TypeError):
-                        pass
-    return pl_total
+        params = panels.PanelParams.from_args(request.args)
+    except ValueError as e:
+        return _bad_request(str(e))
+    ctx = panels.get_context(data_store.snapshot())
+    body, status = panels.render_panel(name, ctx, params, cached=not profiling.is_profiling())
+    if params.format == "binary" and name in panels.SERIES_PANELS and status == 200:
+        return Response(body, status=status, mimetype=serialization.BINARY_MIMETYPE)
+    return _json_response(body, status)
 
 
 @app.route("/api/health", methods=["GET"])
 def health_check():
-    """Health check endpoint"""
-    return jsonify({"status": "ok"})
+    """Health check endpoint (ready: dados carregados e caches pré-calculados)"""
+    status = data_store.status()
+    status["build"] = BUILD_FINGERPRINT
+    return jsonify({"status": "ok", "ready": status["ready"], "data": status})
+
+
+@app.route("/api/metrics/internal", methods=["GET"])
+def internal_metrics():
+    """Métricas do processo no formato texto do Prometheus"""
+    if INTERNAL_METRICS_TOKEN:
+        auth = request.headers.get("Authorization", "")
+        token = auth[7:] if auth.startswith("Bearer ") else request.args.get("token", "")
+        if not hmac.compare_digest(token, INTERNAL_METRICS_TOKEN):
+            return _json_response(
+                serialization.dumps({"success": False, "error": "Unauthorized"}) + b"\n", 401
+            )
+    elif request.remote_addr not in LOCAL_ADDRS:
+        return _json_response(
+            serialization.dumps(
+                {"success": False, "error": "Forbidden: set INTERNAL_METRICS_TOKEN"}
+            )
+            + b"\n",
+            403,
+        )
+    return Response(telemetry.REGISTRY.render(), content_type=telemetry.CONTENT_TYPE)
+
+
+@app.route("/api/stream", methods=["GET"])
+def stream():
+    """
+    Server-Sent Events: um evento "version" a cada snapshot novo dos dados
+
+    Com STREAM_MAX_CONNECTIONS conexões já abertas neste processo responde 503
+    com Retry-After e o intervalo de polling sugerido (campo "poll", em
+    segundos): o cliente passa a consultar a versão em /api/health.
+
+    Query params:
+        metrics=1: inclui as métricas principais (mesmo payload de /api/metrics)
+    """
+    release = stream_slots.acquire()
+    if release is None:
+        response = _json_response(
+            serialization.dumps(
+                {"success": False, "error": "Too many open streams", "poll": STREAM_POLL_SECONDS}
+            )
+            + b"\n",
+            503,
+        )
+        response.headers["Retry-After"] = str(STREAM_POLL_SECONDS)
+        return response
+    include_metrics = request.args.get("metrics", "").lower() in ("1", "true")
+    body = event_stream(
+        broadcaster,
+        include_metrics,
+        request.headers.get("Last-Event-ID"),
+        poll=data_store.snapshot,
+        keepalive_seconds=STREAM_KEEPALIVE_SECONDS,
+        max_seconds=STREAM_MAX_SECONDS,
+    )
+    return Response(
+        # A vaga é liberada quando o servidor fecha a resposta (fim ou desconexão)
+        ClosingIterator(body, release),
+        mimetype="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
 
 
 @app.route("/api/pl/total", methods=["GET"])
 def get_total_pl():
     """Retorna P&L total agregado de todos os clientes"""
-    try:
-        data = load_pl_data()
-        pl_total = aggregate_total_pl(data)
-        result = [
-            {"date": date, "value": round(value, 2)}
-            for date, value in sorted(pl_total.items())
-            if date >= "2025-12-01"
-        ]
-        return jsonify(
-            {
-                "success": True,
-                "data": result,
-                "startDate": result[0]["date"] if result else None,
-                "endDate": result[-1]["date"] if result else None,
-                "totalRecords": len(result),
-            }
-        )
-    except Exception as e:
-        print(f"Erro em get_total_pl: {e}")
-        return jsonify({"success": False, "error": str(e)}), 500
+    return panel_response("pl_total")
 
 
 @app.route("/api/pl/stats", methods=["GET"])
 def get_pl_stats():
     """Retorna estatísticas do P&L total"""
-    try:
-        data = load_pl_data()
-        pl_total = aggregate_total_pl(data)
-        if not pl_total:
-            return jsonify({"success": False, "error": "No data available"}), 404
-        values = list(pl_total.values())
-        return jsonify(
-            {
-                "success": True,
-                "stats": {
-                    "max": round(max(values), 2),
-                    "min": round(min(values), 2),
-                    "average": round(sum(values) / len(values), 2),
-                    "totalClients": len(data),
-                    "totalDays": len(pl_total),
-                },
-            }
-        )
-    except Exception as e:
-        return jsonify({"success": False, "error": str(e)}), 500
+    return panel_response("pl_stats")
 
 
 @app.route("/api/clients/pl", methods=["GET"])
 def get_clients_pl():
     """Retorna P&L de cada cliente na última data disponível"""
-    try:
-        data = load_pl_data()
-        emails = load_cliente_emails()
-        if not data:
-            return jsonify({"success": False, "error": "No client data available"}), 404
-
-        all_dates = set()
-        for cliente in data:
-            for key in cliente.keys():
-                if (
-                    key not in ["Cliente", "CPF", "Banker"]
-                    and len(key) == 10
-                    and key[4] == "-"
-                    and key[7] == "-"
-                ):
-                    all_dates.add(key)
-
-        if not all_dates:
-            return jsonify({"success": False, "error": "No dates found"}), 404
-
-        last_date = sorted(all_dates)[-1]
-        clients_data = []
-        for cliente in data:
-            if last_date in cliente:
-                pl_value = (
-                    float(cliente[last_date]) if cliente[last_date] is not None else 0
-                )
-                clients_data.append(
-                    {
-                        "nome": cliente.get("Cliente", ""),
-                        "cpf": cliente.get("CPF", ""),
-                        "banker": cliente.get("Banker", ""),
-                        "email": emails.get(cliente.get("Cliente", ""), ""),
-                        "pl": round(pl_value, 2),
-                        "data": last_date,
-                    }
-                )
-
-        return jsonify(
-            {
-                "success": True,
-                "data": clients_data,
-                "lastDate": last_date,
-                "totalClients": len(clients_data),
-            }
-        )
-    except Exception as e:
-        return jsonify({"success": False, "error": str(e)}), 500
+    return panel_response("clients_pl")
 
 
 @app.route("/api/clients/evolution", methods=["GET"])
 def get_clients_evolution():
     """Retorna evolução de P&L para cada cliente"""
-    try:
-        data = load_pl_data()
-        emails = load_cliente_emails()
-        if not data:
-            return jsonify({"success": False, "error": "No client data available"}), 404
-
-        all_dates = set()
-        for cliente in data:
-            for key in cliente.keys():
-                if (
-                    key not in ["Cliente", "CPF", "Banker"]
-                    and len(key) == 10
-                    and key[4] == "-"
-                    and key[7] == "-"
-                ):
-                    all_dates.add(key)
-
-        if not all_dates:
-            return jsonify({"success": False, "error": "No dates found"}), 404
-
-        sorted_dates = sorted(all_dates)
-        # Filtrar apenas datas >= 01/12/2025 para exibição nos gráficos
-        display_dates = [d for d in sorted_dates if d >= "2025-12-01"]
-        clients_evolution = []
-
-        for cliente in data:
-            evolution_data = []
-            for date in display_dates:
-                if date in cliente and cliente[date] is not None:
-                    pl_value = float(cliente[date])
-                    evolution_data.append({"date": date, "value": round(pl_value, 2)})
-
-            if evolution_data:
-                clients_evolution.append(
-                    {
-                        "nome": cliente.get("Cliente", ""),
-                        "cpf": cliente.get("CPF", ""),
-                        "banker": cliente.get("Banker", ""),
-                        "email": emails.get(cliente.get("Cliente", ""), ""),
-                        "evolution": evolution_data,
-                        "pl_inicial": evolution_data[0]["value"]
-                        if evolution_data
-                        else 0,
-                        "pl_final": evolution_data[-1]["value"]
-                        if evolution_data
-                        else 0,
-                        "variacao": round(
-                            evolution_data[-1]["value"] - evolution_data[0]["value"], 2
-                        )
-                        if evolution_data
-                        else 0,
-                    }
-                )
-
-        return jsonify(
-            {
-                "success": True,
-                "data": clients_evolution,
-                "totalClientes": len(clients_evolution),
-                "periodoInicio": display_dates[0] if display_dates else None,
-                "periodoFim": display_dates[-1] if display_dates else None,
-            }
-        )
-    except Exception as e:
-        return jsonify({"success": False, "error": str(e)}), 500
+    return panel_response("clients_evolution")
 
 
 @app.route("/api/bankers/evolution", methods=["GET"])
 def get_bankers_evolution():
     """Retorna evolução de P&L para cada banker"""
-    try:
-        data = load_pl_data()
-        if not data:
-            return jsonify({"success": False, "error": "No client data available"}), 404
-
-        all_dates = set()
-        for cliente in data:
-            for key in cliente.keys():
-                if (
-                    key not in ["Cliente", "CPF", "Banker"]
-                    and len(key) == 10
-                    and key[4] == "-"
-                    and key[7] == "-"
-                ):
-                    all_dates.add(key)
-
-        if not all_dates:
-            return jsonify({"success": False, "error": "No dates found"}), 404
-
-        sorted_dates = sorted(all_dates)
-        # Filtrar apenas datas >= 01/12/2025 para exibição nos gráficos
-        display_dates = [d for d in sorted_dates if d >= "2025-12-01"]
-        bankers_data = {}
-
-        for cliente in data:
-            banker = cliente.get("Banker", "Sem Banker")
-            if banker not in bankers_data:
-                bankers_data[banker] = {"evolution": {}, "clientes": []}
-
-            bankers_data[banker]["clientes"].append(cliente.get("Cliente", ""))
-            for date in sorted_dates:
-                if date in cliente and cliente[date] is not None:
-                    if date not in bankers_data[banker]["evolution"]:
-                        bankers_data[banker]["evolution"][date] = 0
-                    bankers_data[banker]["evolution"][date] += float(cliente[date])
-
-        bankers_evolution = []
-        for banker_nome, banker_info in bankers_data.items():
-            evolution_list = []
-            for date in display_dates:
-                if date in banker_info["evolution"]:
-                    evolution_list.append(
-                        {
-                            "date": date,
-                            "value": round(banker_info["evolution"][date], 2),
-                        }
-                    )
-
-            if evolution_list:
-                bankers_evolution.append(
-                    {
-                        "nome": banker_nome,
-                        "clientes_count": len(banker_info["clientes"]),
-                        "evolution": evolution_list,
-                        "pl_inicial": evolution_list[0]["value"]
-                        if evolution_list
-                        else 0,
-                        "pl_final": evolution_list[-1]["value"]
-                        if evolution_list
-                        else 0,
-                        "variacao": round(
-                            evolution_list[-1]["value"] - evolution_list[0]["value"], 2
-                        )
-                        if evolution_list
-                        else 0,
-                    }
-                )
-
-        return jsonify(
-            {
-                "success": True,
-                "data": bankers_evolution,
-                "totalBankers": len(bankers_evolution),
-                "periodoInicio": display_dates[0] if display_dates else None,
-                "periodoFim": display_dates[-1] if display_dates else None,
-            }
-        )
-    except Exception as e:
-        return jsonify({"success": False, "error": str(e)}), 500
+    return panel_response("bankers_evolution")
 
 
 @app.route("/api/bankers/captacao", methods=["GET"])
 def get_bankers_captacao():
     """Retorna evolução de captação para cada banker"""
-    try:
-        pl_data = load_pl_data()
-        try:
-            with open(NETINFLOW_PATH, "r", encoding="utf-8") as f:
-                netinflow_data = json.load(f)
-        except:
-            netinflow_data = []
-
-        if not pl_data:
-            return jsonify({"success": False, "error": "No data available"}), 404
-
-        all_dates = set()
-        for cliente in pl_data:
-            for key in cliente.keys():
-                if (
-                    key not in ["Cliente", "CPF", "Banker"]
-                    and len(key) == 10
-                    and key[4] == "-"
-                    and key[7] == "-"
-                ):
-                    all_dates.add(key)
-
-        sorted_dates = sorted(all_dates)
-        cliente_to_banker = {}
-        for cliente in pl_data:
-            cliente_to_banker[cliente.get("Cliente", "")] = cliente.get(
-                "Banker", "Sem Banker"
-            )
-
-        bankers_captacao = {}
-        for flow in netinflow_data:
-            cliente_nome = flow.get("net_inflow.client_name", "")
-            flow_date = flow.get("net_inflow.date", "")
-            flow_value = flow.get("net_inflow.net_inflow_usd", 0)
-            banker = cliente_to_banker.get(cliente_nome)
-            if banker and flow_value > 0:
-                if banker not in bankers_captacao:
-                    bankers_captacao[banker] = {}
-                if flow_date not in bankers_captacao[banker]:
-                    bankers_captacao[banker][flow_date] = 0
-                bankers_captacao[banker][flow_date] += flow_value
-
-        for cliente in pl_data:
-            banker = cliente.get("Banker", "Sem Banker")
-            first_pl_date = None
-            first_pl_value = None
-            for date in sorted_dates:
-                if date in cliente and cliente[date] is not None:
-                    first_pl_date = date
-                    first_pl_value = float(cliente[date])
-                    break
-
-            # Clientes novos: primeira data != 2025-12-01 e >= 2025-11-01
-            if (
-                first_pl_date
-                and first_pl_date != "2025-12-01"
-                and first_pl_date >= "2025-11-01"
-            ):
-                if banker not in bankers_captacao:
-                    bankers_captacao[banker] = {}
-                if first_pl_date not in bankers_captacao[banker]:
-                    bankers_captacao[banker][first_pl_date] = 0
-                bankers_captacao[banker][first_pl_date] += first_pl_value
-
-        bankers_evolution = []
-        cutoff_date = "2025-11-01"
-
-        # Cria mapa de todos os bankers (inclui aqueles sem dados)
-        all_bankers_set = set()
-        for cliente in pl_data:
-            banker = cliente.get("Banker", "Sem Banker")
-            all_bankers_set.add(banker)
-
-        for banker in sorted(all_bankers_set):
-            evolution_list = []
-            accumulated = 0
-
-            # Combina todas as datas
-            all_dates_banker = set(sorted_dates)
-            if banker in bankers_captacao:
-                all_dates_banker.update(bankers_captacao[banker].keys())
-
-            # Garante que começa a partir de 01/11/2025
-            all_dates_banker.add(cutoff_date)
-
-            for date in sorted(all_dates_banker):
-                # Filtra apenas datas a partir de 01/11/2025
-                if date < cutoff_date:
-                    continue
-
-                if banker in bankers_captacao and date in bankers_captacao[banker]:
-                    accumulated += bankers_captacao[banker][date]
-                evolution_list.append({"date": date, "value": round(accumulated, 2)})
-
-            bankers_evolution.append(
-                {
-                    "nome": banker,
-                    "evolution": evolution_list,
-                    "captacao_total": round(accumulated, 2),
-                    "captacao_inicial": round(evolution_list[0]["value"], 2)
-                    if evolution_list
-                    else 0,
-                    "captacao_final": round(evolution_list[-1]["value"], 2)
-                    if evolution_list
-                    else 0,
-                }
-            )
-
-        return jsonify(
-            {
-                "success": True,
-                "data": bankers_evolution,
-                "totalBankers": len(bankers_evolution),
-                "periodoInicio": sorted_dates[0] if sorted_dates else None,
-                "periodoFim": sorted_dates[-1] if sorted_dates else None,
-            }
-        )
-    except Exception as e:
-        return jsonify({"success": False, "error": str(e)}), 500
+    return panel_response("bankers_captacao")
 
 
 @app.route("/api/captacao/evolucao", methods=["GET"])
 def get_captacao_evolucao():
     """Retorna evolução de captação total"""
-    try:
-        pl_data = load_pl_data()
-        try:
-            with open(NETINFLOW_PATH, "r", encoding="utf-8") as f:
-                netinflow_data = json.load(f)
-        except:
-            netinflow_data = []
-
-        if not pl_data:
-            return jsonify({"success": False, "error": "No data available"}), 404
-
-        all_dates = set()
-        for cliente in pl_data:
-            for key in cliente.keys():
-                if (
-                    key not in ["Cliente", "CPF", "Banker"]
-                    and len(key) == 10
-                    and key[4] == "-"
-                    and key[7] == "-"
-                ):
-                    all_dates.add(key)
-
-        sorted_dates = sorted(all_dates)
-        cliente_to_banker = {}
-        for cliente in pl_data:
-            cliente_to_banker[cliente.get("Cliente", "")] = cliente.get(
-                "Banker", "Sem Banker"
-            )
-
-        captacao_by_date = {}
-        for flow in netinflow_data:
-            cliente_nome = flow.get("net_inflow.client_name", "")
-            flow_date = flow.get("net_inflow.date", "")
-            flow_value = flow.get("net_inflow.net_inflow_usd", 0)
-            banker = cliente_to_banker.get(cliente_nome)
-            if banker and flow_value > 0:
-                if flow_date not in captacao_by_date:
-                    captacao_by_date[flow_date] = 0
-                captacao_by_date[flow_date] += flow_value
-
-        cliente_pl_inicial = {}
-        for cliente in pl_data:
-            cliente_nome = cliente.get("Cliente", "")
-            for date in sorted_dates:
-                if date in cliente and cliente[date] is not None:
-                    cliente_pl_inicial[cliente_nome] = (date, float(cliente[date]))
-                    break
-
-        for cliente_nome, (first_date, first_value) in cliente_pl_inicial.items():
-            if first_date != "2025-12-01":
-                if first_date not in captacao_by_date:
-                    captacao_by_date[first_date] = 0
-                captacao_by_date[first_date] += first_value
-
-        evolution_list = []
-        accumulated = 0
-        all_dates_captacao = set(sorted_dates) | set(captacao_by_date.keys())
-        # Filtrar apenas datas >= 01/12/2025 para exibição
-        display_dates_captacao = [
-            d for d in sorted(all_dates_captacao) if d >= "2025-12-01"
-        ]
-
-        for date in display_dates_captacao:
-            if date in captacao_by_date:
-                accumulated += captacao_by_date[date]
-            evolution_list.append({"date": date, "value": round(accumulated, 2)})
-
-        return jsonify(
-            {
-                "success": True,
-                "data": evolution_list,
-                "captacao_total": round(accumulated, 2),
-                "periodoInicio": display_dates_captacao[0]
-                if display_dates_captacao
-                else None,
-                "periodoFim": display_dates_captacao[-1]
-                if display_dates_captacao
-                else None,
-            }
-        )
-    except Exception as e:
-        return jsonify({"success": False, "error": str(e)}), 500
+    return panel_response("captacao_evolucao")
 
 
 @app.route("/api/metrics", methods=["GET"])
 def get_metrics():
     """Retorna métricas principais do dashboard"""
+    return panel_response("metrics")
+
+
+@app.route("/api/dashboard", methods=["GET"])
+def get_dashboard():
+    """
+    Retorna vários painéis em uma única resposta
+
+    Query params:
+        panels: lista separada por vírgula (padrão: todos os painéis)
+        start, end, as_of, granularity, points, format, since: aplicados a
+            todos os painéis (format=binary não é aceito aqui)
+
+    Cada painel é serializado exatamente como na rota individual; o status
+    HTTP que a rota individual retornaria fica em "status".
+    """
+    requested = request.args.get("panels")
+    if requested:
+        names = list(dict.fromkeys(p.strip() for p in requested.split(",") if p.strip()))
+    else:
+        names = list(panels.PANELS)
+
+    unknown = [n for n in names if n not in panels.PANELS]
+    if unknown:
+        return _bad_request(
+            f"Unknown panels: {', '.join(unknown)}", available=list(panels.PANELS)
+        )
     try:
-        data = load_pl_data()
-        bankers_map = load_cliente_bankers()
-        try:
-            with open(NETINFLOW_PATH, "r", encoding="utf-8") as f:
-                netinflow_data = json.load(f)
-        except:
-            netinflow_data = []
-
-        if not data:
-            return jsonify({"success": False, "error": "No client data available"}), 404
-
-        all_dates = set()
-        for cliente in data:
-            for key in cliente.keys():
-                if (
-                    key not in ["Cliente", "CPF", "Banker"]
-                    and len(key) == 10
-                    and key[4] == "-"
-                    and key[7] == "-"
-                ):
-                    all_dates.add(key)
-
-        if not all_dates:
-            return jsonify({"success": False, "error": "No dates found"}), 404
-
-        sorted_dates = sorted(all_dates)
-        # Filtrar apenas datas >= 01/12/2025 para as métricas
-        metric_dates = [d for d in sorted_dates if d >= "2025-12-01"]
-
-        if not metric_dates:
-            return jsonify({"success": False, "error": "No data in metric period"}), 404
-
-        # Período para a métrica "Captação do Período" (01/12 a 31/01)
-        periodo_captacao_inicio = "2025-12-01"
-        periodo_captacao_fim = "2026-01-31"
-
-        # Período para Top 3 Bankers (01/11 a 31/01)
-        top_bankers_inicio = "2025-11-01"
-        top_bankers_fim = "2026-01-31"
-
-        first_date, last_date = metric_dates[0], metric_dates[-1]
-
-        clientes_primeira = clientes_ultima = 0
-        pl_primeira = pl_ultima = 0
-        bankers_captacao_periodo = {}  # Para métrica "Captação do Período"
-        bankers_captacao_ranking = {}  # Para Top 3 Bankers (período maior)
-        cliente_to_banker = {}
-
-        for cliente in data:
-            cliente_nome = cliente.get("Cliente", "")
-            banker = bankers_map.get(cliente_nome, cliente.get("Banker", "Sem Banker"))
-            cliente_to_banker[cliente_nome] = banker
-
-            if first_date in cliente and cliente[first_date] is not None:
-                clientes_primeira += 1
-                pl_primeira += float(cliente[first_date])
-            if last_date in cliente and cliente[last_date] is not None:
-                clientes_ultima += 1
-                pl_ultima += float(cliente[last_date])
-
-        # 1. Calcular captação por banker a partir do netinflow (para ambos períodos)
-        for flow in netinflow_data:
-            cliente_nome = flow.get("net_inflow.client_name", "")
-            flow_date = flow.get("net_inflow.date", "")
-            flow_value = flow.get("net_inflow.net_inflow_usd", 0)
-            banker = cliente_to_banker.get(cliente_nome)
-
-            if banker and flow_value > 0:
-                # Adicionar ao período da métrica (01/12 a 31/01)
-                if periodo_captacao_inicio <= flow_date <= periodo_captacao_fim:
-                    if banker not in bankers_captacao_periodo:
-                        bankers_captacao_periodo[banker] = 0
-                    bankers_captacao_periodo[banker] += flow_value
-
-                # Adicionar ao período do ranking (01/11 a 31/01)
-                if top_bankers_inicio <= flow_date <= top_bankers_fim:
-                    if banker not in bankers_captacao_ranking:
-                        bankers_captacao_ranking[banker] = 0
-                    bankers_captacao_ranking[banker] += flow_value
-
-        # 2. Incluir clientes novos como captação (primeira data com valor > 0 != 2025-12-01)
-        for cliente in data:
-            cliente_nome = cliente.get("Cliente", "")
-            banker = cliente_to_banker.get(cliente_nome)
-
-            # Verificar se é cliente novo (primeira data com valor > 0 não é 2025-12-01)
-            primeiro_valor = None
-            primeira_data = None
-            for date in sorted_dates:
-                if (
-                    date in cliente
-                    and cliente[date] is not None
-                    and float(cliente[date]) > 0
-                ):
-                    primeira_data = date
-                    primeiro_valor = float(cliente[date])
-                    break
-
-            # Se primeira data com valor > 0 não é 2025-12-01, é cliente novo
-            if primeiro_valor and primeira_data and primeira_data != "2025-12-01":
-                # Adicionar ao período da métrica (01/12 a 31/01)
-                if primeira_data >= periodo_captacao_inicio:
-                    if banker not in bankers_captacao_periodo:
-                        bankers_captacao_periodo[banker] = 0
-                    bankers_captacao_periodo[banker] += primeiro_valor
-
-                # Adicionar ao período do ranking (01/11 a 31/01)
-                if primeira_data >= top_bankers_inicio:
-                    if banker not in bankers_captacao_ranking:
-                        bankers_captacao_ranking[banker] = 0
-                    bankers_captacao_ranking[banker] += primeiro_valor
-
-        # 3. Se ainda não há dados de captação, usar P&L inicial como proxy
-        if not bankers_captacao_periodo and not bankers_captacao_ranking:
-            for cliente in data:
-                cliente_nome = cliente.get("Cliente", "")
-                banker = cliente_to_banker.get(cliente_nome)
-                if first_date in cliente and cliente[first_date] is not None:
-                    pl_value = float(cliente[first_date])
-                    if pl_value > 0:
-                        if banker not in bankers_captacao_periodo:
-                            bankers_captacao_periodo[banker] = 0
-                        bankers_captacao_periodo[banker] += pl_value
-
-                        if banker not in bankers_captacao_ranking:
-                            bankers_captacao_ranking[banker] = 0
-                        bankers_captacao_ranking[banker] += pl_value
-
-        # Calcular Top 3 Bankers por captação ranking (excluindo Alan Finazzi Sbeghen)
-        bankers_for_top = {
-            k: v
-            for k, v in bankers_captacao_ranking.items()
-            if k != "Alan Finazzi Sbeghen"
-        }
-        top3_bankers = sorted(
-            bankers_for_top.items(), key=lambda x: x[1], reverse=True
-        )[:3]
-        top3_list = [
-            {"nome": nome, "captacao": round(captacao, 2)}
-            for nome, captacao in top3_bankers
-        ]
-
-        # Captação total do período (01/12 a 31/01) - mantém contribuições de todos, incluindo Alan
-        captacao_total = sum(bankers_captacao_periodo.values())
-
-        return jsonify(
-            {
-                "success": True,
-                "metrics": {
-                    "totalClientes": clientes_ultima,
-                    "novosClientes": max(0, clientes_ultima - clientes_primeira),
-                    "plTotal": round(pl_ultima, 2),
-                    "plVariacao": round(
-                        ((pl_ultima - pl_primeira) / pl_primeira * 100)
-                        if pl_primeira
-                        else 0,
-                        2,
-                    ),
-                    "captacaoPeriodo": round(captacao_total, 2),
-                    "top3Bankers": top3_list,
-                    "periodoInicio": first_date,
-                    "periodoFim": last_date,
-                },
-            }
+        params = panels.PanelParams.from_args(request.args)
+    except ValueError as e:
+        return _bad_request(str(e))
+    if params.format == "binary":
+        return _bad_request("format=binary is not supported by /api/dashboard")
+
+    ctx = panels.get_context(data_store.snapshot())
+    parts = []
+    statuses = {}
+    for name in names:
+        body, status = panels.render_panel(
+            name, ctx, params, cached=not profiling.is_profiling()
         )
-    except Exception as e:
-        return jsonify({"success": False, "error": str(e)}), 500
+        parts.append(serialization.dumps(name) + b":" + body[:-1])
+        statuses[name] = status
+
+    body = (
+        b'{"panels":{'
+        + b",".join(parts)
+        + b'},"status":'
+        + serialization.dumps(statuses)
+        + b',"success":true}\n'
+    )
+    return _json_response(body)
 
 
 if __name__ == "__main__":
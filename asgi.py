@@ -0,0 +1,28 @@
+"""
+Ponto de entrada ASGI da API
+
+Serve o mesmo app Flask em um servidor ASGI; cada requisição roda em um pool
+de threads fora do event loop, compartilhando o snapshot dos dados:
+
+    uvicorn asgi:application --host 0.0.0.0 --port 5000
+
+O uvicorn está no requirements.txt; o deploy padrão (Procfile, railway.toml)
+continua sendo o gunicorn com o gunicorn.conf.py.
+
+Variáveis de ambiente:
+    ASGI_THREADS: tamanho do pool de threads (padrão do Python se ausente)
+    STREAM_MAX_CONNECTIONS: conexões SSE simultâneas; cada uma ocupa uma
+        thread do pool, então deve ficar abaixo de ASGI_THREADS
+    DATA_WATCH_INTERVAL: intervalo do watcher de dados em segundos (padrão 5)
+"""
+
+import os
+
+from app import app, start_background_reload
+from dashboard.asgi import WSGIToASGI
+
+_threads = os.getenv("ASGI_THREADS")
+
+start_background_reload()
+
+application = WSGIToASGI(app, max_threads=int(_threads) if _threads else None)
@@ -0,0 +1,208 @@
+#!/usr/bin/env python3
+"""
+Benchmark das rotas da API sobre dados sintéticos
+
+Para cada escala, gera um dataset (reaproveitado entre execuções se
+--work-dir for informado), sobe o app.py em um
+processo novo apontado para ele e mede, pelo test client do Flask:
+    - load: tempo de import do app, tempo para ler os arquivos e montar o
+      snapshot (com os painéis pré-calculados) e o pico de memória alocada
+      nessa carga
+    - cached: latência p50/p95 de cada rota como em produção (cache de
+      respostas quente)
+    - compute: latência p50/p95 recalculando a resposta a cada requisição
+      (cache de respostas limpo antes de cada chamada)
+    - bytes / gzipBytes: tamanho do payload de cada rota
+O resultado sai em JSON, para comparar antes e depois de uma otimização.
+Roda offline.
+
+Uso:
+    python benchmarks/bench_api.py --scales 10x90,1000x1000 --output bench.json
+    python benchmarks/bench_api.py --data-dir /tmp/bench-medium --iterations 100
+"""
+
+import argparse
+import gzip
+import json
+import os
+import platform
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from typing import Any, Dict, List
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from generate_data import data_paths, generate  # noqa: E402
+
+# Rotas que não fazem sentido no benchmark (streaming, métricas internas)
+SKIP_ROUTES = {"/api/stream", "/api/metrics/internal"}
+
+
+def percentile(samples: List[float], q: float) -> float:
+    ordered = sorted(samples)
+    if not ordered:
+        return 0.0
+    k = (len(ordered) - 1) * q
+    lo, hi = int(k), min(int(k) + 1, len(ordered) - 1)
+    return ordered[lo] + (ordered[hi] - ordered[lo]) * (k - lo)
+
+
+def _summary_ms(samples: List[float]) -> Dict[str, float]:
+    return {
+        "p50Ms": round(percentile(samples, 0.50) * 1000, 3),
+        "p95Ms": round(percentile(samples, 0.95) * 1000, 3),
+        "maxMs": round(max(samples) * 1000, 3),
+    }
+
+
+def bench_routes(iterations: int) -> Dict[str, Any]:
+    """Mede o app já configurado por variáveis de ambiente neste processo"""
+    start = time.perf_counter()
+    import app as app_module
+    from dashboard import panels, serialization
+
+    import_seconds = time.perf_counter() - start
+    tracemalloc.start()
+    snapshot = app_module.data_store.snapshot()
+    _, load_peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    flask_app = app_module.app
+    client = flask_app.test_client()
+    # Sem o single-flight em disco: com ele, limpar o cache em memória não
+    # força o recálculo (a resposta de outra chamada é lida do arquivo)
+    panels.shared_renders = None
+    routes = sorted(
+        rule.rule
+        for rule in flask_app.url_map.iter_rules()
+        if rule.rule.startswith("/api/")
+        and "GET" in rule.methods
+        and not rule.arguments
+        and rule.rule not in SKIP_ROUTES
+    )
+
+    results: Dict[str, Any] = {}
+    for route in routes:
+        response = client.get(route)
+        body = response.get_data()
+        cached: List[float] = []
+        for _ in range(iterations):
+            t = time.perf_counter()
+            client.get(route)
+            cached.append(time.perf_counter() - t)
+        compute: List[float] = []
+        for _ in range(iterations):
+            panels.get_context(app_module.data_store.snapshot()).rendered.clear()
+            t = time.perf_counter()
+            client.get(route)
+            compute.append(time.perf_counter() - t)
+        results[route] = {
+            "status": response.status_code,
+            "bytes": len(body),
+            "gzipBytes": len(gzip.compress(body, 6)),
+            "cached": _summary_ms(cached),
+            "compute": _summary_ms(compute),
+        }
+
+    return {
+        "version": snapshot.version,
+        "load": {
+            "importSeconds": round(import_seconds, 4),
+            # Medido com tracemalloc ligado, que deixa a carga mais lenta
+            "snapshotSeconds": round(app_module.data_store.last_load_seconds, 4),
+            "peakTracedBytes": load_peak,
+        },
+        "routes": results,
+        # ru_maxrss vem em KB no Linux e em bytes no macOS
+        "maxRssBytes": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        * (1 if sys.platform == "darwin" else 1024),
+        "encoder": serialization.ENCODER,
+    }
+
+
+def run_scale(clients: int, days: int, iterations: int, work_dir: str, seed: int) -> Dict[str, Any]:
+    """Gera o dataset e mede em um subprocesso (memória isolada por escala)"""
+    out_dir = os.path.join(work_dir, f"{clients}x{days}-seed{seed}")
+    summary_path = os.path.join(out_dir, "dataset.json")
+    if os.path.exists(summary_path):
+        with open(summary_path) as f:
+            dataset = json.load(f)
+    else:
+        dataset = generate(out_dir, clients=clients, days=days, seed=seed)
+        with open(summary_path, "w") as f:
+            json.dump(dataset, f)
+    env = dict(os.environ, **data_paths(out_dir))
+    proc = subprocess.run(
+        [
+            sys.executable,
+            os.path.abspath(__file__),
+            "--data-dir",
+            out_dir,
+            "--iterations",
+            str(iterations),
+        ],
+        env=env,
+        cwd=ROOT,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    result = json.loads(proc.stdout)
+    result["dataset"] = dataset
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument(
+        "--scales",
+        default="10x90,1000x1000",
+        help="escalas clientes x dias separadas por vírgula (ex.: 10x90,1000x1000,50000x3650)",
+    )
+    parser.add_argument("--data-dir", help="mede um dataset já gerado neste processo")
+    parser.add_argument("--iterations", type=int, default=50)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument(
+        "--work-dir", help="onde gerar e reaproveitar os datasets (padrão: temporário)"
+    )
+    parser.add_argument("--output", help="arquivo JSON de saída (padrão: stdout)")
+    args = parser.parse_args()
+
+    if args.data_dir:
+        for key, path in data_paths(args.data_dir).items():
+            os.environ.setdefault(key, path)
+        # Saída do app (prints) não pode misturar com o JSON
+        stdout, sys.stdout = sys.stdout, sys.stderr
+        result = bench_routes(args.iterations)
+        stdout.write(json.dumps(result))
+        return
+
+    report: Dict[str, Any] = {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "iterations": args.iterations,
+        "scales": {},
+    }
+    with tempfile.TemporaryDirectory(prefix="dashboard-bench-") as tmp:
+        work_dir = args.work_dir or tmp
+        for scale in args.scales.split(","):
+            clients, days = (int(x) for x in scale.lower().split("x"))
+            print(f"Benchmark {clients} clientes x {days} dias...", file=sys.stderr)
+            report["scales"][scale] = run_scale(clients, days, args.iterations, work_dir, args.seed)
+
+    text = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(text + "\n")
+    else:
+        print(text)
+
+
+if __name__ == "__main__":
+    main()
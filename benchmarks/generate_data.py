@@ -0,0 +1,206 @@
+#!/usr/bin/env python3
+"""
+Gerador de dados sintéticos para benchmarks da API
+
+Escreve evolucao_pl_diaria.json, net_inflow_raw.json e cliente_perfil.txt
+no mesmo formato dos pipelines, em qualquer escala de clientes × dias. Os
+arquivos são gravados em streaming (um cliente por vez), então escalas
+grandes não precisam caber em memória. Determinístico para uma mesma seed.
+
+Uso:
+    python benchmarks/generate_data.py --preset medium --out /tmp/bench-medium
+    python benchmarks/generate_data.py --clients 5000 --days 365 --out /tmp/bench
+"""
+
+import argparse
+import json
+import os
+from datetime import date, timedelta
+from typing import Dict, List
+
+import numpy as np
+
+# Escalas de referência (clientes, dias)
+PRESETS = {
+    "small": (10, 90),
+    "medium": (1000, 1000),
+    "large": (50000, 3650),
+}
+
+PERFIS = ["Low‑Risk Portfolio", "Balanced‑Risk Portfolio", "High‑Risk Portfolio"]
+PRODUCT_TYPES = [None, None, None, "Bonds", "Stocks", "Funds", "UCITs", "ETF's"]
+DESCRIPTIONS = {"C": "Depósito em c/c - Ted", "D": "Retirada de c/c - Ted"}
+BRL_PER_USD = 5.35
+
+PL_FILENAME = "evolucao_pl_diaria.json"
+NETINFLOW_FILENAME = "net_inflow_raw.json"
+CLIENTE_PERFIL_FILENAME = "cliente_perfil.txt"
+
+
+def _json_item(record: dict) -> str:
+    """Elemento de uma lista JSON com a mesma indentação do json.dump(indent=2)"""
+    text = json.dumps(record, indent=2, ensure_ascii=False)
+    return "  " + text.replace("\n", "\n  ")
+
+
+class _JSONListWriter:
+    def __init__(self, path: str):
+        self.f = open(path, "w", encoding="utf-8")
+        self.first = True
+        self.f.write("[\n")
+
+    def write(self, record: dict) -> None:
+        if not self.first:
+            self.f.write(",\n")
+        self.f.write(_json_item(record))
+        self.first = False
+
+    def close(self) -> None:
+        self.f.write("\n]" if not self.first else "]")
+        self.f.close()
+
+
+def generate(
+    out_dir: str,
+    clients: int,
+    days: int,
+    bankers: int = 0,
+    flows_per_month: float = 2.0,
+    end: date = date(2026, 1, 29),
+    seed: int = 42,
+) -> Dict[str, object]:
+    """
+    Gera os três arquivos de dados em out_dir
+
+    Args:
+        clients: número de clientes (linhas do P&L)
+        days: número de datas do P&L, terminando em `end`
+        bankers: número de bankers (0 = ~1 a cada 50 clientes, mínimo 3)
+        flows_per_month: média de movimentações de NetInflow por cliente a cada 30 dias
+        seed: semente do gerador aleatório
+
+    Returns:
+        Resumo do dataset gerado (contagens e tamanhos dos arquivos)
+    """
+    rng = np.random.default_rng(seed)
+    os.makedirs(out_dir, exist_ok=True)
+    bankers = bankers or max(3, min(200, clients // 50))
+    banker_names = [f"Banker {i + 1:03d}" for i in range(bankers)]
+    start = end - timedelta(days=days - 1)
+    dates: List[str] = [(start + timedelta(days=i)).isoformat() for i in range(days)]
+
+    pl_writer = _JSONListWriter(os.path.join(out_dir, PL_FILENAME))
+    flow_writer = _JSONListWriter(os.path.join(out_dir, NETINFLOW_FILENAME))
+    perfil = open(os.path.join(out_dir, CLIENTE_PERFIL_FILENAME), "w", encoding="utf-8")
+    perfil.write("Cliente, Banker, Email, Perfil\n")
+
+    n_flows = 0
+    try:
+        for i in range(clients):
+            name = f"Cliente Sintetico {i + 1:06d}"
+            cpf = f"{10_000_000_000 + i * 7919 % 89_999_999_999:011d}"
+            email = f"cliente{i + 1:06d}@example.com"
+            banker = banker_names[int(rng.integers(bankers))]
+
+            # 70% já estão na carteira na primeira data; os demais entram depois
+            first = 0 if rng.random() < 0.7 else int(rng.integers(1, days)) if days > 1 else 0
+            returns = rng.normal(0.0003, 0.01, days - first)
+            values = rng.lognormal(11.5, 1.0) * np.cumprod(1 + returns)
+
+            record = {"Cliente": name, "CPF": cpf, "Banker": banker}
+            record.update((d, None) for d in dates[:first])
+            record.update(zip(dates[first:], np.round(values, 2).tolist()))
+            pl_writer.write(record)
+
+            # 5% dos clientes têm outro banker no cliente_perfil.txt (override)
+            perfil_banker = (
+                banker_names[int(rng.integers(bankers))] if rng.random() < 0.05 else banker
+            )
+            perfil.write(f"{name},{perfil_banker}, {email}, {PERFIS[i % len(PERFIS)]}\n")
+
+            active = days - first
+            count = int(rng.poisson(flows_per_month * active / 30))
+            flow_days = np.sort(rng.integers(first, days, count)) if count else []
+            amounts = rng.lognormal(9.5, 1.2, count) * np.where(
+                rng.random(count) < 0.35, 1.0, -1.0
+            )
+            for day, usd in zip(flow_days, amounts.tolist()):
+                kind = "C" if usd > 0 else "D"
+                product = PRODUCT_TYPES[int(rng.integers(len(PRODUCT_TYPES)))]
+                flow_writer.write(
+                    {
+                        "net_inflow.date": dates[int(day)],
+                        "net_inflow.created_date": None,
+                        "net_inflow.settlement_date": None,
+                        "net_inflow.client_cpf": cpf,
+                        "net_inflow.client_email": email,
+                        "net_inflow.client_name": name,
+                        "net_inflow.foreign_finder_email": "finder@example.com",
+                        "net_inflow.foreign_finder_code": "AVE000000",
+                        "net_inflow.foreign_finder_name": "Finder Sintetico",
+                        "net_inflow.office_cnpj": "00000000000100",
+                        "net_inflow.office_name": "LEVANTE ASSET",
+                        "net_inflow.kind": kind,
+                        "net_inflow.description": DESCRIPTIONS[kind],
+                        "net_inflow.product_cusip": None,
+                        "net_inflow.product_name": None,
+                        "net_inflow.product_type": product,
+                        "net_inflow.product_symbol": None,
+                        "net_inflow.net_inflow_brl": round(usd * BRL_PER_USD, 2),
+                        "net_inflow.net_inflow_usd": round(usd, 2),
+                    }
+                )
+            n_flows += count
+    finally:
+        pl_writer.close()
+        flow_writer.close()
+        perfil.close()
+
+    files = {
+        name: os.path.getsize(os.path.join(out_dir, name))
+        for name in (PL_FILENAME, NETINFLOW_FILENAME, CLIENTE_PERFIL_FILENAME)
+    }
+    return {
+        "clients": clients,
+        "days": days,
+        "bankers": bankers,
+        "flows": n_flows,
+        "seed": seed,
+        "fileBytes": files,
+    }
+
+
+def data_paths(out_dir: str) -> Dict[str, str]:
+    """Variáveis de ambiente que apontam o app.py para os arquivos gerados"""
+    return {
+        "PL_JSON_PATH": os.path.join(out_dir, PL_FILENAME),
+        "NETINFLOW_PATH": os.path.join(out_dir, NETINFLOW_FILENAME),
+        "CLIENTE_PERFIL_PATH": os.path.join(out_dir, CLIENTE_PERFIL_FILENAME),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--out", required=True, help="diretório de saída")
+    parser.add_argument("--preset", choices=sorted(PRESETS), help="escala pré-definida")
+    parser.add_argument("--clients", type=int, help="número de clientes")
+    parser.add_argument("--days", type=int, help="número de dias")
+    parser.add_argument("--bankers", type=int, default=0)
+    parser.add_argument("--flows-per-month", type=float, default=2.0)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    clients, days = PRESETS[args.preset] if args.preset else (10, 90)
+    summary = generate(
+        args.out,
+        clients=args.clients or clients,
+        days=args.days or days,
+        bankers=args.bankers,
+        flows_per_month=args.flows_per_month,
+        seed=args.seed,
+    )
+    print(json.dumps(summary, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,321 @@
+#!/usr/bin/env python3
+"""
+Teste de carga concorrente da API
+
+Sobe o app:app no gunicorn (usando o gunicorn.conf.py) para cada
+configuração de workers × threads e simula usuários abrindo as páginas do
+dashboard com as mesmas requisições que o frontend faz. Reporta, por
+configuração, throughput, latência de cauda e taxa de erro, em JSON.
+
+Uso:
+    python benchmarks/load_test.py --configs 1x1,2x4,4x4 --users 32 --duration 20
+    python benchmarks/load_test.py --url http://localhost:5000 --users 16
+    python benchmarks/load_test.py --data-dir /tmp/bench-medium --configs 2x4
+
+Os clientes rodam em --client-procs processos (threads em cada um), para que
+o GIL do gerador de carga não limite o throughput medido.
+"""
+
+import argparse
+import http.client
+import json
+import multiprocessing
+import os
+import random
+import signal
+import subprocess
+import sys
+import time
+import urllib.parse
+from typing import Any, Dict, List, Optional, Tuple
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from generate_data import data_paths  # noqa: E402
+
+# Requisições feitas por cada página do frontend ao montar
+PAGES: Dict[str, List[str]] = {
+    "index": [
+        "/api/dashboard?panels=metrics,pl_total,captacao_evolucao,clients_pl",
+    ],
+    "bankers": [
+        "/api/dashboard?panels=bankers_captacao,bankers_evolution",
+    ],
+    "clients": [
+        "/api/clients/evolution",
+    ],
+}
+DEFAULT_MIX = "index=6,bankers=3,clients=1"
+
+
+def percentile(samples: List[float], q: float) -> float:
+    ordered = sorted(samples)
+    if not ordered:
+        return 0.0
+    k = (len(ordered) - 1) * q
+    lo, hi = int(k), min(int(k) + 1, len(ordered) - 1)
+    return ordered[lo] + (ordered[hi] - ordered[lo]) * (k - lo)
+
+
+def latency_summary(samples: List[float]) -> Dict[str, float]:
+    return {
+        "p50Ms": round(percentile(samples, 0.50) * 1000, 2),
+        "p95Ms": round(percentile(samples, 0.95) * 1000, 2),
+        "p99Ms": round(percentile(samples, 0.99) * 1000, 2),
+        "maxMs": round(max(samples) * 1000, 2) if samples else 0.0,
+    }
+
+
+def parse_mix(text: str) -> List[Tuple[str, float]]:
+    mix = []
+    for item in text.split(","):
+        page, _, weight = item.partition("=")
+        if page not in PAGES:
+            raise ValueError(f"Página desconhecida: {page} (disponíveis: {', '.join(PAGES)})")
+        mix.append((page, float(weight or 1)))
+    return mix
+
+
+class _Client:
+    """Conexão HTTP keep-alive de um usuário simulado"""
+
+    def __init__(self, host: str, port: int, revalidate: bool):
+        self.host = host
+        self.port = port
+        self.revalidate = revalidate
+        self.etags: Dict[str, str] = {}
+        self.conn: Optional[http.client.HTTPConnection] = None
+
+    def get(self, path: str) -> int:
+        headers = {}
+        if self.revalidate and path in self.etags:
+            headers["If-None-Match"] = self.etags[path]
+        for attempt in range(2):
+            if self.conn is None:
+                self.conn = http.client.HTTPConnection(self.host, self.port, timeout=30)
+            try:
+                self.conn.request("GET", path, headers=headers)
+                response = self.conn.getresponse()
+                response.read()
+            except (http.client.HTTPException, OSError):
+                # Conexão fechada pelo servidor (ex.: worker sync sem keep-alive)
+                self.conn.close()
+                self.conn = None
+                if attempt:
+                    raise
+                continue
+            etag = response.getheader("ETag")
+            if etag:
+                self.etags[path] = etag
+            if response.getheader("Connection", "").lower() == "close":
+                self.conn.close()
+                self.conn = None
+            return response.status
+        raise RuntimeError("unreachable")
+
+
+def _run_users(args: Tuple[str, int, int, float, float, str, bool, int]) -> Dict[str, Any]:
+    """Roda `users` usuários em threads deste processo e devolve as amostras"""
+    import threading
+
+    host, port, users, warmup, duration, mix_text, revalidate, seed = args
+    mix = parse_mix(mix_text)
+    pages, weights = [p for p, _ in mix], [w for _, w in mix]
+    start_at = time.monotonic() + warmup
+    stop_at = start_at + duration
+    lock = threading.Lock()
+    samples: Dict[str, List[float]] = {}
+    errors: Dict[str, int] = {}
+    statuses: Dict[str, int] = {}
+    page_count = [0]
+
+    def user(n: int):
+        rng = random.Random(seed * 1000 + n)
+        client = _Client(host, port, revalidate)
+        while time.monotonic() < stop_at:
+            page = rng.choices(pages, weights)[0]
+            results = []
+            for path in PAGES[page]:
+                t = time.perf_counter()
+                try:
+                    status = client.get(path)
+                except Exception:
+                    status = 0
+                results.append((path, time.perf_counter() - t, status))
+            if time.monotonic() < start_at:
+                continue
+            with lock:
+                page_count[0] += 1
+                for path, elapsed, status in results:
+                    samples.setdefault(path, []).append(elapsed)
+                    statuses[str(status)] = statuses.get(str(status), 0) + 1
+                    if status == 0 or status >= 400:
+                        errors[path] = errors.get(path, 0) + 1
+
+    threads = [threading.Thread(target=user, args=(n,), daemon=True) for n in range(users)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return {"samples": samples, "errors": errors, "statuses": statuses, "pages": page_count[0]}
+
+
+def run_load(
+    url: str,
+    users: int,
+    duration: float,
+    warmup: float,
+    mix: str,
+    revalidate: bool,
+    client_procs: int,
+) -> Dict[str, Any]:
+    """Gera carga contra uma URL e agrega os resultados"""
+    parsed = urllib.parse.urlparse(url)
+    host, port = parsed.hostname or "localhost", parsed.port or 80
+    client_procs = max(1, min(client_procs, users))
+    shares = [users // client_procs + (i < users % client_procs) for i in range(client_procs)]
+    jobs = [
+        (host, port, share, warmup, duration, mix, revalidate, i)
+        for i, share in enumerate(shares)
+    ]
+    with multiprocessing.Pool(client_procs) as pool:
+        parts = pool.map(_run_users, jobs)
+
+    samples: Dict[str, List[float]] = {}
+    errors: Dict[str, int] = {}
+    statuses: Dict[str, int] = {}
+    pages = 0
+    for part in parts:
+        for path, values in part["samples"].items():
+            samples.setdefault(path, []).extend(values)
+        for path, n in part["errors"].items():
+            errors[path] = errors.get(path, 0) + n
+        for status, n in part["statuses"].items():
+            statuses[status] = statuses.get(status, 0) + n
+        pages += part["pages"]
+
+    all_samples = [v for values in samples.values() for v in values]
+    total = len(all_samples)
+    total_errors = sum(errors.values())
+    return {
+        "users": users,
+        "durationSeconds": duration,
+        "requests": total,
+        "errors": total_errors,
+        "errorRate": round(total_errors / total, 4) if total else 0.0,
+        "throughputRps": round(total / duration, 1),
+        "pagesPerSecond": round(pages / duration, 1),
+        "latency": latency_summary(all_samples),
+        "statusCodes": dict(sorted(statuses.items())),
+        "endpoints": {
+            path: dict(
+                requests=len(values),
+                errors=errors.get(path, 0),
+                **latency_summary(values),
+            )
+            for path, values in sorted(samples.items())
+        },
+    }
+
+
+def _wait_ready(url: str, timeout: float) -> None:
+    parsed = urllib.parse.urlparse(url)
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            conn = http.client.HTTPConnection(parsed.hostname, parsed.port, timeout=2)
+            conn.request("GET", "/api/health")
+            if conn.getresponse().status == 200:
+                conn.close()
+                return
+        except OSError:
+            pass
+        time.sleep(0.2)
+    raise RuntimeError(f"Servidor não respondeu em {timeout:.0f}s")
+
+
+def start_server(workers: int, threads: int, port: int, env: Dict[str, str]) -> subprocess.Popen:
+    """Sobe o gunicorn com o gunicorn.conf.py do projeto"""
+    env = dict(
+        os.environ,
+        **env,
+        WEB_CONCURRENCY=str(workers),
+        GUNICORN_THREADS=str(threads),
+        PORT=str(port),
+    )
+    return subprocess.Popen(
+        [sys.executable, "-m", "gunicorn", "-c", "gunicorn.conf.py", "app:app"],
+        cwd=ROOT,
+        env=env,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+
+
+def stop_server(proc: subprocess.Popen) -> None:
+    proc.send_signal(signal.SIGTERM)
+    try:
+        proc.wait(timeout=15)
+    except subprocess.TimeoutExpired:
+        proc.kill()
+        proc.wait()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument(
+        "--configs", default="1x1,2x4", help="workers x threads separados por vírgula"
+    )
+    parser.add_argument("--url", help="testa um servidor já rodando (ignora --configs)")
+    parser.add_argument("--port", type=int, default=5099)
+    parser.add_argument("--users", type=int, default=16, help="usuários simultâneos")
+    parser.add_argument("--duration", type=float, default=15, help="segundos medidos")
+    parser.add_argument("--warmup", type=float, default=3, help="segundos descartados")
+    parser.add_argument("--mix", default=DEFAULT_MIX, help="pesos das páginas")
+    parser.add_argument(
+        "--revalidate",
+        action="store_true",
+        help="reenvia o ETag recebido (usuários que voltam ao dashboard)",
+    )
+    parser.add_argument("--client-procs", type=int, default=max(1, (os.cpu_count() or 2) // 2))
+    parser.add_argument("--data-dir", help="dataset gerado pelo generate_data.py")
+    parser.add_argument("--output", help="arquivo JSON de saída (padrão: stdout)")
+    args = parser.parse_args()
+    parse_mix(args.mix)
+
+    load_args = dict(
+        users=args.users,
+        duration=args.duration,
+        warmup=args.warmup,
+        mix=args.mix,
+        revalidate=args.revalidate,
+        client_procs=args.client_procs,
+    )
+    report: Dict[str, Any] = {"mix": args.mix, "revalidate": args.revalidate, "runs": []}
+    if args.url:
+        report["runs"].append(dict(url=args.url, **run_load(args.url, **load_args)))
+    else:
+        env = data_paths(args.data_dir) if args.data_dir else {}
+        for config in args.configs.split(","):
+            workers, threads = (int(x) for x in config.lower().split("x"))
+            url = f"http://127.0.0.1:{args.port}"
+            print(f"Carga em {workers} workers x {threads} threads...", file=sys.stderr)
+            proc = start_server(workers, threads, args.port, env)
+            try:
+                _wait_ready(url, timeout=60)
+                result = run_load(url, **load_args)
+            finally:
+                stop_server(proc)
+            report["runs"].append(dict(config=config, workers=workers, threads=threads, **result))
+
+    text = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(text + "\n")
+    else:
+        print(text)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,4 @@
+"""
+Núcleo de dados da API do Avenue Dashboard
+Carregamento, cache e agregações compartilhadas pelas rotas de app.py
+"""
@@ -0,0 +1,148 @@
+"""
+Adaptador WSGI -> ASGI para servir o app Flask em um servidor ASGI
+Cada requisição roda o app WSGI em um pool de threads, fora do event loop:
+as agregações (numpy) não bloqueiam as outras conexões e todas as threads
+leem o mesmo snapshot imutável dos dados. A resposta é enviada pedaço a
+pedaço, então respostas em streaming também funcionam
+"""
+
+import asyncio
+import io
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+_DONE = object()
+
+
+def _next_chunk(iterator) -> Any:
+    return next(iterator, _DONE)
+
+
+def build_environ(scope: Dict[str, Any], body: bytes) -> Dict[str, Any]:
+    """Ambiente WSGI (PEP 3333) a partir de um scope HTTP do ASGI"""
+    server = scope.get("server") or ("localhost", 80)
+    client = scope.get("client") or ("", 0)
+    environ = {
+        "REQUEST_METHOD": scope["method"],
+        "SCRIPT_NAME": scope.get("root_path", "").encode("utf-8").decode("latin-1"),
+        "PATH_INFO": scope["path"].encode("utf-8").decode("latin-1"),
+        "QUERY_STRING": scope.get("query_string", b"").decode("latin-1"),
+        "SERVER_NAME": str(server[0]),
+        "SERVER_PORT": str(server[1]),
+        "SERVER_PROTOCOL": f"HTTP/{scope.get('http_version', '1.1')}",
+        "REMOTE_ADDR": str(client[0]),
+        "REMOTE_PORT": str(client[1]),
+        "wsgi.version": (1, 0),
+        "wsgi.url_scheme": scope.get("scheme", "http"),
+        "wsgi.input": io.BytesIO(body),
+        "wsgi.errors": sys.stderr,
+        "wsgi.multithread": True,
+        "wsgi.multiprocess": False,
+        "wsgi.run_once": False,
+    }
+    for raw_name, raw_value in scope.get("headers", []):
+        name = raw_name.decode("latin-1").upper().replace("-", "_")
+        value = raw_value.decode("latin-1")
+        if name not in ("CONTENT_TYPE", "CONTENT_LENGTH"):
+            name = f"HTTP_{name}"
+        if name in environ:
+            value = f"{environ[name]},{value}"
+        environ[name] = value
+    return environ
+
+
+class WSGIToASGI:
+    """
+    Aplicação ASGI que delega para um app WSGI
+
+    Args:
+        wsgi_app: aplicação WSGI (ex.: o app Flask)
+        max_threads: tamanho do pool de threads (None = padrão do Python)
+    """
+
+    def __init__(self, wsgi_app: Callable, max_threads: Optional[int] = None):
+        self.wsgi_app = wsgi_app
+        self.executor = ThreadPoolExecutor(
+            max_workers=max_threads, thread_name_prefix="asgi-wsgi"
+        )
+
+    async def __call__(self, scope, receive, send) -> None:
+        if scope["type"] == "lifespan":
+            await self._lifespan(receive, send)
+            return
+        if scope["type"] != "http":
+            raise ValueError(f"Unsupported ASGI scope type: {scope['type']}")
+
+        body = bytearray()
+        while True:
+            message = await receive()
+            if message["type"] == "http.disconnect":
+                return
+            body.extend(message.get("body", b""))
+            if not message.get("more_body"):
+                break
+
+        loop = asyncio.get_running_loop()
+        environ = build_environ(scope, bytes(body))
+        response: Dict[str, Any] = {}
+        written: List[bytes] = []
+
+        def start_response(status: str, headers: List[Tuple[str, str]], exc_info=None):
+            if exc_info and response:
+                raise exc_info[1].with_traceback(exc_info[2])
+            response["status"] = int(status.split(" ", 1)[0])
+            response["headers"] = [
+                (name.lower().encode("latin-1"), value.encode("latin-1"))
+                for name, value in headers
+            ]
+            return written.append
+
+        result: Iterable[bytes] = await loop.run_in_executor(
+            self.executor, self.wsgi_app, environ, start_response
+        )
+        # Respostas longas (ex.: /api/stream) param quando o cliente desconecta
+        watcher = asyncio.ensure_future(self._wait_disconnect(receive))
+        try:
+            iterator = iter(result)
+            chunk = await loop.run_in_executor(self.executor, _next_chunk, iterator)
+            await send(
+                {
+                    "type": "http.response.start",
+                    "status": response["status"],
+                    "headers": response["headers"],
+                }
+            )
+            while True:
+                # Bytes passados ao write() do start_response vêm antes do iterável
+                pending, written[:] = written[:], []
+                if chunk is not _DONE:
+                    pending.append(chunk)
+                for data in pending:
+                    if data:
+                        await send({"type": "http.response.body", "body": data, "more_body": True})
+                if chunk is _DONE or watcher.done():
+                    break
+                chunk = await loop.run_in_executor(self.executor, _next_chunk, iterator)
+            if not watcher.done():
+                await send({"type": "http.response.body", "body": b"", "more_body": False})
+        finally:
+            watcher.cancel()
+            close = getattr(result, "close", None)
+            if close is not None:
+                await loop.run_in_executor(self.executor, close)
+
+    @staticmethod
+    async def _wait_disconnect(receive) -> None:
+        while (await receive())["type"] != "http.disconnect":
+            pass
+
+    async def _lifespan(self, receive, send) -> None:
+        while True:
+            message = await receive()
+            if message["type"] == "lifespan.startup":
+                await send({"type": "lifespan.startup.complete"})
+            elif message["type"] == "lifespan.shutdown":
+                self.executor.shutdown(wait=False)
+                await send({"type": "lifespan.shutdown.complete"})
+                return
@@ -0,0 +1,141 @@
+"""
+Cache de resultados em memória
+LRU thread-safe usado para guardar payloads já calculados de cada versão
+dos dados. Falhas simultâneas na mesma chave são coalescidas (single-flight):
+uma thread calcula e as outras esperam pelo mesmo resultado. Além do número
+de entradas, o cache pode ser limitado pelo tamanho total dos valores (weigh)
+"""
+
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Optional
+
+
+class _Flight:
+    """Cálculo em andamento de uma chave, aguardado pelas outras threads"""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.value: Any = None
+        self.error: Optional[BaseException] = None
+
+    def wait(self) -> Any:
+        self.done.wait()
+        if self.error is not None:
+            raise self.error
+        return self.value
+
+
+class LRUCache:
+    """
+    Dicionário LRU com limite de entradas, seguro para múltiplas threads
+
+    Com maxbytes, weigh(valor) dá o tamanho de cada valor: as entradas menos
+    usadas saem até o total caber, e um valor maior que maxbytes sozinho é
+    devolvido sem ser guardado.
+    """
+
+    def __init__(
+        self,
+        maxsize: int = 256,
+        maxbytes: Optional[int] = None,
+        weigh: Optional[Callable[[Any], int]] = None,
+    ):
+        self.maxsize = maxsize
+        self.maxbytes = maxbytes
+        self.weigh = weigh
+        # Soma de weigh() dos valores guardados (0 sem weigh)
+        self.nbytes = 0
+        self.hits = 0
+        self.misses = 0
+        # Requisições que esperaram o cálculo de outra thread
+        self.coalesced = 0
+        self._data: "OrderedDict[Hashable, Any]" = OrderedDict()
+        self._sizes: Dict[Hashable, int] = {}
+        self._inflight: Dict[Hashable, _Flight] = {}
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        with self._lock:
+            try:
+                value = self._data[key]
+            except KeyError:
+                self.misses += 1
+                return None
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key: Hashable, value: Any) -> None:
+        with self._lock:
+            self._put(key, value)
+
+    def _put(self, key: Hashable, value: Any) -> None:
+        self._remove(key)
+        size = self.weigh(value) if self.weigh is not None else 0
+        if self.maxbytes is not None and size > self.maxbytes:
+            return
+        self._data[key] = value
+        self._sizes[key] = size
+        self.nbytes += size
+        while len(self._data) > self.maxsize or (
+            self.maxbytes is not None and self.nbytes > self.maxbytes
+        ):
+            old, _ = self._data.popitem(last=False)
+            self.nbytes -= self._sizes.pop(old)
+
+    def _remove(self, key: Hashable) -> Optional[Any]:
+        value = self._data.pop(key, None)
+        self.nbytes -= self._sizes.pop(key, 0)
+        return value
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+            self._sizes.clear()
+            self.nbytes = 0
+
+    def pop(self, key: Hashable) -> Optional[Any]:
+        with self._lock:
+            return self._remove(key)
+
+    def get_or_compute(self, key: Hashable, compute: Callable[[], Any]) -> Any:
+        """
+        Retorna o valor cacheado ou calcula e guarda
+
+        Se outra thread já está calculando a mesma chave, espera e devolve o
+        resultado dela (ou a mesma exceção) em vez de calcular de novo.
+        """
+        with self._lock:
+            if key in self._data:
+                self._data.move_to_end(key)
+                self.hits += 1
+                return self._data[key]
+            flight = self._inflight.get(key)
+            leader = flight is None
+            if leader:
+                self.misses += 1
+                flight = self._inflight[key] = _Flight()
+            else:
+                self.coalesced += 1
+        if not leader:
+            return flight.wait()
+
+        try:
+            value = compute()
+        except BaseException as e:
+            with self._lock:
+                del self._inflight[key]
+            flight.error = e
+            flight.done.set()
+            raise
+        with self._lock:
+            # Guarda antes de liberar a chave: quem chegar depois acha o valor
+            self._put(key, value)
+            del self._inflight[key]
+        flight.value = value
+        flight.done.set()
+        return value
+
+    def __len__(self) -> int:
+        return len(self._data)
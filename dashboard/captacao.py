@@ -0,0 +1,147 @@
+"""
+Motor de captação por somas prefixadas
+Materializa, por banker, as entradas diárias (fluxos USD > 0) e os aportes de
+clientes novos em arrays densos sobre um eixo de datas comum, com as somas
+acumuladas pré-calculadas. A captação de qualquer janela vira uma subtração
+cum[hi] - cum[lo] e a curva acumulada vira uma fatia do array
+"""
+
+import copy
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from dashboard.pl_store import PLStore
+from dashboard.resample import period_bounds, period_keys
+
+
+def _cumsum0(daily: np.ndarray) -> np.ndarray:
+    """Soma acumulada com uma coluna zero à esquerda: cum[..., k] = sum(daily[..., :k])"""
+    pad = [(0, 0)] * (daily.ndim - 1) + [(1, 0)]
+    return np.pad(daily, pad).cumsum(axis=-1)
+
+
+class CaptacaoEngine:
+    """
+    Captação diária e acumulada por banker
+
+    Attributes:
+        dates: eixo de datas (união das datas do P&L e dos fluxos)
+        in_pl: datas do eixo que existem no arquivo de P&L
+        banker_names: mesma ordem de PLStore.banker_names
+        banker_daily / banker_cum: captação diária e acumulada (bankers × datas)
+        banker_has_flow: células com algum fluxo positivo
+        total_daily / total_cum / total_has_flow: idem para a captação total
+    """
+
+    def __init__(
+        self,
+        pl: PLStore,
+        flow_dates: np.ndarray,
+        flow_values: np.ndarray,
+        flow_codes: np.ndarray,
+        base_date: str,
+    ):
+        """
+        Args:
+            pl: P&L colunar (eixo de datas, bankers e primeiras datas)
+            flow_dates, flow_values: fluxos positivos (YYYY-MM-DD, USD) na ordem do arquivo
+            flow_codes: índice em pl.banker_names do banker de cada fluxo
+            base_date: data da carteira inicial (não conta como cliente novo)
+        """
+        self.banker_names = pl.banker_names
+        n_bankers = len(self.banker_names)
+
+        flow_dates = flow_dates.astype("<U10")
+        self.dates = np.union1d(pl.dates, flow_dates).astype("<U10")
+        self.date_list = self.dates.tolist()
+        n_dates = len(self.dates)
+
+        pl_pos = np.searchsorted(self.dates, pl.dates)
+        self.in_pl = np.zeros(n_dates, dtype=bool)
+        self.in_pl[pl_pos] = True
+
+        flow_pos = np.searchsorted(self.dates, flow_dates)
+
+        inflows = np.zeros((n_bankers, n_dates), dtype=np.float64)
+        flow_counts = np.zeros((n_bankers, n_dates), dtype=np.int64)
+        total_inflows = np.zeros(n_dates, dtype=np.float64)
+        np.add.at(inflows, (flow_codes, flow_pos), flow_values)
+        np.add.at(flow_counts, (flow_codes, flow_pos), 1)
+        np.add.at(total_inflows, flow_pos, flow_values)
+        self.banker_has_flow = flow_counts > 0
+        self.total_has_flow = self.banker_has_flow.any(axis=0)
+
+        # Aportes de clientes novos: valor na primeira data com P&L, exceto
+        # quem já estava na carteira inicial (base_date)
+        first = pl.first_valid_index()
+        rows = np.flatnonzero(first >= 0)
+        rows = rows[pl.dates[first[rows]] != base_date]
+        funding_pos = pl_pos[first[rows]]
+        funding_values = pl.values[rows, first[rows]]
+
+        funding = np.zeros((n_bankers, n_dates), dtype=np.float64)
+        np.add.at(funding, (pl.banker_codes[rows], funding_pos), funding_values)
+
+        # Na captação total cada nome de cliente conta uma vez (a última linha vence)
+        last_row: Dict[str, int] = {}
+        for i in rows.tolist():
+            last_row[pl.clients[i]] = i
+        unique = np.isin(rows, list(last_row.values()))
+        total_funding = np.zeros(n_dates, dtype=np.float64)
+        np.add.at(total_funding, funding_pos[unique], funding_values[unique])
+
+        self.banker_daily = inflows + funding
+        self.banker_cum = _cumsum0(self.banker_daily)
+        self.total_daily = total_inflows + total_funding
+        self.total_cum = _cumsum0(self.total_daily)
+
+    def resample(self, granularity: str) -> "CaptacaoEngine":
+        """
+        Captação por período (week/month/quarter): fluxos somados por período,
+        com o eixo rotulado pela última data de cada período
+        """
+        starts, ends = period_bounds(period_keys(self.dates, granularity))
+        resampled = copy.copy(self)
+        if not len(starts):
+            return resampled
+        resampled.dates = self.dates[ends]
+        resampled.date_list = resampled.dates.tolist()
+        resampled.in_pl = np.logical_or.reduceat(self.in_pl, starts)
+        resampled.banker_daily = np.add.reduceat(self.banker_daily, starts, axis=1)
+        resampled.banker_cum = _cumsum0(resampled.banker_daily)
+        resampled.banker_has_flow = np.logical_or.reduceat(self.banker_has_flow, starts, axis=1)
+        resampled.total_daily = np.add.reduceat(self.total_daily, starts)
+        resampled.total_cum = _cumsum0(resampled.total_daily)
+        resampled.total_has_flow = np.logical_or.reduceat(self.total_has_flow, starts)
+        return resampled
+
+    def axis_slice(self, start: Optional[str], end: Optional[str]) -> Tuple[int, int]:
+        """Fatia [lo, hi) do eixo entre start e end (None = aberto)"""
+        if start is None:
+            return 0, 0
+        lo = int(np.searchsorted(self.dates, start, "left"))
+        hi = len(self.dates) if end is None else int(np.searchsorted(self.dates, end, "right"))
+        return lo, max(lo, hi)
+
+    def banker_window_totals(self, lo: int, hi: int) -> np.ndarray:
+        """Captação de cada banker em [lo, hi) em O(1) por banker"""
+        return self.banker_cum[:, hi] - self.banker_cum[:, lo]
+
+    def banker_curve(self, b: int, lo: int, hi: int) -> Tuple[List[str], List[float]]:
+        """
+        Curva acumulada de um banker a partir de lo
+
+        Inclui as datas do P&L e as datas em que o banker teve fluxo.
+        """
+        mask = self.in_pl[lo:hi] | self.banker_has_flow[b, lo:hi]
+        idx = np.flatnonzero(mask) + lo
+        values = self.banker_cum[b, idx + 1] - self.banker_cum[b, lo]
+        return [self.date_list[k] for k in idx.tolist()], values.tolist()
+
+    def total_curve(self, lo: int, hi: int) -> Tuple[List[str], List[float]]:
+        """Curva acumulada da captação total a partir de lo"""
+        mask = self.in_pl[lo:hi] | self.total_has_flow[lo:hi]
+        idx = np.flatnonzero(mask) + lo
+        values = self.total_cum[idx + 1] - self.total_cum[lo]
+        return [self.date_list[k] for k in idx.tolist()], values.tolist()
@@ -0,0 +1,500 @@
+"""
+Camada de dados em memória da API
+Mantém os dados de P&L, NetInflow e perfil dos clientes já convertidos em
+stores colunares e só relê um arquivo quando mtime, tamanho ou hash do
+conteúdo mudam em disco; o JSON parseado é descartado depois da conversão.
+Com o watcher ativo, a recarga acontece em uma thread de fundo que monta o
+snapshot novo por completo e troca uma única referência. Com um diretório de
+warm start, o estado montado é gravado em disco e um processo novo parte dele
+em vez de parsear os JSON (ver dashboard.warm_start); se os arquivos mudaram
+desde a gravação, o estado vira o snapshot anterior da primeira recarga, que
+só parseia os arquivos alterados e guarda a diferença do P&L (?since=)
+"""
+
+import hashlib
+import json
+import os
+import threading
+import time
+from dataclasses import dataclass, field, replace
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from dashboard import warm_start
+from dashboard.deltas import PLDiff
+from dashboard.netinflow_store import NetInflowStore
+from dashboard.pl_store import BankerRollup, PLStore
+
+
+def _read_only(store: Any) -> Any:
+    """Marca os arrays numpy de um store como somente leitura"""
+    for value in list(vars(store).values()):
+        if isinstance(value, np.ndarray):
+            value.flags.writeable = False
+        elif hasattr(value, "codes"):
+            _read_only(value)
+    return store
+
+
+@dataclass(frozen=True)
+class FileSignature:
+    """Identidade de um arquivo em disco"""
+
+    mtime_ns: int
+    size: int
+    sha256: str
+
+
+def parse_json_file(raw: bytes) -> Any:
+    """Parser padrão para os arquivos JSON dos pipelines"""
+    return json.loads(raw.decode("utf-8"))
+
+
+def parse_cliente_perfil(raw: bytes) -> List[List[str]]:
+    """Quebra o cliente_perfil.txt em linhas de campos (sem o header)"""
+    lines = raw.decode("utf-8").splitlines()
+    return [[p.strip() for p in line.split(",")] for line in lines[1:]]
+
+
+class CachedFile:
+    """
+    Identidade (mtime, tamanho, hash) de um arquivo e o último conteúdo aceito
+
+    Guarda só a assinatura: um conteúdo novo é parseado e entregue uma única
+    vez ao montador do snapshot (take()), que o converte e o descarta. Os
+    pipelines reescrevem os arquivos no lugar, então uma leitura pode pegar
+    o arquivo pela metade. Uma versão nova só é aceita se o arquivo está
+    parado há pelo menos `settle_seconds`, não mudou durante a leitura e
+    parseia sem erro; caso contrário o valor anterior continua valendo e a
+    leitura é tentada de novo na próxima verificação.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        parser: Callable[[bytes], Any],
+        default: Any,
+        settle_seconds: float = 0.0,
+    ):
+        self.path = path
+        self.parser = parser
+        self.default = default
+        self.settle_seconds = settle_seconds
+        self.signature: Optional[FileSignature] = None
+        # Conteúdo parseado ainda não consumido por take()
+        self._pending: Any = None
+        self.error: Optional[str] = None
+        # (mtime, tamanho) da última versão recusada por erro de parse
+        self.rejected: Optional[Tuple[int, int]] = None
+
+    def _stat(self) -> Optional[Tuple[int, int]]:
+        try:
+            st = os.stat(self.path)
+        except OSError:
+            return None
+        return st.st_mtime_ns, st.st_size
+
+    def disk_signature(self) -> Optional[FileSignature]:
+        """Assinatura do conteúdo atual em disco, sem parsear (None se ausente)"""
+        stat = self._stat()
+        if stat is None:
+            return None
+        with open(self.path, "rb") as f:
+            raw = f.read()
+        if self._stat() != stat:
+            return None
+        return FileSignature(stat[0], stat[1], hashlib.sha256(raw).hexdigest())
+
+    def is_stale(self) -> bool:
+        """Compara mtime e tamanho com a última leitura (não lê o arquivo)"""
+        stat = self._stat()
+        if stat is None:
+            return self.signature is not None or self.error is None
+        if self.signature is None:
+            return True
+        if stat == self.rejected:
+            return False
+        return stat != (self.signature.mtime_ns, self.signature.size)
+
+    def refresh(self) -> bool:
+        """
+        Relê o arquivo se ele mudou em disco
+
+        Returns:
+            True se o conteúdo parseado mudou
+        """
+        stat = self._stat()
+        if stat is None:
+            changed = self.signature is not None or self.error is None
+            self.signature = None
+            self._pending = self.default
+            self.error = f"arquivo não encontrado em {self.path}"
+            return changed
+
+        if self.signature and stat == (self.signature.mtime_ns, self.signature.size):
+            return False
+        if stat == self.rejected:
+            return False
+
+        # Com uma versão anterior em mãos, só aceita arquivos parados; na
+        # primeira carga qualquer conteúdo válido é melhor que nenhum
+        has_previous = self.signature is not None
+        if has_previous and time.time() - stat[0] / 1e9 < self.settle_seconds:
+            # Escrita recente, possivelmente em andamento
+            return False
+
+        with open(self.path, "rb") as f:
+            raw = f.read()
+        if has_previous and self._stat() != stat:
+            # O arquivo mudou durante a leitura
+            return False
+        digest = hashlib.sha256(raw).hexdigest()
+
+        if self.signature and digest == self.signature.sha256:
+            # Só o mtime mudou (ex.: checkout do git); conteúdo igual
+            self.signature = FileSignature(stat[0], stat[1], digest)
+            return False
+
+        try:
+            value = self.parser(raw)
+        except Exception as e:
+            self.error = str(e)
+            self.rejected = stat
+            if self.signature is None:
+                # Sem versão boa anterior: segue com o valor padrão
+                self.signature = FileSignature(stat[0], stat[1], digest)
+                self._pending = self.default
+                return True
+            # Mantém a última versão boa até o arquivo mudar de novo
+            return False
+
+        self.signature = FileSignature(stat[0], stat[1], digest)
+        self._pending = value
+        self.error = None
+        return True
+
+    def take(self) -> Any:
+        """
+        Entrega o conteúdo parseado pela última refresh() que mudou algo
+
+        A referência é solta na entrega: depois de convertido em store, o
+        JSON parseado pode ser coletado. Sem conteúdo pendente (ex.: estado
+        vindo do warm start) retorna o valor padrão.
+        """
+        value, self._pending = self._pending, None
+        return self.default if value is None else value
+
+
+@dataclass(frozen=True)
+class Snapshot:
+    """
+    Conjunto consistente dos dados parseados em um momento
+
+    Imutável depois de criado (arrays somente leitura): threads concorrentes
+    leem o mesmo snapshot sem locks.
+    """
+
+    cliente_perfil: List[List[str]]
+    pl: PLStore
+    netinflow: NetInflowStore
+    version: str
+    loaded_at: float
+    # Diferenças do P&L das últimas recargas, a mais recente por último
+    pl_diffs: Tuple[PLDiff, ...] = ()
+    # sha256 de cada arquivo usado (None = ausente); stores de arquivos que
+    # não mudaram são reaproveitados na recarga seguinte
+    sources: Dict[str, Optional[str]] = field(default_factory=dict)
+    # Montado a partir do estado em disco (warm start)
+    warm_start: bool = False
+
+
+class DataStore:
+    """
+    Cache de processo para os arquivos de dados do dashboard
+
+    Sem watcher, cada chamada a snapshot() faz um stat por arquivo e recarrega
+    na própria requisição quando algo mudou. Com start_watcher(), uma thread de
+    fundo verifica os arquivos, monta o snapshot novo (e roda os hooks de
+    preparo) fora do caminho das requisições e troca a referência de uma vez:
+    snapshot() vira uma leitura de atributo, e requisições em andamento
+    terminam no snapshot antigo. Com pin(), o processo fica no snapshot que já
+    tem e outro processo cuida das recargas (workers do gunicorn: o master
+    recarrega e troca os workers).
+    """
+
+    def __init__(
+        self,
+        pl_path: str,
+        netinflow_path: str,
+        cliente_perfil_path: str,
+        settle_seconds: float = 0.0,
+        diff_history: int = 0,
+        warm_start_dir: Optional[str] = None,
+    ):
+        """
+        Args:
+            settle_seconds: tempo parado exigido de um arquivo alterado antes da leitura
+            diff_history: quantas diferenças do P&L entre recargas manter (?since=)
+            warm_start_dir: onde gravar/ler o estado montado (None desliga)
+        """
+        self.files: Dict[str, CachedFile] = {
+            "pl": CachedFile(pl_path, parse_json_file, [], settle_seconds),
+            "netinflow": CachedFile(netinflow_path, parse_json_file, [], settle_seconds),
+            "cliente_perfil": CachedFile(
+                cliente_perfil_path, parse_cliente_perfil, [], settle_seconds
+            ),
+        }
+        self.diff_history = diff_history
+        self.warm_start_dir = warm_start_dir
+        self.reload_count = 0
+        self.loaded_at: Optional[float] = None
+        # Duração da última recarga completa (leitura, parse e preparo)
+        self.last_load_seconds: Optional[float] = None
+        # Chamados com o snapshot novo antes da troca (ex.: pré-calcular painéis)
+        self.prepare_hooks: List[Callable[[Snapshot], None]] = []
+        # Chamados depois da troca (ex.: avisar clientes de que há dados novos)
+        self.publish_hooks: List[Callable[[Snapshot], None]] = []
+        self._snapshot: Optional[Snapshot] = None
+        self._lock = threading.Lock()
+        self._watcher: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+        # Snapshot fixo: snapshot() não olha os arquivos (ver pin())
+        self.pinned = False
+
+    def _version(self) -> str:
+        h = hashlib.sha256()
+        for name, cached in sorted(self.files.items()):
+            sig = cached.signature
+            h.update(f"{name}:{sig.sha256 if sig else '-'};".encode())
+        return h.hexdigest()[:16]
+
+    def _sources(self) -> Dict[str, Optional[str]]:
+        return {
+            name: cached.signature.sha256 if cached.signature else None
+            for name, cached in self.files.items()
+        }
+
+    def _prepare(self, snapshot: Snapshot) -> Snapshot:
+        for hook in self.prepare_hooks:
+            try:
+                hook(snapshot)
+            except Exception as e:
+                print(f"Erro ao preparar snapshot {snapshot.version}: {e}")
+        self.reload_count += 1
+        self.loaded_at = snapshot.loaded_at
+        return snapshot
+
+    def _build(self, last: Optional[Snapshot]) -> Snapshot:
+        now = time.time()
+        version = self._version()
+        sources = self._sources()
+
+        def unchanged(name: str) -> bool:
+            return last is not None and last.sources.get(name, "") == sources[name]
+
+        if unchanged("pl"):
+            pl = last.pl
+        else:
+            pl = PLStore.from_records(self.files["pl"].take())
+            # Rollup por banker incremental em relação ao snapshot anterior
+            pl.rollup = BankerRollup.update(last.pl if last is not None else None, pl)
+        diffs: Tuple[PLDiff, ...] = ()
+        if last is not None and self.diff_history > 0:
+            diff = PLDiff.between(last.pl, pl, last.version, version, last.loaded_at, now)
+            diffs = (last.pl_diffs + (diff,))[-self.diff_history :]
+        if unchanged("netinflow"):
+            netinflow = last.netinflow
+        else:
+            netinflow = NetInflowStore.from_records(self.files["netinflow"].take())
+        snapshot = Snapshot(
+            cliente_perfil=(
+                last.cliente_perfil
+                if unchanged("cliente_perfil")
+                else self.files["cliente_perfil"].take()
+            ),
+            pl=_read_only(pl),
+            netinflow=_read_only(netinflow),
+            version=version,
+            loaded_at=now,
+            pl_diffs=diffs,
+            sources=sources,
+        )
+        return self._prepare(snapshot)
+
+    def _load_warm_start(self) -> Tuple[Optional[Snapshot], bool]:
+        """
+        Snapshot a partir do estado em disco
+
+        Os arquivos são lidos só para conferir o hash; os que batem com o
+        estado ficam marcados como carregados e não são parseados.
+
+        Returns:
+            (snapshot, atual): atual=True se nenhum arquivo mudou e o snapshot
+            pode ser publicado; False se ele é de uma versão anterior e só
+            serve de base para _build(). (None, False) sem estado utilizável.
+        """
+        signatures = {name: cached.disk_signature() for name, cached in self.files.items()}
+        if any(sig is None for sig in signatures.values()):
+            return None, False
+        try:
+            state = warm_start.load(self.warm_start_dir)
+        except Exception as e:
+            print(f"Erro ao carregar o estado de warm start: {e}")
+            return None, False
+        if state is None or set(state.sources) != set(self.files):
+            return None, False
+        for name, cached in self.files.items():
+            if state.sources[name] == signatures[name].sha256:
+                cached.signature = signatures[name]
+                cached.error = None
+        snapshot = Snapshot(
+            cliente_perfil=state.cliente_perfil,
+            pl=_read_only(state.pl),
+            netinflow=_read_only(state.netinflow),
+            version=state.version,
+            loaded_at=state.loaded_at,
+            pl_diffs=state.pl_diffs[-self.diff_history :] if self.diff_history > 0 else (),
+            sources=state.sources,
+            warm_start=True,
+        )
+        current = all(cached.signature is not None for cached in self.files.values())
+        if not current:
+            return snapshot, False
+        if self._version() != state.version:
+            for cached in self.files.values():
+                cached.signature = None
+            return None, False
+        return self._prepare(replace(snapshot, loaded_at=time.time())), True
+
+    def _save_warm_start(self, snapshot: Snapshot) -> None:
+        """Grava o estado do snapshot se ele ainda não está em disco"""
+        if any(cached.error for cached in self.files.values()):
+            # Não congela um estado montado com o valor padrão de um arquivo
+            return
+        try:
+            if warm_start.saved_version(self.warm_start_dir) == snapshot.version:
+                return
+            warm_start.save(
+                self.warm_start_dir,
+                snapshot.version,
+                snapshot.sources,
+                snapshot.pl,
+                snapshot.netinflow,
+                snapshot.cliente_perfil,
+                snapshot.loaded_at,
+                snapshot.pl_diffs,
+            )
+        except Exception as e:
+            print(f"Erro ao gravar o estado de warm start: {e}")
+
+    def reload(self) -> bool:
+        """
+        Relê os arquivos alterados e publica um snapshot novo se algo mudou
+
+        Returns:
+            True se um snapshot novo foi publicado
+        """
+        with self._lock:
+            start = time.perf_counter()
+            last = self._snapshot
+            if last is None and self.warm_start_dir:
+                last, current = self._load_warm_start()
+                if current:
+                    self._publish(last, start)
+                    return True
+            changed = False
+            for name, cached in self.files.items():
+                previous_error = cached.error
+                if cached.refresh():
+                    changed = True
+                if cached.error and cached.error != previous_error:
+                    print(f"Erro ao carregar {name}: {cached.error}")
+            if not changed and self._snapshot is not None:
+                return False
+            self._publish(self._build(last), start)
+            if self.warm_start_dir:
+                self._save_warm_start(self._snapshot)
+            return True
+
+    def _publish(self, snapshot: Snapshot, start: float) -> None:
+        # Atribuição de uma referência: leitores veem o snapshot antigo
+        # ou o novo, nunca um estado intermediário
+        self._snapshot = snapshot
+        self.last_load_seconds = time.perf_counter() - start
+        for hook in self.publish_hooks:
+            try:
+                hook(snapshot)
+            except Exception as e:
+                print(f"Erro ao publicar snapshot {snapshot.version}: {e}")
+
+    def snapshot(self) -> Snapshot:
+        """Retorna os dados atuais, recarregando arquivos alterados"""
+        current = self._snapshot
+        if current is not None and (
+            self.watching or self.pinned or not any(f.is_stale() for f in self.files.values())
+        ):
+            return current
+        self.reload()
+        return self._snapshot
+
+    @property
+    def watching(self) -> bool:
+        return self._watcher is not None and self._watcher.is_alive()
+
+    def start_watcher(self, interval: float) -> None:
+        """
+        Inicia a thread que recarrega os dados em segundo plano
+
+        Carrega o snapshot inicial antes de retornar. A thread não sobrevive a
+        um fork: num servidor com fork, ligar no processo que recarrega (ex.:
+        master do gunicorn, com os workers em pin()).
+        """
+        if self.watching:
+            return
+        self.snapshot()
+        self._stop.clear()
+        self._watcher = threading.Thread(
+            target=self._watch, args=(interval,), name="datastore-watcher", daemon=True
+        )
+        self._watcher.start()
+
+    def pin(self) -> None:
+        """
+        Fixa o snapshot atual: snapshot() deixa de verificar os arquivos
+
+        Para processos criados por fork depois da carga (workers do gunicorn):
+        recarregar em cada um criaria uma cópia privada dos dados por worker em
+        vez das páginas compartilhadas copy-on-write com o master. Não usa o
+        lock, que pode ter sido herdado travado por uma recarga no master.
+        """
+        self.pinned = True
+
+    def stop_watcher(self) -> None:
+        self._stop.set()
+        if self._watcher is not None:
+            self._watcher.join()
+        self._watcher = None
+
+    def _watch(self, interval: float) -> None:
+        while not self._stop.wait(interval):
+            try:
+                if any(f.is_stale() for f in self.files.values()):
+                    self.reload()
+            except Exception as e:
+                print(f"Erro no watcher de dados: {e}")
+
+    def status(self) -> Dict[str, Any]:
+        """Informações de recarga para inspeção (health check)"""
+        snap = self._snapshot
+        return {
+            "version": snap.version if snap else None,
+            # Snapshot publicado já passou pelos hooks de preparo (caches quentes)
+            "ready": snap is not None,
+            "warmStart": snap.warm_start if snap else False,
+            "reloadCount": self.reload_count,
+            "loadedAt": self.loaded_at,
+            "lastLoadSeconds": self.last_load_seconds,
+            "watching": self.watching,
+            "pinned": self.pinned,
+        }
@@ -0,0 +1,121 @@
+"""
+Diferenças entre snapshots do P&L para respostas incrementais (?since=)
+A cada recarga o DataStore registra quais células (cliente, data) do P&L
+entraram ou mudaram em relação ao snapshot anterior; o snapshot carrega as
+últimas diferenças (um buffer circular imutável), e um cliente que já tem uma
+versão (ou os dados até uma data) baixa só os pontos novos ou reapresentados
+"""
+
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Optional, Sequence, Tuple
+
+import numpy as np
+
+from dashboard.pl_store import PLStore, is_date_key
+
+Cells = Tuple[np.ndarray, np.ndarray]
+
+
+@dataclass(frozen=True)
+class PLDiff:
+    """
+    Células do P&L alteradas entre duas versões dos dados
+
+    Attributes:
+        rows: linha (cliente) de cada célula nova ou alterada; None quando as
+            linhas dos dois snapshots não correspondem (clientes, bankers ou
+            datas removidos) e a diferença não pode ser usada
+        dates: data (YYYY-MM-DD) de cada célula
+    """
+
+    from_version: str
+    to_version: str
+    from_loaded_at: float
+    to_loaded_at: float
+    rows: Optional[np.ndarray]
+    dates: Optional[np.ndarray]
+
+    @classmethod
+    def between(
+        cls,
+        previous: PLStore,
+        store: PLStore,
+        from_version: str,
+        to_version: str,
+        from_loaded_at: float,
+        to_loaded_at: float,
+    ) -> "PLDiff":
+        rows, dates = _diff_cells(previous, store)
+        return cls(from_version, to_version, from_loaded_at, to_loaded_at, rows, dates)
+
+
+def _diff_cells(
+    previous: PLStore, store: PLStore
+) -> Tuple[Optional[np.ndarray], Optional[np.ndarray]]:
+    if (
+        previous.n_clients != store.n_clients
+        or not np.array_equal(previous.clients, store.clients)
+        or not np.array_equal(previous.cpfs, store.cpfs)
+        or not np.array_equal(previous.bankers, store.bankers)
+    ):
+        return None, None
+    # Datas antigas precisam continuar no eixo novo (só se acrescentam datas)
+    old_cols = np.searchsorted(store.dates, previous.dates)
+    if previous.n_dates and (
+        old_cols[-1] >= store.n_dates or not np.array_equal(store.dates[old_cols], previous.dates)
+    ):
+        return None, None
+
+    changed = store.valid.copy()
+    changed[:, old_cols] = (store.filled[:, old_cols] != previous.filled) | (
+        store.valid[:, old_cols] != previous.valid
+    )
+    rows, cols = np.nonzero(changed)
+    return rows.astype(np.int32), store.dates[cols]
+
+
+def changed_cells(
+    diffs: Sequence[PLDiff], since: str, version: str, store: PLStore
+) -> Optional[Cells]:
+    """
+    Células (linha, coluna do eixo atual) novas ou alteradas desde `since`
+
+    since é uma versão dos dados (percorre o buffer até ela) ou uma data
+    YYYY-MM-DD (pontos com data posterior, mais os reapresentados em recargas
+    feitas a partir dela). None quando o buffer não cobre o pedido e a
+    resposta precisa ser completa.
+    """
+    if is_date_key(since):
+        since_ts = datetime.fromisoformat(since).timestamp()
+        if not diffs or diffs[0].from_loaded_at > since_ts:
+            return None
+        recent = [d for d in diffs if d.to_loaded_at >= since_ts]
+        new_rows, new_cols = np.nonzero(store.valid[:, store.dates > since])
+        new_cols += int(np.searchsorted(store.dates, since, "right"))
+        parts = [(new_rows, new_cols)]
+    else:
+        recent = []
+        current = version
+        for d in reversed(diffs):
+            if current == since:
+                break
+            if d.to_version != current:
+                return None
+            recent.append(d)
+            current = d.from_version
+        if current != since:
+            return None
+        parts = []
+
+    for d in recent:
+        if d.rows is None:
+            return None
+        parts.append((d.rows, np.searchsorted(store.dates, d.dates)))
+    if not parts:
+        return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64)
+
+    rows = np.concatenate([p[0] for p in parts]).astype(np.int64)
+    cols = np.concatenate([p[1] for p in parts]).astype(np.int64)
+    keys = np.unique(rows * store.n_dates + cols)
+    return keys // store.n_dates, keys % store.n_dates
@@ -0,0 +1,88 @@
+"""
+Downsampling de séries para gráficos (Largest-Triangle-Three-Buckets)
+Reduz uma série a no máximo N pontos preservando a forma visual: o primeiro
+e o último ponto ficam, e de cada bucket intermediário fica o ponto que forma
+o maior triângulo com o ponto escolhido no bucket anterior e a média do
+bucket seguinte. A implementação processa várias séries de uma vez (linhas
+de uma matriz sobre o mesmo eixo), com um laço só sobre os buckets
+"""
+
+from typing import List
+
+import numpy as np
+
+
+def date_axis(dates: List[str]) -> np.ndarray:
+    """Eixo x numérico (dias) para datas YYYY-MM-DD"""
+    return np.array(dates, dtype="datetime64[D]").astype(np.float64)
+
+
+def lttb_mask(x: np.ndarray, y: np.ndarray, threshold: int) -> np.ndarray:
+    """
+    Pontos escolhidos pelo LTTB em cada série
+
+    Args:
+        x: eixo compartilhado (n,), crescente
+        y: séries (m, n) ou (n,); NaN marca ausência de valor
+        threshold: máximo de pontos por série (>= 3)
+
+    Returns:
+        Máscara booleana com o formato de y; cada série mantém o primeiro e o
+        último ponto válidos e no máximo `threshold` pontos
+    """
+    single = y.ndim == 1
+    y = np.atleast_2d(np.asarray(y, dtype=np.float64))
+    valid = ~np.isnan(y)
+    m, n = y.shape
+    if n <= threshold:
+        return valid[0] if single else valid
+
+    mask = np.zeros((m, n), dtype=bool)
+    rows = np.arange(m)
+    has_any = valid.any(axis=1)
+    first = np.where(has_any, valid.argmax(axis=1), 0)
+    last = np.where(has_any, n - 1 - valid[:, ::-1].argmax(axis=1), 0)
+    mask[rows[has_any], first[has_any]] = True
+    mask[rows[has_any], last[has_any]] = True
+
+    # Buckets intermediários sobre (0, n-1), com limites em aritmética inteira
+    # (o linspace arredonda k * passo para baixo em alguns tamanhos); cada
+    # série começa ancorada no seu primeiro ponto válido
+    edges = 1 + np.arange(threshold - 1, dtype=np.int64) * (n - 2) // (threshold - 2)
+    anchor_x = x[first]
+    anchor_y = y[rows, first]
+    last_x, last_y = x[last], y[rows, last]
+
+    # Médias de todos os buckets de uma vez (o bucket k + 1 é o "próximo" do
+    # bucket k; o último é [n-1, n)), ignorando NaN; bucket sem valor usa o
+    # último ponto da série
+    counts = np.add.reduceat(valid, edges, axis=1)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        avg_ys = np.add.reduceat(np.where(valid, y, 0.0), edges, axis=1) / counts
+        avg_xs = np.add.reduceat(valid * x, edges, axis=1) / counts
+    avg_ys = np.where(counts > 0, avg_ys, last_y[:, None])
+    avg_xs = np.where(counts > 0, avg_xs, last_x[:, None])
+
+    # Datas × séries: cada bucket vira um bloco contíguo de memória
+    y_t = np.ascontiguousarray(y.T)
+    valid_t = ~np.isnan(y_t)
+    positions = np.arange(n)[:, None]
+    for k in range(len(edges) - 1):
+        lo, hi = edges[k], edges[k + 1]
+        if lo >= hi:
+            continue
+        avg_x, avg_y = avg_xs[:, k + 1], avg_ys[:, k + 1]
+
+        xs, ys = x[lo:hi, None], y_t[lo:hi]
+        area = np.abs((anchor_x - avg_x) * (ys - anchor_y) - (anchor_x - xs) * (avg_y - anchor_y))
+        # Só candidatos válidos e dentro do trecho [primeiro, último] da série
+        inside = (positions[lo:hi] > first) & (positions[lo:hi] < last)
+        area = np.where(valid_t[lo:hi] & inside, area, -1.0)
+        best = area.argmax(axis=0)
+        chosen = area[best, rows] >= 0
+        picked = rows[chosen]
+        mask[picked, lo + best[chosen]] = True
+        anchor_x = np.where(chosen, x[lo + best], anchor_x)
+        anchor_y = np.where(chosen, ys[best, rows], anchor_y)
+
+    return mask[0] if single else mask
@@ -0,0 +1,93 @@
+"""
+Cache HTTP das rotas /api
+Cada resposta recebe um ETag forte derivado da versão dos dados, da versão do
+build (código e configuração que mudam as respostas) e da URL, e requisições
+com If-None-Match correspondente recebem 304 sem corpo antes de qualquer
+agregação ser executada. As respostas são no-cache: o navegador guarda o
+corpo mas revalida a cada uso, então dados publicados a qualquer hora chegam
+na próxima requisição ao custo de um 304
+"""
+
+import hashlib
+import os
+from typing import Callable, Iterable
+
+from flask import Flask, Response, g, request
+
+# Cache-Control das respostas 200/304 das rotas cacheáveis
+API_CACHE_CONTROL = "no-cache"
+
+# Rotas que refletem o estado do processo e nunca devem ser cacheadas
+NO_CACHE_PATHS = {"/api/health", "/api/stream", "/api/metrics/internal"}
+NO_CACHE_PREFIXES = ("/api/debug/",)
+# Configuração que muda o corpo das respostas (entra na versão do build)
+RESPONSE_ENV_VARS = ("METRICS_EXCLUDED_BANKERS", "MAX_POINTS", "DATA_DIFF_HISTORY", "APP_VERSION")
+
+
+def build_fingerprint(
+    source_files: Iterable[str], env_vars: Iterable[str] = RESPONSE_ENV_VARS
+) -> str:
+    """
+    Versão do build: hash do código-fonte e das variáveis de ambiente que
+    mudam as respostas
+
+    Usa o conteúdo dos arquivos e não o SHA do git: o commit de dados do
+    workflow diário muda o SHA sem mudar o código, e o deploy no Railway pode
+    não ter o .git.
+    """
+    h = hashlib.sha1()
+    for path in sorted(source_files):
+        with open(path, "rb") as f:
+            h.update(hashlib.sha1(f.read()).digest())
+    for name in env_vars:
+        h.update(f"{name}={os.getenv(name, '')}\0".encode())
+    return h.hexdigest()[:12]
+
+
+def compute_etag(version: str, path: str, query_string: bytes) -> str:
+    """ETag de uma resposta: versão (dados + build) + rota + parâmetros"""
+    h = hashlib.sha1()
+    h.update(version.encode())
+    h.update(b"\0")
+    h.update(path.encode())
+    h.update(b"\0")
+    h.update(query_string)
+    return h.hexdigest()
+
+
+def _is_cacheable_request() -> bool:
+    return (
+        request.method == "GET"
+        and request.path.startswith("/api/")
+        and request.path not in NO_CACHE_PATHS
+        and not request.path.startswith(NO_CACHE_PREFIXES)
+    )
+
+
+def init_app(app: Flask, get_version: Callable[[], str]) -> None:
+    """Registra a validação de ETag e os headers de cache nas rotas /api"""
+
+    @app.before_request
+    def _check_etag():
+        if not _is_cacheable_request():
+            return None
+        etag = compute_etag(get_version(), request.path, request.query_string)
+        g.etag = etag
+        if request.if_none_match.contains(etag):
+            response = Response(status=304)
+            response.set_etag(etag)
+            response.headers["Cache-Control"] = API_CACHE_CONTROL
+            return response
+        return None
+
+    @app.after_request
+    def _set_cache_headers(response: Response) -> Response:
+        etag = g.get("etag")
+        if etag is None or response.status_code == 304:
+            return response
+        if response.status_code == 200:
+            response.set_etag(etag)
+            response.headers["Cache-Control"] = API_CACHE_CONTROL
+        else:
+            response.headers["Cache-Control"] = "no-store"
+        return response
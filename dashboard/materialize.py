@@ -0,0 +1,301 @@
+"""
+Respostas da API pré-renderizadas em arquivos estáticos
+O build do deploy (buildCommand do railway.toml) roda
+`python -m dashboard.materialize` com os dados já commitados pelo workflow
+diário: cada rota /api sem parâmetros (mais variações comuns e janelas de
+datas relativas à última data dos dados) é renderizada pelo próprio app e
+gravada em <out>/<versão>/, opcionalmente também em .gz, com um
+manifest.json apontando a versão das respostas. Os arquivos ficam na imagem
+do deploy e não no git. O app serve esses bytes direto do disco enquanto a
+versão do manifesto for a atual e calcula ao vivo caso contrário.
+
+A versão das respostas combina a versão dos dados com a do build (código e
+configuração que mudam as respostas, ex.: METRICS_EXCLUDED_BANKERS): uma
+variável alterada depois do build não serve os arquivos antigos.
+
+Uso:
+    python -m dashboard.materialize --out backend/data/materialized --gzip
+    python -m dashboard.materialize --out /tmp/static --query "/api/pl/total?start=2025-01-01"
+"""
+
+import argparse
+import gzip
+import json
+import os
+import re
+import shutil
+import sys
+import threading
+import time
+from datetime import date, timedelta
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from urllib.parse import parse_qsl, urlencode
+
+from flask import Flask, Response, request
+
+from dashboard.http_cache import NO_CACHE_PATHS, NO_CACHE_PREFIXES
+
+MANIFEST_NAME = "manifest.json"
+# Intervalo mínimo entre verificações do manifesto em disco
+MANIFEST_CHECK_SECONDS = 2.0
+
+# Variações pré-renderizadas além das rotas sem parâmetros
+COMMON_QUERIES: Dict[str, Tuple[str, ...]] = {
+    "/api/pl/total": ("granularity=week", "granularity=month"),
+    "/api/bankers/evolution": ("granularity=week", "granularity=month"),
+    "/api/clients/evolution": ("granularity=week", "granularity=month", "format=columnar"),
+    "/api/captacao/evolucao": ("granularity=week", "granularity=month"),
+    "/api/bankers/captacao": ("granularity=week", "granularity=month"),
+    # Páginas inicial e de bankers do frontend
+    "/api/dashboard": (
+        "panels=metrics,pl_total,captacao_evolucao,clients_pl",
+        "panels=bankers_captacao,bankers_evolution",
+    ),
+}
+# Rotas que aceitam start/end, pré-renderizadas também nas janelas comuns
+WINDOW_PATHS = (
+    "/api/pl/total",
+    "/api/metrics",
+    "/api/clients/evolution",
+    "/api/bankers/evolution",
+    "/api/captacao/evolucao",
+    "/api/bankers/captacao",
+)
+
+
+def window_queries(last_date: str) -> Tuple[str, ...]:
+    """
+    Janelas comuns terminando na última data dos dados: últimos 30 e 90
+    dias, mês corrente e ano corrente
+    """
+    last = date.fromisoformat(last_date)
+    starts = (
+        last - timedelta(days=29),
+        last - timedelta(days=89),
+        last.replace(day=1),
+        last.replace(month=1, day=1),
+    )
+    return tuple(f"start={start.isoformat()}" for start in dict.fromkeys(starts))
+
+
+def canonical_key(path: str, query: str) -> str:
+    """Chave de uma URL independente da ordem dos parâmetros"""
+    return path + "?" + urlencode(sorted(parse_qsl(query, keep_blank_values=True)))
+
+
+def _filename(key: str) -> str:
+    return re.sub(r"[^A-Za-z0-9]+", "_", key).strip("_")
+
+
+def materialize_urls(
+    app: Flask, extra: List[str] = (), last_date: Optional[str] = None
+) -> List[str]:
+    """
+    Rotas GET /api sem argumentos (exceto as de estado do processo) e variações
+
+    Args:
+        last_date: última data dos dados, para as janelas de WINDOW_PATHS
+    """
+    windows = window_queries(last_date) if last_date else ()
+    urls = []
+    for rule in sorted(app.url_map.iter_rules(), key=lambda r: r.rule):
+        path = rule.rule
+        if (
+            not path.startswith("/api/")
+            or "GET" not in rule.methods
+            or rule.arguments
+            or path in NO_CACHE_PATHS
+            or path.startswith(NO_CACHE_PREFIXES)
+        ):
+            continue
+        urls.append(path)
+        urls.extend(f"{path}?{query}" for query in COMMON_QUERIES.get(path, ()))
+        if path in WINDOW_PATHS:
+            urls.extend(f"{path}?{query}" for query in windows)
+    return urls + list(extra)
+
+
+def materialize(
+    app: Flask,
+    version: str,
+    out_dir: str,
+    compress: bool = False,
+    extra: List[str] = (),
+    last_date: Optional[str] = None,
+) -> Dict[str, Any]:
+    """
+    Renderiza as URLs em out_dir/<version>/ e publica o manifesto
+
+    version é a versão das respostas (dados + build) servida pelo app.
+
+    O manifesto é trocado atomicamente depois de todos os arquivos gravados;
+    diretórios de versões anteriores são removidos em seguida.
+
+    Returns:
+        O manifesto gravado
+    """
+    version_dir = os.path.join(out_dir, version)
+    os.makedirs(version_dir, exist_ok=True)
+    client = app.test_client()
+    files: Dict[str, Dict[str, Any]] = {}
+    # Corpo já gravado -> entrada do manifesto: uma janela que coincide com o
+    # padrão da rota (ex.: 90 dias terminando em 29/01 = start padrão de
+    # 01/11) aponta para o mesmo arquivo em vez de gravar uma cópia
+    written: Dict[Tuple[str, bytes], Dict[str, Any]] = {}
+    # Renderiza ao vivo mesmo que já exista um manifesto desta versão
+    app.config["STATIC_RESPONSES"] = False
+    for url in materialize_urls(app, extra, last_date):
+        path, _, query = url.partition("?")
+        response = client.get(url)
+        if response.status_code != 200:
+            print(f"Ignorando {url}: status {response.status_code}", file=sys.stderr)
+            continue
+        body = response.get_data()
+        key = canonical_key(path, query)
+        if (path, body) in written:
+            files[key] = written[path, body]
+            continue
+        name = _filename(key) + (".json" if response.mimetype == "application/json" else ".bin")
+        with open(os.path.join(version_dir, name), "wb") as f:
+            f.write(body)
+        entry = {"file": f"{version}/{name}", "mimetype": response.mimetype, "gzip": None}
+        if compress:
+            with open(os.path.join(version_dir, name + ".gz"), "wb") as f:
+                f.write(gzip.compress(body, 9, mtime=0))
+            entry["gzip"] = entry["file"] + ".gz"
+        files[key] = written[path, body] = entry
+
+    manifest = {"version": version, "generatedAt": time.time(), "files": files}
+    tmp = os.path.join(out_dir, MANIFEST_NAME + ".tmp")
+    with open(tmp, "w") as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+    os.replace(tmp, os.path.join(out_dir, MANIFEST_NAME))
+
+    for entry in os.listdir(out_dir):
+        path = os.path.join(out_dir, entry)
+        if entry != version and os.path.isdir(path):
+            shutil.rmtree(path, ignore_errors=True)
+    return manifest
+
+
+class StaticResponses:
+    """Manifesto de respostas pré-renderizadas, relido quando muda em disco"""
+
+    def __init__(self, root: str):
+        self.root = root
+        self._manifest: Dict[str, Any] = {}
+        self._mtime_ns: Optional[int] = None
+        self._checked_at = 0.0
+        self._lock = threading.Lock()
+
+    def _refresh(self) -> None:
+        now = time.monotonic()
+        if now - self._checked_at < MANIFEST_CHECK_SECONDS:
+            return
+        with self._lock:
+            self._checked_at = now
+            try:
+                mtime_ns = os.stat(os.path.join(self.root, MANIFEST_NAME)).st_mtime_ns
+            except OSError:
+                self._manifest, self._mtime_ns = {}, None
+                return
+            if mtime_ns == self._mtime_ns:
+                return
+            try:
+                with open(os.path.join(self.root, MANIFEST_NAME)) as f:
+                    self._manifest = json.load(f)
+            except (OSError, ValueError) as e:
+                print(f"Erro ao ler o manifesto de respostas estáticas: {e}")
+                self._manifest = {}
+            self._mtime_ns = mtime_ns
+
+    def lookup(self, version: str, key: str) -> Optional[Dict[str, Any]]:
+        """Entrada do manifesto para a URL, se ele for da versão informada"""
+        self._refresh()
+        manifest = self._manifest
+        if manifest.get("version") != version:
+            return None
+        return manifest.get("files", {}).get(key)
+
+    def read(self, relative: str) -> Optional[bytes]:
+        try:
+            with open(os.path.join(self.root, relative), "rb") as f:
+                return f.read()
+        except OSError:
+            return None
+
+
+def init_app(app: Flask, root: str, get_version: Callable[[], str]) -> StaticResponses:
+    """
+    Serve as respostas pré-renderizadas quando estão na versão atual dos dados
+
+    Registrar depois do http_cache: a validação de ETag (304) vem antes.
+    """
+    static = StaticResponses(root)
+
+    @app.before_request
+    def _serve_static():
+        if not app.config.get("STATIC_RESPONSES", True):
+            return None
+        if request.method != "GET" or not request.path.startswith("/api/"):
+            return None
+        if request.path in NO_CACHE_PATHS or request.path.startswith(NO_CACHE_PREFIXES):
+            # Estado do processo: não força a carga dos dados (ex.: /api/health)
+            return None
+        key = canonical_key(request.path, request.query_string.decode("latin-1"))
+        entry = static.lookup(get_version(), key)
+        if entry is None:
+            return None
+        encoding = None
+        body = None
+        if entry.get("gzip") and "gzip" in request.accept_encodings:
+            body = static.read(entry["gzip"])
+            encoding = "gzip" if body is not None else None
+        if body is None:
+            body = static.read(entry["file"])
+        if body is None:
+            # Arquivo removido por um materialize mais novo: calcula ao vivo
+            return None
+        response = Response(body, mimetype=entry["mimetype"])
+        if encoding:
+            response.headers["Content-Encoding"] = encoding
+        if entry.get("gzip"):
+            response.vary.add("Accept-Encoding")
+        return response
+
+    return static
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--out", required=True, help="diretório das respostas estáticas")
+    parser.add_argument("--gzip", action="store_true", help="grava também as versões .gz")
+    parser.add_argument(
+        "--query",
+        action="append",
+        default=[],
+        help="URL extra a pré-renderizar (ex.: /api/pl/total?start=2025-01-01)",
+    )
+    args = parser.parse_args()
+
+    # Saída do app (prints) não mistura com o resumo
+    stdout, sys.stdout = sys.stdout, sys.stderr
+    import app as app_module
+
+    version = app_module.response_version()
+    dates = app_module.data_store.snapshot().pl.date_list
+    manifest = materialize(
+        app_module.app,
+        version,
+        args.out,
+        args.gzip,
+        args.query,
+        last_date=dates[-1] if dates else None,
+    )
+    stdout.write(
+        json.dumps({"version": version, "out": args.out, "files": len(manifest["files"])}) + "\n"
+    )
+
+
+if __name__ == "__main__":
+    main()
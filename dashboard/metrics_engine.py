@@ -0,0 +1,185 @@
+"""
+Motor vetorizado das métricas do dashboard (/api/metrics)
+Pré-calcula, uma vez por versão dos dados, o banker de cada cliente (com o
+override do cliente_perfil.txt), os fluxos positivos ordenados por data e os
+aportes de clientes novos; cada requisição vira somas por banker (bincount)
+sobre fatias obtidas por busca binária e um argpartition para o Top N
+"""
+
+from typing import Any, Collection, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from dashboard.netinflow_store import INVALID_DAY, NetInflowStore, days_to_dates
+from dashboard.pl_store import PLStore
+
+
+class MetricsEngine:
+    """
+    Dados pré-indexados para as métricas principais
+
+    Attributes:
+        banker_names: bankers após o override do cliente_perfil.txt
+        flow_dates / flow_values / flow_bankers: entradas (USD > 0) de clientes
+            com banker, ordenadas por data
+        funding_dates / funding_values / funding_bankers: primeira posição
+            positiva de cada cliente que não estava na carteira inicial,
+            ordenadas por data
+    """
+
+    def __init__(
+        self,
+        pl: PLStore,
+        netinflow: NetInflowStore,
+        perfil_bankers: Dict[str, str],
+        base_date: str,
+    ):
+        self.pl = pl
+
+        # Um banker por nome de cliente (a última linha do P&L vence)
+        cliente_to_banker: Dict[str, Any] = {
+            nome: perfil_bankers.get(nome, banker)
+            for nome, banker in zip(pl.clients, pl.bankers)
+        }
+        self.banker_names: List[Any] = list(dict.fromkeys(cliente_to_banker.values()))
+        banker_index = {b: i for i, b in enumerate(self.banker_names)}
+        n_bankers = len(self.banker_names)
+
+        # Fluxos positivos de clientes com banker, ordenados por data
+        flow_bankers = np.full(len(netinflow.client.categories), -1, dtype=np.int64)
+        for nome, banker in cliente_to_banker.items():
+            c = netinflow.client.index.get(nome)
+            if c is not None and banker:
+                flow_bankers[c] = banker_index[banker]
+        rows = netinflow.query(positive=True)
+        rows = rows[(netinflow.day[rows] != INVALID_DAY) & (netinflow.client.codes[rows] >= 0)]
+        bankers = flow_bankers[netinflow.client.codes[rows]]
+        rows, bankers = rows[bankers >= 0], bankers[bankers >= 0]
+        order = np.argsort(netinflow.day[rows], kind="stable")
+        self.flow_dates = days_to_dates(netinflow.day[rows][order])
+        self.flow_values = netinflow.usd[rows][order]
+        self.flow_bankers = bankers[order]
+
+        # Clientes novos: primeira data com valor > 0 diferente da carteira inicial
+        first = pl.first_positive_index()
+        clients = np.flatnonzero(first >= 0)
+        clients = clients[pl.dates[first[clients]] != base_date]
+        order = np.argsort(first[clients], kind="stable")
+        clients = clients[order]
+        self.funding_idx = first[clients]
+        self.funding_dates = pl.dates[self.funding_idx]
+        self.funding_values = pl.values[clients, self.funding_idx]
+        self.funding_bankers = np.array(
+            [banker_index[cliente_to_banker[pl.clients[i]]] for i in clients.tolist()],
+            dtype=np.int64,
+        )
+
+        # Banker de cada linha do P&L, para o proxy de P&L inicial
+        self.client_bankers = np.array(
+            [banker_index[cliente_to_banker[nome]] for nome in pl.clients],
+            dtype=np.int64,
+        )
+        self.n_bankers = n_bankers
+
+    def _flow_totals(self, start: str, end: str) -> Tuple[np.ndarray, np.ndarray]:
+        lo = int(np.searchsorted(self.flow_dates, start, "left"))
+        hi = int(np.searchsorted(self.flow_dates, end, "right"))
+        codes = self.flow_bankers[lo:hi]
+        return (
+            np.bincount(codes, self.flow_values[lo:hi], minlength=self.n_bankers),
+            np.bincount(codes, minlength=self.n_bankers),
+        )
+
+    def _funding_totals(
+        self, start: str, end_idx: Optional[int]
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        lo = int(np.searchsorted(self.funding_dates, start, "left"))
+        hi = (
+            len(self.funding_idx)
+            if end_idx is None
+            else int(np.searchsorted(self.funding_idx, end_idx, "right"))
+        )
+        codes = self.funding_bankers[lo:max(lo, hi)]
+        return (
+            np.bincount(codes, self.funding_values[lo:max(lo, hi)], minlength=self.n_bankers),
+            np.bincount(codes, minlength=self.n_bankers),
+        )
+
+    def compute(
+        self,
+        first: int,
+        last: int,
+        periodo: Tuple[str, str],
+        ranking: Tuple[str, str],
+        bounded: bool,
+        excluded: Collection[str] = (),
+        top_n: int = 3,
+    ) -> Dict[str, Any]:
+        """
+        Calcula as métricas para uma janela do eixo de datas do P&L
+
+        Args:
+            first, last: índices da primeira e última data da janela
+            periodo: (início, fim) da "Captação do Período"
+            ranking: (início, fim) do ranking de bankers
+            bounded: se True, clientes novos após `last` não contam
+            excluded: bankers fora do ranking (continuam na captação total)
+            top_n: tamanho do ranking
+        """
+        pl = self.pl
+        end_idx = last if bounded else None
+
+        periodo_flows, periodo_flow_count = self._flow_totals(*periodo)
+        ranking_flows, ranking_flow_count = self._flow_totals(*ranking)
+        periodo_funding, periodo_funding_count = self._funding_totals(periodo[0], end_idx)
+        ranking_funding, ranking_funding_count = self._funding_totals(ranking[0], end_idx)
+
+        periodo_total = periodo_flows + periodo_funding
+        ranking_total = ranking_flows + ranking_funding
+        periodo_present = (periodo_flow_count + periodo_funding_count) > 0
+        ranking_present = (ranking_flow_count + ranking_funding_count) > 0
+
+        # Sem nenhuma captação: P&L inicial positivo como proxy
+        if not periodo_present.any() and not ranking_present.any():
+            pl_inicial = pl.filled[:, first]
+            proxy = pl.valid[:, first] & (pl_inicial > 0)
+            codes = self.client_bankers[proxy]
+            periodo_total = np.bincount(codes, pl_inicial[proxy], minlength=self.n_bankers)
+            ranking_total = periodo_total
+            periodo_present = ranking_present = (
+                np.bincount(codes, minlength=self.n_bankers) > 0
+            )
+
+        # Top N por captação no período do ranking (argpartition + ordenação só do topo)
+        excluded = set(excluded)
+        eligible = ranking_present & np.array(
+            [b not in excluded for b in self.banker_names], dtype=bool
+        )
+        candidates = np.flatnonzero(eligible) if top_n > 0 else np.empty(0, np.int64)
+        if len(candidates) > top_n:
+            part = np.argpartition(-ranking_total[candidates], top_n - 1)[:top_n]
+            candidates = candidates[part]
+        top = candidates[np.lexsort((candidates, -ranking_total[candidates]))]
+
+        pl_primeira = float(pl.filled[:, first].sum())
+        pl_ultima = float(pl.filled[:, last].sum())
+        clientes_primeira = int(pl.valid[:, first].sum())
+        clientes_ultima = int(pl.valid[:, last].sum())
+
+        return {
+            "totalClientes": clientes_ultima,
+            "novosClientes": max(0, clientes_ultima - clientes_primeira),
+            "plTotal": round(pl_ultima, 2),
+            "plVariacao": round(
+                ((pl_ultima - pl_primeira) / pl_primeira * 100) if pl_primeira else 0,
+                2,
+            ),
+            # Captação total do período mantém contribuições de todos os bankers
+            "captacaoPeriodo": round(float(periodo_total[periodo_present].sum()), 2),
+            "top3Bankers": [
+                {"nome": self.banker_names[b], "captacao": round(float(ranking_total[b]), 2)}
+                for b in top.tolist()
+            ],
+            "periodoInicio": pl.date_list[first],
+            "periodoFim": pl.date_list[last],
+        }
@@ -0,0 +1,203 @@
+"""
+Armazenamento tipado dos fluxos de NetInflow
+Converte o net_inflow_raw.json (lista de dicts com chaves net_inflow.*) em
+colunas numpy: datas como dias int32, valores float64 e campos de texto como
+códigos categóricos. Uma ordenação (cliente, data) com offsets por cliente
+transforma filtros por cliente/período em buscas binárias
+"""
+
+from typing import Any, Dict, Iterable, List, Optional
+
+import numpy as np
+
+EPOCH = np.datetime64("1970-01-01", "D")
+# Dia usado para datas ausentes ou inválidas (fica fora de qualquer janela)
+INVALID_DAY = np.iinfo(np.int32).min
+# Colunas de texto codificadas como Categorical
+CATEGORICAL_COLUMNS = ("client", "kind", "product", "office")
+
+
+def to_day(date: str) -> int:
+    """Converte YYYY-MM-DD em dias desde 1970-01-01"""
+    return int((np.datetime64(date, "D") - EPOCH).astype(np.int64))
+
+
+def days_to_dates(days: np.ndarray) -> np.ndarray:
+    """Converte dias desde 1970-01-01 de volta para strings YYYY-MM-DD"""
+    return (EPOCH + days.astype("timedelta64[D]")).astype("<U10")
+
+
+def _parse_days(values: Iterable[Any]) -> np.ndarray:
+    days = []
+    for value in values:
+        try:
+            days.append(to_day(value[:10]) if value else INVALID_DAY)
+        except (ValueError, TypeError):
+            days.append(INVALID_DAY)
+    return np.array(days, dtype=np.int32)
+
+
+def _parse_amounts(values: Iterable[Any]) -> np.ndarray:
+    amounts = []
+    for value in values:
+        try:
+            amounts.append(float(value))
+        except (ValueError, TypeError):
+            amounts.append(np.nan)
+    return np.array(amounts, dtype=np.float64)
+
+
+class Categorical:
+    """Coluna de texto codificada como inteiros (código -1 = vazio)"""
+
+    def __init__(self, values: Iterable[Any]):
+        self.categories: List[Any] = []
+        self.index: Dict[Any, int] = {}
+        codes = []
+        for value in values:
+            if value is None or value == "":
+                codes.append(-1)
+                continue
+            code = self.index.get(value)
+            if code is None:
+                code = self.index[value] = len(self.categories)
+                self.categories.append(value)
+            codes.append(code)
+        self.codes = np.array(codes, dtype=np.int32)
+
+    @classmethod
+    def from_codes(cls, categories: List[Any], codes: np.ndarray) -> "Categorical":
+        """Reconstrói a coluna a partir de categorias e códigos já calculados"""
+        column = cls(())
+        column.categories = list(categories)
+        column.index = {value: i for i, value in enumerate(column.categories)}
+        column.codes = codes
+        return column
+
+    def code(self, value: Any) -> int:
+        """Código de um valor (-2 se não existe, nunca casa com nenhuma linha)"""
+        return self.index.get(value, -2)
+
+
+class NetInflowStore:
+    """
+    Fluxos de NetInflow em colunas
+
+    As colunas ficam na ordem do arquivo (somas reproduzem a ordem original);
+    by_client é a permutação ordenada por (cliente, dia) e client_offsets
+    delimita o bloco de cada cliente nessa permutação.
+    """
+
+    def __init__(self, records: List[Dict[str, Any]]):
+        def column(field: str) -> List[Any]:
+            return [r.get(f"net_inflow.{field}") for r in records]
+
+        self.size = len(records)
+        self.day = _parse_days(column("date"))
+        self.usd = _parse_amounts(column("net_inflow_usd"))
+        self.brl = _parse_amounts(column("net_inflow_brl"))
+        self.client = Categorical(column("client_name"))
+        self.kind = Categorical(column("kind"))
+        self.product = Categorical(column("product_type"))
+        self.office = Categorical(column("office_name"))
+        self._build_index()
+
+    def _build_index(self) -> None:
+        # Clientes sem nome (-1) vão para o último bloco
+        client_key = np.where(
+            self.client.codes < 0, len(self.client.categories), self.client.codes
+        )
+        self.by_client = np.lexsort((self.day, client_key))
+        self.sorted_days = self.day[self.by_client]
+        self.client_offsets = np.searchsorted(
+            client_key[self.by_client], np.arange(len(self.client.categories) + 2)
+        )
+
+    @classmethod
+    def from_records(cls, records: List[Dict[str, Any]]) -> "NetInflowStore":
+        return cls(records)
+
+    @classmethod
+    def from_columns(
+        cls,
+        day: np.ndarray,
+        usd: np.ndarray,
+        brl: np.ndarray,
+        categoricals: Dict[str, Categorical],
+    ) -> "NetInflowStore":
+        """
+        Monta o store a partir de colunas já convertidas (ex.: warm start)
+
+        Args:
+            categoricals: colunas client, kind, product e office
+        """
+        store = cls([])
+        store.size = len(day)
+        store.day, store.usd, store.brl = day, usd, brl
+        for name in CATEGORICAL_COLUMNS:
+            setattr(store, name, categoricals[name])
+        store._build_index()
+        return store
+
+    def dates(self, rows: Optional[np.ndarray] = None) -> np.ndarray:
+        """Datas YYYY-MM-DD das linhas (todas se rows for None)"""
+        days = self.day if rows is None else self.day[rows]
+        return days_to_dates(days)
+
+    def client_rows(
+        self, client_code: int, start: Optional[str] = None, end: Optional[str] = None
+    ) -> np.ndarray:
+        """Linhas de um cliente entre start e end (inclusivos) por busca binária"""
+        if client_code < 0 or client_code >= len(self.client.categories):
+            return np.empty(0, dtype=np.int64)
+        lo, hi = self.client_offsets[client_code], self.client_offsets[client_code + 1]
+        block = self.sorted_days[lo:hi]
+        if start is not None:
+            lo += int(np.searchsorted(block, to_day(start), "left"))
+        if end is not None:
+            hi = self.client_offsets[client_code] + int(
+                np.searchsorted(block, to_day(end), "right")
+            )
+        return self.by_client[lo:max(lo, hi)]
+
+    def query(
+        self,
+        clients: Optional[Iterable[str]] = None,
+        start: Optional[str] = None,
+        end: Optional[str] = None,
+        positive: Optional[bool] = None,
+        kind: Optional[str] = None,
+    ) -> np.ndarray:
+        """
+        Linhas que atendem aos filtros, na ordem do arquivo
+
+        Args:
+            clients: nomes dos clientes (None = todos)
+            start, end: período YYYY-MM-DD (inclusivo)
+            positive: True para entradas (USD > 0), False para saídas
+            kind: código do tipo de movimentação (ex.: "C", "D")
+        """
+        if clients is None:
+            rows = np.arange(self.size)
+            if start is not None or end is not None:
+                lo = INVALID_DAY + 1 if start is None else to_day(start)
+                hi = np.iinfo(np.int32).max if end is None else to_day(end)
+                rows = rows[(self.day >= lo) & (self.day <= hi)]
+        else:
+            parts = [
+                self.client_rows(self.client.code(name), start, end)
+                for name in dict.fromkeys(clients)
+            ]
+            rows = np.sort(np.concatenate(parts)) if parts else np.empty(0, np.int64)
+
+        if positive is True:
+            rows = rows[self.usd[rows] > 0]
+        elif positive is False:
+            rows = rows[self.usd[rows] < 0]
+        if kind is not None:
+            rows = rows[self.kind.codes[rows] == self.kind.code(kind)]
+        return rows
+
+    def sum_usd(self, **filters: Any) -> float:
+        """Soma dos valores em USD das linhas filtradas (mesmos filtros de query)"""
+        return float(self.usd[self.query(**filters)].sum())
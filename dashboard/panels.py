@@ -0,0 +1,951 @@
+"""
+Painéis da API do Avenue Dashboard
+Cada painel calcula o payload de uma rota /api a partir de um snapshot dos
+dados; os dados derivados comuns (mapa cliente → banker, emails, fluxos de
+captação, primeiras datas) ficam em um PanelContext compartilhado por todos
+os painéis da mesma versão dos dados
+"""
+
+import os
+import re
+import threading
+from dataclasses import dataclass, replace
+from datetime import date
+from functools import cached_property, partial
+from typing import Any, Callable, Dict, List, Mapping, Optional, Tuple
+
+import numpy as np
+
+from dashboard import deltas, serialization, telemetry
+from dashboard.cache import LRUCache
+from dashboard.downsample import date_axis, lttb_mask
+from dashboard.captacao import CaptacaoEngine
+from dashboard.datastore import Snapshot
+from dashboard.metrics_engine import MetricsEngine
+from dashboard.netinflow_store import INVALID_DAY
+from dashboard.pl_store import PLStore
+from dashboard.resample import GRANULARITIES
+from dashboard.serialization import round2
+from dashboard.single_flight import SharedRenders
+
+PanelResult = Tuple[Dict[str, Any], int]
+
+# Início padrão da janela de exibição dos gráficos
+DISPLAY_START_DATE = "2025-12-01"
+# Início padrão da evolução de captação por banker
+CAPTACAO_START_DATE = "2025-11-01"
+# Data da carteira inicial: clientes com primeira posição nela não contam como novos
+BASE_CLIENTES_DATE = "2025-12-01"
+# Fim padrão da "Captação do Período" e do ranking quando não há end/as_of
+PERIODO_CAPTACAO_FIM = "2026-01-31"
+# Início do ranking de Top 3 Bankers (período maior que o da métrica)
+TOP_BANKERS_INICIO = "2025-11-01"
+# Formatos das séries: um objeto por ponto (padrão), colunar ou binário
+FORMATS = ("json", "columnar", "binary")
+# Limite de ?points= (pontos por série nos gráficos)
+MAX_POINTS = int(os.getenv("MAX_POINTS", "5000"))
+# Limite, por versão dos dados, dos bytes das respostas guardadas em memória:
+# janelas arbitrárias (?start=/?end=) criam chaves novas a cada pedido
+RENDER_CACHE_BYTES = int(os.getenv("RENDER_CACHE_MB", "64")) * 1024 * 1024
+# Tamanho do ranking de bankers em /api/metrics
+TOP_BANKERS_N = 3
+# Bankers fora do ranking (continuam contando na captação total do período)
+METRICS_EXCLUDED_BANKERS = [
+    b.strip()
+    for b in os.getenv("METRICS_EXCLUDED_BANKERS", "Alan Finazzi Sbeghen").split(",")
+    if b.strip()
+]
+
+
+@dataclass(frozen=True)
+class PanelParams:
+    """Parâmetros de período, granularidade, downsampling e formato das séries temporais"""
+
+    start: Optional[str] = None
+    end: Optional[str] = None
+    as_of: Optional[str] = None
+    points: Optional[int] = None
+    granularity: str = "day"
+    format: str = "json"
+    since: Optional[str] = None
+
+    @classmethod
+    def from_args(cls, args: Mapping[str, str]) -> "PanelParams":
+        """Lê os parâmetros da query string (levanta ValueError se inválidos)"""
+        values: Dict[str, Any] = {}
+        for name in ("start", "end", "as_of"):
+            raw = args.get(name)
+            if raw:
+                try:
+                    values[name] = date.fromisoformat(raw).isoformat()
+                except ValueError:
+                    raise ValueError(f"Invalid date for {name}: {raw} (expected YYYY-MM-DD)")
+        raw = args.get("points")
+        if raw:
+            try:
+                points = int(raw)
+            except ValueError:
+                points = 0
+            if not 3 <= points <= MAX_POINTS:
+                raise ValueError(
+                    f"Invalid value for points: {raw} (expected an integer from 3 to {MAX_POINTS})"
+                )
+            values["points"] = points
+        raw = args.get("granularity")
+        if raw:
+            if raw not in GRANULARITIES:
+                raise ValueError(
+                    f"Invalid granularity: {raw} (expected one of {', '.join(GRANULARITIES)})"
+                )
+            values["granularity"] = raw
+        raw = args.get("format")
+        if raw:
+            if raw not in FORMATS:
+                raise ValueError(f"Invalid format: {raw} (expected one of {', '.join(FORMATS)})")
+            values["format"] = raw
+        raw = args.get("since")
+        if raw:
+            try:
+                values["since"] = date.fromisoformat(raw).isoformat()
+            except ValueError:
+                if not re.fullmatch(r"[0-9a-f]{16}", raw):
+                    raise ValueError(
+                        f"Invalid value for since: {raw} (expected a data version or YYYY-MM-DD)"
+                    )
+                values["since"] = raw
+            if {"points", "format"} & values.keys() or values.get("granularity", "day") != "day":
+                raise ValueError("since cannot be combined with points, granularity or format")
+        return cls(**values)
+
+
+@dataclass(frozen=True)
+class DateWindow:
+    """
+    Janela resolvida sobre o eixo de datas do P&L
+
+    Attributes:
+        lo, hi: fatia [lo, hi) do eixo de datas
+        bounded: True quando end/as_of limitam a janela (senão ela é aberta e
+            fluxos posteriores à última data do P&L continuam entrando)
+        points: máximo de pontos por série nos painéis de evolução (None = todos)
+        granularity: eixo em que lo/hi foram resolvidos (day ou o período do
+            PLStore reamostrado)
+        format: formato das séries nos painéis de evolução (ver FORMATS)
+        since: versão dos dados ou data a partir da qual devolver só as
+            mudanças (DELTA_PANELS)
+        start, end: datas pedidas (start sem o padrão do painel; end já
+            combinado com as_of), usadas pelos painéis de captação, cujo eixo
+            inclui datas de fluxos fora do eixo do P&L, e pelas métricas
+            (REQUESTED_WINDOW_PANELS)
+    """
+
+    lo: int
+    hi: int
+    bounded: bool
+    points: Optional[int] = None
+    granularity: str = "day"
+    format: str = "json"
+    since: Optional[str] = None
+    start: Optional[str] = None
+    end: Optional[str] = None
+
+    @property
+    def empty(self) -> bool:
+        return self.lo >= self.hi
+
+
+def resolve_window(
+    store: PLStore, params: PanelParams, default_start: Optional[str]
+) -> DateWindow:
+    """
+    Resolve start/end/as_of para índices do eixo de datas (busca binária)
+
+    Em um eixo reamostrado, start/end selecionam os períodos pelo rótulo
+    (última data do período).
+    """
+    end = requested_end(params)
+    lo, hi = store.date_slice(params.start or default_start, end)
+    return DateWindow(lo, hi, end is not None)
+
+
+def requested_end(params: PanelParams) -> Optional[str]:
+    """Fim da janela pedido: o menor entre end e as_of (None = aberto)"""
+    end = params.end
+    if params.as_of and (end is None or params.as_of < end):
+        end = params.as_of
+    return end
+
+
+def aggregate_total_pl(store: PLStore, window: "DateWindow") -> Tuple[List[str], np.ndarray]:
+    """Agrega P&L total de todos os clientes por data (apenas datas com valor)"""
+    totals, has_value = store.total_by_date()
+    sl = slice(window.lo, window.hi)
+    has_value = has_value[sl]
+    return store.dates[sl][has_value].tolist(), totals[sl][has_value]
+
+
+def _total_pl_points(ctx: "PanelContext", window: DateWindow) -> Tuple[List[str], np.ndarray]:
+    """P&L total por data, reduzido a window.points pontos quando informado"""
+    totals, has_value = ctx.pl.total_by_date()
+    sl = slice(window.lo, window.hi)
+    keep = ctx.keep_points("pl_total", window, totals[sl], has_value[sl])
+    return ctx.pl.dates[sl][keep].tolist(), totals[sl][keep]
+
+
+def _columnar_series(
+    window: DateWindow,
+    dates: List[str],
+    values: np.ndarray,
+    keep: np.ndarray,
+    series: List[Dict[str, Any]],
+    fields: Dict[str, Any],
+) -> PanelResult:
+    """
+    Séries no formato colunar (format=columnar/binary)
+
+    Um eixo `dates` compartilhado (datas com algum ponto) e, em cada série,
+    `values` alinhado a ele com null nas lacunas; no binário a matriz inteira
+    fica em payload["values"] e é codificada por serialization.dumps_binary
+    """
+    cols = np.flatnonzero(keep.any(axis=0))
+    keep = keep[:, cols]
+    rounded = np.round(values[:, cols], 2)
+    if series:
+        rows = np.arange(len(series))
+        first = keep.argmax(axis=1)
+        last = keep.shape[1] - 1 - keep[:, ::-1].argmax(axis=1)
+        for meta, inicial, final in zip(
+            series, rounded[rows, first].tolist(), rounded[rows, last].tolist()
+        ):
+            meta.update(pl_inicial=inicial, pl_final=final, variacao=round(final - inicial, 2))
+
+    payload = {
+        "success": True,
+        "format": window.format,
+        "dates": [dates[j] for j in cols.tolist()],
+        "data": series,
+        **fields,
+    }
+    if window.format == "binary":
+        payload["values"] = np.where(keep, rounded, np.nan)
+    else:
+        cells = rounded.astype(object)
+        cells[~keep] = None
+        for meta, row in zip(series, cells.tolist()):
+            meta["values"] = row
+    return payload, 200
+
+
+def _delta_series(
+    ctx: "PanelContext",
+    window: DateWindow,
+    rows: np.ndarray,
+    cols: np.ndarray,
+    values: np.ndarray,
+    valid: np.ndarray,
+    describe: Callable[[int], Dict[str, Any]],
+    fields: Dict[str, Any],
+) -> PanelResult:
+    """
+    Resposta incremental (?since=): só as células (série, coluna) alteradas
+
+    values/valid são as matrizes completas séries × datas. Cada série alterada
+    traz em `evolution` os pontos novos ou alterados (value null quando o
+    ponto deixou de existir) e pl_inicial/pl_final/variacao da janela inteira.
+    """
+    dates = ctx.pl.date_list
+    changed, starts = np.unique(rows, return_index=True)
+    data = []
+    if len(changed):
+        window_valid = valid[changed, window.lo : window.hi]
+        has = window_valid.any(axis=1)
+        first = window.lo + window_valid.argmax(axis=1)
+        last = window.hi - 1 - window_valid[:, ::-1].argmax(axis=1)
+        inicial = np.round(values[changed, first], 2).tolist()
+        final = np.round(values[changed, last], 2).tolist()
+        point_values = np.round(values[rows, cols], 2).astype(object)
+        point_values[~valid[rows, cols]] = None
+        groups = zip(np.split(cols, starts[1:]), np.split(point_values, starts[1:]))
+        for k, (i, (group_cols, group_values)) in enumerate(zip(changed.tolist(), groups)):
+            item = describe(i)
+            item["evolution"] = [
+                {"date": dates[j], "value": v}
+                for j, v in zip(group_cols.tolist(), group_values.tolist())
+            ]
+            if has[k]:
+                item.update(
+                    pl_inicial=inicial[k],
+                    pl_final=final[k],
+                    variacao=round(final[k] - inicial[k], 2),
+                )
+            else:
+                item.update(pl_inicial=None, pl_final=None, variacao=None)
+            data.append(item)
+    return {
+        "success": True,
+        "delta": True,
+        "since": window.since,
+        "version": ctx.snapshot.version,
+        "data": data,
+        **fields,
+    }, 200
+
+
+def _evolution_points(
+    dates: List[str], values: np.ndarray, valid: np.ndarray
+) -> List[Dict[str, Any]]:
+    """Lista de pontos {date, value} apenas onde há valor"""
+    return [
+        {"date": dates[j], "value": v}
+        for j, v in zip(np.flatnonzero(valid).tolist(), round2(values[valid]))
+    ]
+
+
+class PanelContext:
+    """
+    Dados derivados de um snapshot, calculados uma única vez por versão
+
+    Para granularidades maiores que "day" há uma visão do contexto (ver
+    resampled) com o P&L e a captação já agregados por período.
+    """
+
+    def __init__(
+        self, snapshot: Snapshot, granularity: str = "day", base: Optional["PanelContext"] = None
+    ):
+        self.snapshot = snapshot
+        self.granularity = granularity
+        self.base = base
+        self.pl = snapshot.pl if base is None else base.pl.resample(granularity)
+        # Respostas já serializadas por (painel, janela resolvida), limitadas
+        # pelo total de bytes dos corpos
+        self.rendered = LRUCache(
+            maxsize=512, maxbytes=RENDER_CACHE_BYTES, weigh=lambda rendered: len(rendered[0])
+        )
+        # Pontos escolhidos pelo downsampling por (série, lo, hi, points)
+        self.downsampled = LRUCache(maxsize=64)
+        self._views: Dict[str, PanelContext] = {}
+        self._views_lock = threading.Lock()
+
+    def resampled(self, granularity: str) -> "PanelContext":
+        """Visão do contexto com as séries agregadas por período"""
+        if granularity == self.granularity:
+            return self
+        view = self._views.get(granularity)
+        if view is None:
+            with self._views_lock:
+                view = self._views.get(granularity)
+                if view is None:
+                    view = PanelContext(self.snapshot, granularity, base=self)
+                    self._views[granularity] = view
+        return view
+
+    def window_dates(self, window: DateWindow) -> List[str]:
+        return self.pl.date_list[window.lo : window.hi]
+
+    def delta_cells(self, window: DateWindow) -> Optional[deltas.Cells]:
+        """Células (cliente, coluna) alteradas desde window.since dentro da janela"""
+        snapshot = self.snapshot
+        cells = deltas.changed_cells(snapshot.pl_diffs, window.since, snapshot.version, self.pl)
+        if cells is None:
+            return None
+        rows, cols = cells
+        inside = (cols >= window.lo) & (cols < window.hi)
+        return rows[inside], cols[inside]
+
+    def keep_points(
+        self, series: str, window: DateWindow, values: np.ndarray, valid: np.ndarray
+    ) -> np.ndarray:
+        """
+        Pontos a exibir de séries sobre as datas da janela
+
+        Sem window.points devolve o próprio `valid`; com ele, a máscara do LTTB
+        (no máximo window.points pontos por linha), em cache por série e N
+        """
+        if window.points is None or window.hi - window.lo <= window.points:
+            return valid
+
+        def compute() -> np.ndarray:
+            x = date_axis(self.pl.dates[window.lo : window.hi])
+            return lttb_mask(x, np.where(valid, values, np.nan), window.points)
+
+        return self.downsampled.get_or_compute(
+            (series, window.lo, window.hi, window.points), compute
+        )
+
+    @cached_property
+    def emails(self) -> Dict[str, str]:
+        """Emails dos clientes (cliente_perfil.txt)"""
+        if self.base is not None:
+            return self.base.emails
+        emails = {}
+        for parts in self.snapshot.cliente_perfil:
+            if len(parts) >= 3:
+                emails[parts[0]] = parts[2]
+        return emails
+
+    @cached_property
+    def perfil_bankers(self) -> Dict[str, str]:
+        """Bankers dos clientes (cliente_perfil.txt)"""
+        bankers = {}
+        for parts in self.snapshot.cliente_perfil:
+            if len(parts) >= 2:
+                bankers[parts[0]] = parts[1]
+        return bankers
+
+    @cached_property
+    def cliente_to_banker(self) -> Dict[str, Any]:
+        """Banker de cada cliente segundo o arquivo de P&L"""
+        return dict(zip(self.pl.clients, self.pl.bankers))
+
+    @cached_property
+    def netinflow_banker_codes(self) -> np.ndarray:
+        """Banker (índice em pl.banker_names) de cada cliente do NetInflow, -1 se nenhum"""
+        netinflow = self.snapshot.netinflow
+        banker_index = {b: i for i, b in enumerate(self.pl.banker_names)}
+        codes = np.full(len(netinflow.client.categories), -1, dtype=np.int64)
+        for nome, banker in self.cliente_to_banker.items():
+            c = netinflow.client.index.get(nome)
+            if c is not None and banker:
+                codes[c] = banker_index[banker]
+        return codes
+
+    @cached_property
+    def metrics_engine(self) -> MetricsEngine:
+        """Índices pré-calculados para /api/metrics"""
+        return MetricsEngine(
+            self.pl, self.snapshot.netinflow, self.perfil_bankers, BASE_CLIENTES_DATE
+        )
+
+    @cached_property
+    def captacao(self) -> CaptacaoEngine:
+        """Captação diária/acumulada por banker com somas prefixadas"""
+        if self.base is not None:
+            return self.base.captacao.resample(self.granularity)
+        netinflow = self.snapshot.netinflow
+        rows = netinflow.query(positive=True)
+        rows = rows[netinflow.day[rows] != INVALID_DAY]
+        client_codes = netinflow.client.codes[rows]
+        bankers = np.where(
+            client_codes >= 0,
+            self.netinflow_banker_codes[np.maximum(client_codes, 0)],
+            -1,
+        )
+        rows, bankers = rows[bankers >= 0], bankers[bankers >= 0]
+        return CaptacaoEngine(
+            self.pl,
+            netinflow.dates(rows),
+            netinflow.usd[rows],
+            bankers,
+            BASE_CLIENTES_DATE,
+        )
+
+
+_context_lock = threading.Lock()
+# Contexto do snapshot atual e do anterior: durante uma troca de snapshot,
+# requisições que ainda estão no antigo não reconstroem o contexto dele
+_contexts: Tuple[PanelContext, ...] = ()
+# Acertos/falhas/esperas do cache de respostas de contextos já descartados
+_retired_cache_stats = [0, 0, 0]
+# Respostas compartilhadas entre os workers (configurado pelo app)
+shared_renders: Optional[SharedRenders] = None
+
+
+def get_context(snapshot: Snapshot) -> PanelContext:
+    """Contexto compartilhado de uma versão dos dados"""
+    global _contexts
+    for ctx in _contexts:
+        if ctx.snapshot is snapshot:
+            return ctx
+    with _context_lock:
+        for ctx in _contexts:
+            if ctx.snapshot is snapshot:
+                return ctx
+        ctx = PanelContext(snapshot)
+        for retired in _contexts[1:]:
+            _retired_cache_stats[0] += retired.rendered.hits
+            _retired_cache_stats[1] += retired.rendered.misses
+            _retired_cache_stats[2] += retired.rendered.coalesced
+        _contexts = (ctx,) + _contexts[:1]
+        return ctx
+
+
+def cache_stats() -> Tuple[int, int, int]:
+    """
+    Acertos, falhas e esperas (requisições que aguardaram o cálculo de outra
+    thread) acumulados do cache de respostas renderizadas
+    """
+    contexts = _contexts
+    hits = _retired_cache_stats[0] + sum(c.rendered.hits for c in contexts)
+    misses = _retired_cache_stats[1] + sum(c.rendered.misses for c in contexts)
+    coalesced = _retired_cache_stats[2] + sum(c.rendered.coalesced for c in contexts)
+    return hits, misses, coalesced
+
+
+def build_total_pl(ctx: PanelContext, window: DateWindow) -> PanelResult:
+    """P&L total agregado de todos os clientes"""
+    dates, totals = _total_pl_points(ctx, window)
+    if window.format != "json":
+        payload = {
+            "success": True,
+            "format": window.format,
+            "dates": dates,
+            "values": (
+                np.round(totals, 2)[None, :] if window.format == "binary" else round2(totals)
+            ),
+            "startDate": dates[0] if dates else None,
+            "endDate": dates[-1] if dates else None,
+            "totalRecords": len(dates),
+        }
+        return payload, 200
+    result = [{"date": date, "value": value} for date, value in zip(dates, round2(totals))]
+    return {
+        "success": True,
+        "data": result,
+        "startDate": result[0]["date"] if result else None,
+        "endDate": result[-1]["date"] if result else None,
+        "totalRecords": len(result),
+    }, 200
+
+
+def build_pl_stats(ctx: PanelContext, window: DateWindow) -> PanelResult:
+    """Estatísticas do P&L total"""
+    store = ctx.pl
+    dates, totals = aggregate_total_pl(store, window)
+    if not dates:
+        return {"success": False, "error": "No data available"}, 404
+    return {
+        "success": True,
+        "stats": {
+            "max": round(float(totals.max()), 2),
+            "min": round(float(totals.min()), 2),
+            "average": round(float(totals.mean()), 2),
+            "totalClients": store.n_clients,
+            "totalDays": len(dates),
+        },
+    }, 200
+
+
+def build_clients_pl(ctx: PanelContext, window: DateWindow) -> PanelResult:
+    """P&L de cada cliente na última data disponível (até end/as_of)"""
+    store = ctx.pl
+    if not store.n_clients:
+        return {"success": False, "error": "No client data available"}, 404
+    if window.empty:
+        return {"success": False, "error": "No dates found"}, 404
+
+    emails = ctx.emails
+    last = window.hi - 1
+    last_date = store.date_list[last]
+    last_values = round2(store.filled[:, last])
+    clients_data = [
+        {
+            "nome": nome,
+            "cpf": cpf,
+            "banker": banker,
+            "email": emails.get(nome, ""),
+            "pl": pl_value,
+            "data": last_date,
+        }
+        for nome, cpf, banker, pl_value in zip(
+            store.clients, store.cpfs, store.bankers, last_values
+        )
+    ]
+    return {
+        "success": True,
+        "data": clients_data,
+        "lastDate": last_date,
+        "totalClients": len(clients_data),
+    }, 200
+
+
+def _full_response(
+    builder: Callable[[PanelContext, DateWindow], PanelResult],
+    ctx: PanelContext,
+    window: DateWindow,
+) -> PanelResult:
+    """Resposta completa para um ?since= que o buffer de diferenças não cobre"""
+    payload, status = builder(ctx, replace(window, since=None))
+    if status == 200:
+        payload.update(delta=False, since=window.since, version=ctx.snapshot.version)
+    return payload, status
+
+
+def build_clients_evolution(ctx: PanelContext, window: DateWindow) -> PanelResult:
+    """Evolução de P&L para cada cliente"""
+    store = ctx.pl
+    if not store.n_clients:
+        return {"success": False, "error": "No client data available"}, 404
+    if not store.n_dates:
+        return {"success": False, "error": "No dates found"}, 404
+
+    emails = ctx.emails
+    # Apenas datas da janela (padrão: a partir de 01/12/2025) nos gráficos
+    display_dates = ctx.window_dates(window)
+    if window.since is not None:
+        cells = ctx.delta_cells(window)
+        if cells is None:
+            return _full_response(build_clients_evolution, ctx, window)
+        rows, cols = cells
+        return _delta_series(
+            ctx,
+            window,
+            rows,
+            cols,
+            store.values,
+            store.valid,
+            lambda i: {
+                "nome": store.clients[i],
+                "cpf": store.cpfs[i],
+                "banker": store.bankers[i],
+                "email": emails.get(store.clients[i], ""),
+            },
+            {
+                "totalClientes": len(np.unique(rows)),
+                "periodoInicio": display_dates[0] if display_dates else None,
+                "periodoFim": display_dates[-1] if display_dates else None,
+            },
+        )
+    values = store.values[:, window.lo : window.hi]
+    valid = store.valid[:, window.lo : window.hi]
+    rows = np.flatnonzero(valid.any(axis=1))
+    keep = ctx.keep_points("clients_evolution", window, values[rows], valid[rows])
+    if window.format != "json":
+        series = [
+            {
+                "nome": store.clients[i],
+                "cpf": store.cpfs[i],
+                "banker": store.bankers[i],
+                "email": emails.get(store.clients[i], ""),
+            }
+            for i in rows.tolist()
+        ]
+        return _columnar_series(
+            window,
+            display_dates,
+            values[rows],
+            keep,
+            series,
+            {
+                "totalClientes": len(series),
+                "periodoInicio": display_dates[0] if display_dates else None,
+                "periodoFim": display_dates[-1] if display_dates else None,
+            },
+        )
+    clients_evolution = []
+
+    for k, i in enumerate(rows.tolist()):
+        evolution_data = _evolution_points(display_dates, values[i], keep[k])
+        nome = store.clients[i]
+        clients_evolution.append(
+            {
+                "nome": nome,
+                "cpf": store.cpfs[i],
+                "banker": store.bankers[i],
+                "email": emails.get(nome, ""),
+                "evolution": evolution_data,
+                "pl_inicial": evolution_data[0]["value"],
+                "pl_final": evolution_data[-1]["value"],
+                "variacao": round(
+                    evolution_data[-1]["value"] - evolution_data[0]["value"], 2
+                ),
+            }
+        )
+
+    return {
+        "success": True,
+        "data": clients_evolution,
+        "totalClientes": len(clients_evolution),
+        "periodoInicio": display_dates[0] if display_dates else None,
+        "periodoFim": display_dates[-1] if display_dates else None,
+    }, 200
+
+
+def build_bankers_evolution(ctx: PanelContext, window: DateWindow) -> PanelResult:
+    """Evolução de P&L para cada banker"""
+    store = ctx.pl
+    if not store.n_clients:
+        return {"success": False, "error": "No client data available"}, 404
+    if not store.n_dates:
+        return {"success": False, "error": "No dates found"}, 404
+
+    # Apenas datas da janela (padrão: a partir de 01/12/2025) nos gráficos
+    display_dates = ctx.window_dates(window)
+    totals, has_value = store.banker_totals()
+    clientes_count = store.banker_client_counts().tolist()
+    if window.since is not None:
+        cells = ctx.delta_cells(window)
+        if cells is None:
+            return _full_response(build_bankers_evolution, ctx, window)
+        # Células dos bankers dos clientes alterados
+        client_rows, cols = cells
+        keys = np.unique(store.banker_codes[client_rows].astype(np.int64) * store.n_dates + cols)
+        rows, cols = keys // store.n_dates, keys % store.n_dates
+        return _delta_series(
+            ctx,
+            window,
+            rows,
+            cols,
+            totals,
+            has_value,
+            lambda b: {"nome": store.banker_names[b], "clientes_count": clientes_count[b]},
+            {
+                "totalBankers": len(np.unique(rows)),
+                "periodoInicio": display_dates[0] if display_dates else None,
+                "periodoFim": display_dates[-1] if display_dates else None,
+            },
+        )
+    totals = totals[:, window.lo : window.hi]
+    has_value = has_value[:, window.lo : window.hi]
+    rows = np.flatnonzero(has_value.any(axis=1))
+    keep = ctx.keep_points("bankers_evolution", window, totals[rows], has_value[rows])
+    if window.format != "json":
+        series = [
+            {"nome": store.banker_names[b], "clientes_count": clientes_count[b]}
+            for b in rows.tolist()
+        ]
+        return _columnar_series(
+            window,
+            display_dates,
+            totals[rows],
+            keep,
+            series,
+            {
+                "totalBankers": len(series),
+                "periodoInicio": display_dates[0] if display_dates else None,
+                "periodoFim": display_dates[-1] if display_dates else None,
+            },
+        )
+
+    bankers_evolution = []
+    for k, b in enumerate(rows.tolist()):
+        evolution_list = _evolution_points(display_dates, totals[b], keep[k])
+        bankers_evolution.append(
+            {
+                "nome": store.banker_names[b],
+                "clientes_count": clientes_count[b],
+                "evolution": evolution_list,
+                "pl_inicial": evolution_list[0]["value"],
+                "pl_final": evolution_list[-1]["value"],
+                "variacao": round(
+                    evolution_list[-1]["value"] - evolution_list[0]["value"], 2
+                ),
+            }
+        )
+
+    return {
+        "success": True,
+        "data": bankers_evolution,
+        "totalBankers": len(bankers_evolution),
+        "periodoInicio": display_dates[0] if display_dates else None,
+        "periodoFim": display_dates[-1] if display_dates else None,
+    }, 200
+
+
+def build_bankers_captacao(ctx: PanelContext, window: DateWindow) -> PanelResult:
+    """Evolução de captação para cada banker"""
+    store = ctx.pl
+    if not store.n_clients:
+        return {"success": False, "error": "No data available"}, 404
+
+    engine = ctx.captacao
+    # Janela padrão a partir de 01/11/2025; aberta no fim se não há end/as_of
+    lo, hi = engine.axis_slice(window.start or CAPTACAO_START_DATE, window.end)
+    totals = engine.banker_window_totals(lo, hi).tolist()
+
+    bankers_evolution = []
+    order = sorted(range(len(store.banker_names)), key=lambda b: store.banker_names[b])
+    for b in order:
+        dates, values = engine.banker_curve(b, lo, hi)
+        evolution_list = [
+            {"date": date, "value": value} for date, value in zip(dates, round2(values))
+        ]
+        bankers_evolution.append(
+            {
+                "nome": store.banker_names[b],
+                "evolution": evolution_list,
+                "captacao_total": round(totals[b], 2),
+                "captacao_inicial": evolution_list[0]["value"] if evolution_list else 0,
+                "captacao_final": evolution_list[-1]["value"] if evolution_list else 0,
+            }
+        )
+
+    # Período do P&L coberto (todo o eixo sem start/end)
+    pl_lo, pl_hi = store.date_slice(window.start, window.end)
+    pl_dates = store.date_list[pl_lo:pl_hi]
+    return {
+        "success": True,
+        "data": bankers_evolution,
+        "totalBankers": len(bankers_evolution),
+        "periodoInicio": pl_dates[0] if pl_dates else None,
+        "periodoFim": pl_dates[-1] if pl_dates else None,
+    }, 200
+
+
+def build_captacao_evolucao(ctx: PanelContext, window: DateWindow) -> PanelResult:
+    """Evolução de captação total"""
+    store = ctx.pl
+    if not store.n_clients:
+        return {"success": False, "error": "No data available"}, 404
+
+    engine = ctx.captacao
+    # Janela padrão a partir de 01/12/2025; aberta no fim se não há end/as_of
+    lo, hi = engine.axis_slice(window.start or DISPLAY_START_DATE, window.end)
+    dates, values = engine.total_curve(lo, hi)
+    evolution_list = [
+        {"date": date, "value": value} for date, value in zip(dates, round2(values))
+    ]
+
+    return {
+        "success": True,
+        "data": evolution_list,
+        "captacao_total": evolution_list[-1]["value"] if evolution_list else 0,
+        "periodoInicio": dates[0] if dates else None,
+        "periodoFim": dates[-1] if dates else None,
+    }, 200
+
+
+def build_metrics(ctx: PanelContext, window: DateWindow) -> PanelResult:
+    """Métricas principais do dashboard"""
+    store = ctx.pl
+    if not store.n_clients:
+        return {"success": False, "error": "No client data available"}, 404
+    if not store.n_dates:
+        return {"success": False, "error": "No dates found"}, 404
+
+    sorted_dates = store.date_list
+    # Janela das métricas (padrão: a partir de 01/12/2025)
+    if window.empty:
+        return {"success": False, "error": "No data in metric period"}, 404
+    metric_start, metric_end = window.lo, window.hi - 1
+
+    first_date, last_date = sorted_dates[metric_start], sorted_dates[metric_end]
+
+    if window.start is None and window.end is None:
+        # Sem parâmetros: "Captação do Período" de 01/12 a 31/01 e Top 3
+        # Bankers de 01/11 a 31/01
+        periodo = (first_date, PERIODO_CAPTACAO_FIM)
+        ranking = (min(TOP_BANKERS_INICIO, first_date), PERIODO_CAPTACAO_FIM)
+    else:
+        # Com start/end/as_of, período e ranking seguem a janela pedida
+        periodo = ranking = (first_date, last_date)
+
+    metrics = ctx.metrics_engine.compute(
+        metric_start,
+        metric_end,
+        periodo=periodo,
+        ranking=ranking,
+        bounded=window.bounded,
+        excluded=METRICS_EXCLUDED_BANKERS,
+        top_n=TOP_BANKERS_N,
+    )
+    return {"success": True, "metrics": metrics}, 200
+
+
+# Painéis de evolução do P&L: aceitam ?points= (downsampling) e ?format=
+SERIES_PANELS = {"pl_total", "bankers_evolution", "clients_evolution"}
+# Painéis que aceitam ?granularity= (séries agregadas por período)
+RESAMPLED_PANELS = SERIES_PANELS | {"captacao_evolucao", "bankers_captacao"}
+# Painéis que aceitam ?since= (só as mudanças desde uma versão ou data)
+DELTA_PANELS = {"bankers_evolution", "clients_evolution"}
+# Painéis que recortam o eixo da captação pelas datas pedidas (start/end)
+CAPTACAO_PANELS = {"captacao_evolucao", "bankers_captacao"}
+# Painéis que recebem as datas pedidas em window.start/end: os de captação e
+# as métricas, cujos períodos fixos só valem para a requisição sem janela
+REQUESTED_WINDOW_PANELS = CAPTACAO_PANELS | {"metrics"}
+
+# Painéis disponíveis, na ordem em que aparecem no dashboard, com o início
+# padrão da janela quando a requisição não informa start
+PANELS: Dict[str, Tuple[Callable[[PanelContext, DateWindow], PanelResult], Optional[str]]] = {
+    "metrics": (build_metrics, DISPLAY_START_DATE),
+    "pl_total": (build_total_pl, DISPLAY_START_DATE),
+    "pl_stats": (build_pl_stats, None),
+    "captacao_evolucao": (build_captacao_evolucao, DISPLAY_START_DATE),
+    "bankers_captacao": (build_bankers_captacao, CAPTACAO_START_DATE),
+    "bankers_evolution": (build_bankers_evolution, DISPLAY_START_DATE),
+    "clients_pl": (build_clients_pl, None),
+    "clients_evolution": (build_clients_evolution, DISPLAY_START_DATE),
+}
+
+
+def _panel_view(
+    name: str, ctx: PanelContext, params: PanelParams
+) -> Tuple[PanelContext, DateWindow]:
+    """
+    Contexto (diário ou reamostrado) e janela resolvida de um painel
+
+    Cada opção só entra na janela dos painéis que a aceitam, para que os
+    demais não criem entradas de cache repetidas por ela.
+    """
+    _, default_start = PANELS[name]
+    granularity = params.granularity if name in RESAMPLED_PANELS else "day"
+    view = ctx.resampled(granularity)
+    window = replace(resolve_window(view.pl, params, default_start), granularity=granularity)
+    if name in SERIES_PANELS:
+        window = replace(window, points=params.points, format=params.format)
+    if name in DELTA_PANELS:
+        window = replace(window, since=params.since)
+    if name in REQUESTED_WINDOW_PANELS:
+        window = replace(window, start=params.start, end=requested_end(params))
+    return view, window
+
+
+def run_panel(
+    name: str, ctx: PanelContext, params: PanelParams = PanelParams()
+) -> PanelResult:
+    """Executa um painel convertendo exceções em resposta de erro 500"""
+    builder, _ = PANELS[name]
+    try:
+        view, window = _panel_view(name, ctx, params)
+        return builder(view, window)
+    except Exception as e:
+        print(f"Erro no painel {name}: {e}")
+        telemetry.PANEL_ERRORS.inc(name)
+        return {"success": False, "error": str(e)}, 500
+
+
+def render_panel(
+    name: str, ctx: PanelContext, params: PanelParams = PanelParams(), cached: bool = True
+) -> Tuple[bytes, int]:
+    """
+    Corpo JSON (com quebra de linha final, como o jsonify) e status HTTP;
+    com format=binary, o corpo binário de serialization.dumps_binary
+
+    Os bytes ficam em cache no contexto da versão dos dados, indexados pela
+    janela já resolvida: um acerto de cache não serializa nada, e parâmetros
+    diferentes que caem no mesmo intervalo do eixo reaproveitam a resposta.
+    Requisições simultâneas da mesma chave esperam um único cálculo, também
+    entre workers quando shared_renders está configurado.
+    Com cached=False o painel é sempre recalculado (ex.: profiling).
+    """
+    _, window = _panel_view(name, ctx, params)
+
+    def render() -> Tuple[bytes, int]:
+        payload, status = run_panel(name, ctx, params)
+        if window.format == "binary" and status == 200:
+            return serialization.dumps_binary(payload), status
+        return serialization.dumps(payload) + b"\n", status
+
+    if not cached:
+        return render()
+    compute = render
+    if shared_renders is not None:
+        compute = partial(shared_renders.run, ctx.snapshot.version, f"{name}|{window!r}", render)
+    body, status = ctx.rendered.get_or_compute((name, window), compute)
+    if status >= 500:
+        # Erros não ficam em cache
+        ctx.rendered.pop((name, window))
+    return body, status
+
+
+def warm_up(ctx: PanelContext) -> None:
+    """
+    Pré-calcula os índices, as séries reamostradas e as respostas padrão de
+    todos os painéis
+
+    Chamado no processo master do gunicorn (preload) antes do fork, para que
+    os workers herdem tudo pronto e compartilhem as páginas copy-on-write.
+    """
+    for name in PANELS:
+        render_panel(name, ctx)
+    for granularity in GRANULARITIES[1:]:
+        ctx.resampled(granularity).captacao
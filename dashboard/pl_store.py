@@ -0,0 +1,277 @@
+"""
+Armazenamento colunar do P&L diário
+Converte o evolucao_pl_diaria.json (lista de clientes com uma chave por data)
+em uma matriz clientes × datas para que as agregações sejam vetorizadas
+"""
+
+from functools import cached_property
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from dashboard.resample import last_valid_by_period, period_bounds, period_keys
+
+META_FIELDS = ("Cliente", "CPF", "Banker")
+
+
+def is_date_key(key: Any) -> bool:
+    """Chaves no formato YYYY-MM-DD"""
+    return isinstance(key, str) and len(key) == 10 and key[4] == "-" and key[7] == "-"
+
+
+def _to_float(value: Any) -> float:
+    if value is None:
+        return np.nan
+    try:
+        return float(value)
+    except (ValueError, TypeError):
+        return np.nan
+
+
+class BankerRollup:
+    """
+    P&L materializado por banker × data
+
+    Soma agrupada das linhas de cada banker (na ordem do arquivo, o mesmo
+    resultado do np.add.at sobre a matriz inteira). Quando o arquivo novo só
+    acrescenta datas ou muda poucos clientes, update() reaproveita a rollup
+    anterior e recalcula apenas as colunas novas e os bankers afetados.
+
+    Attributes:
+        totals: matriz bankers × datas com a soma do P&L
+        counts: clientes com valor em cada célula
+        has_value: counts > 0
+    """
+
+    # Acima desta fração de clientes alterados a rollup é refeita inteira
+    MAX_CHANGED_FRACTION = 0.1
+
+    def __init__(self, totals: np.ndarray, counts: np.ndarray):
+        self.totals = totals
+        self.counts = counts
+        self.has_value = counts > 0
+        for array in (self.totals, self.counts, self.has_value):
+            array.flags.writeable = False
+
+    @staticmethod
+    def _groups(store: "PLStore") -> List[np.ndarray]:
+        """Linhas de cada banker, em ordem crescente"""
+        order = np.argsort(store.banker_codes, kind="stable")
+        bounds = np.searchsorted(
+            store.banker_codes[order], np.arange(len(store.banker_names) + 1)
+        )
+        return [order[bounds[b] : bounds[b + 1]] for b in range(len(store.banker_names))]
+
+    @staticmethod
+    def _fill(
+        store: "PLStore",
+        totals: np.ndarray,
+        counts: np.ndarray,
+        groups: List[np.ndarray],
+        bankers: List[int],
+        cols: slice,
+    ) -> None:
+        for b in bankers:
+            rows = groups[b]
+            if not len(rows):
+                continue
+            # Soma sequencial linha a linha (o sum() pode usar soma pairwise
+            # conforme o formato), igual para qualquer subconjunto de colunas
+            totals[b, cols] = np.add.accumulate(store.filled[rows, cols], axis=0)[-1]
+            counts[b, cols] = store.valid[rows, cols].sum(axis=0)
+
+    @classmethod
+    def build(cls, store: "PLStore") -> "BankerRollup":
+        """Rollup completa (uma passada pela matriz de clientes)"""
+        n_bankers = len(store.banker_names)
+        totals = np.zeros((n_bankers, store.n_dates), dtype=np.float64)
+        counts = np.zeros((n_bankers, store.n_dates), dtype=np.int64)
+        cls._fill(store, totals, counts, cls._groups(store), list(range(n_bankers)), slice(None))
+        return cls(totals, counts)
+
+    @classmethod
+    def update(cls, previous: Optional["PLStore"], store: "PLStore") -> "BankerRollup":
+        """
+        Rollup de `store` a partir da do store anterior
+
+        Incremental quando clientes e bankers são os mesmos e o eixo de datas
+        anterior é prefixo do novo; senão (ou com muitos clientes alterados)
+        refaz tudo.
+        """
+        if (
+            previous is None
+            or previous.n_clients != store.n_clients
+            or previous.banker_names != store.banker_names
+            or not np.array_equal(previous.banker_codes, store.banker_codes)
+            or previous.date_list != store.date_list[: previous.n_dates]
+        ):
+            return cls.build(store)
+
+        n_old = previous.n_dates
+        old = slice(0, n_old)
+        changed = (store.filled[:, old] != previous.filled).any(axis=1) | (
+            store.valid[:, old] != previous.valid
+        ).any(axis=1)
+        if changed.sum() > cls.MAX_CHANGED_FRACTION * store.n_clients:
+            return cls.build(store)
+
+        rollup = previous.rollup
+        n_bankers = len(store.banker_names)
+        totals = np.zeros((n_bankers, store.n_dates), dtype=np.float64)
+        counts = np.zeros((n_bankers, store.n_dates), dtype=np.int64)
+        totals[:, old] = rollup.totals
+        counts[:, old] = rollup.counts
+
+        groups = cls._groups(store)
+        affected = np.unique(store.banker_codes[changed]).tolist()
+        cls._fill(store, totals, counts, groups, affected, old)
+        cls._fill(store, totals, counts, groups, list(range(n_bankers)), slice(n_old, None))
+        return cls(totals, counts)
+
+
+class PLStore:
+    """
+    P&L em formato colunar
+
+    Attributes:
+        dates: eixo de datas ordenado (strings YYYY-MM-DD)
+        values: matriz float64 clientes × datas, NaN onde não há valor
+        clients, cpfs, bankers: arrays com os campos de cada cliente
+        banker_names: bankers na ordem em que aparecem no arquivo
+        banker_codes: índice em banker_names de cada cliente
+    """
+
+    def __init__(
+        self,
+        dates: List[str],
+        values: np.ndarray,
+        clients: List[str],
+        cpfs: List[str],
+        bankers: List[Any],
+    ):
+        self.dates = np.array(dates, dtype="<U10")
+        self.date_list = list(dates)
+        self.values = values
+        self.clients = np.array(clients, dtype=object)
+        self.cpfs = np.array(cpfs, dtype=object)
+        self.bankers = np.array(bankers, dtype=object)
+
+        self.banker_names: List[Any] = []
+        banker_index: Dict[Any, int] = {}
+        codes = np.empty(len(bankers), dtype=np.int32)
+        for i, banker in enumerate(bankers):
+            if banker not in banker_index:
+                banker_index[banker] = len(self.banker_names)
+                self.banker_names.append(banker)
+            codes[i] = banker_index[banker]
+        self.banker_codes = codes
+
+        self.valid = ~np.isnan(values)
+        self.filled = np.where(self.valid, values, 0.0)
+        self._first_valid = self._first_index(self.valid)
+        self._first_positive = self._first_index(self.valid & (self.filled > 0))
+
+    @classmethod
+    def from_records(cls, data: List[Dict[str, Any]]) -> "PLStore":
+        """Constrói a matriz a partir dos registros do JSON"""
+        all_dates = set()
+        for cliente in data:
+            for key in cliente.keys():
+                if key not in META_FIELDS and is_date_key(key):
+                    all_dates.add(key)
+        dates = sorted(all_dates)
+        col = {d: j for j, d in enumerate(dates)}
+
+        values = np.full((len(data), len(dates)), np.nan, dtype=np.float64)
+        for i, cliente in enumerate(data):
+            row = values[i]
+            for key, value in cliente.items():
+                j = col.get(key)
+                if j is not None:
+                    row[j] = _to_float(value)
+
+        return cls(
+            dates,
+            values,
+            [c.get("Cliente", "") for c in data],
+            [c.get("CPF", "") for c in data],
+            [c.get("Banker", "Sem Banker") for c in data],
+        )
+
+    @staticmethod
+    def _first_index(mask: np.ndarray) -> np.ndarray:
+        """Primeira coluna True de cada linha (-1 se nenhuma)"""
+        if mask.shape[1] == 0:
+            return np.full(mask.shape[0], -1, dtype=np.int64)
+        first = mask.argmax(axis=1)
+        return np.where(mask.any(axis=1), first, -1)
+
+    @property
+    def n_clients(self) -> int:
+        return self.values.shape[0]
+
+    @property
+    def n_dates(self) -> int:
+        return self.values.shape[1]
+
+    def first_valid_index(self) -> np.ndarray:
+        """Índice da primeira data com valor de cada cliente (-1 se nenhuma)"""
+        return self._first_valid
+
+    def first_positive_index(self) -> np.ndarray:
+        """Índice da primeira data com valor > 0 de cada cliente (-1 se nenhuma)"""
+        return self._first_positive
+
+    def total_by_date(self) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Soma do P&L de todos os clientes por data
+
+        Returns:
+            (totais por data, máscara de datas com algum valor)
+        """
+        return self.filled.sum(axis=0), self.valid.any(axis=0)
+
+    @cached_property
+    def rollup(self) -> BankerRollup:
+        """P&L por banker × data (o DataStore atribui a versão incremental)"""
+        return BankerRollup.build(self)
+
+    def banker_totals(self) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Soma do P&L por banker e data
+
+        Returns:
+            (matriz bankers × datas, máscara de células com algum valor)
+        """
+        return self.rollup.totals, self.rollup.has_value
+
+    def resample(self, granularity: str) -> "PLStore":
+        """
+        P&L por período (week/month/quarter): o último valor de cada cliente
+        no período, rotulado pela última data do período presente no eixo
+        """
+        starts, ends = period_bounds(period_keys(self.dates, granularity))
+        return PLStore(
+            [self.date_list[k] for k in ends.tolist()],
+            last_valid_by_period(self.values, self.valid, starts, ends),
+            self.clients.tolist(),
+            self.cpfs.tolist(),
+            self.bankers.tolist(),
+        )
+
+    def banker_client_counts(self) -> np.ndarray:
+        """Quantidade de clientes de cada banker"""
+        return np.bincount(self.banker_codes, minlength=len(self.banker_names))
+
+    def date_slice(
+        self, start: Optional[str] = None, end: Optional[str] = None
+    ) -> Tuple[int, int]:
+        """
+        Intervalo [lo, hi) do eixo de datas entre start e end (inclusivos)
+
+        Busca binária sobre o eixo ordenado; datas ausentes no eixo resolvem
+        para a primeira data >= start e a última data <= end.
+        """
+        lo = 0 if start is None else int(np.searchsorted(self.dates, start, "left"))
+        hi = self.n_dates if end is None else int(np.searchsorted(self.dates, end, "right"))
+        return lo, max(lo, hi)
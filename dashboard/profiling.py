@@ -0,0 +1,217 @@
+"""
+Profiling sob demanda das rotas da API (cProfile)
+
+Dois modos, ambos desligados por padrão (sem nenhum hook registrado no app):
+    - ?profile=1 em qualquer rota /api devolve, no lugar da resposta, as
+      funções com maior tempo acumulado; ?profile=prof devolve o arquivo
+      .prof (pstats) para abrir no snakeviz/pstats; outros valores são
+      ignorados. Exige o header
+      X-Profile-Token (ou ?profile_token=) igual a PROFILE_TOKEN, ou
+      PROFILING_ENABLED=1 (uso local)
+    - PROFILE_SAMPLE_RATE=N perfila automaticamente 1 a cada N requisições e
+      guarda as PROFILE_KEEP mais lentas, listadas em /api/debug/profiles
+
+Só uma requisição é perfilada por vez em cada processo; as outras seguem
+sem profiler.
+"""
+
+import cProfile
+import heapq
+import hmac
+import io
+import itertools
+import marshal
+import os
+import pstats
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import List, Optional
+
+from flask import Flask, Response, g, jsonify, request
+
+PROFILE_TOKEN = os.getenv("PROFILE_TOKEN", "")
+PROFILING_ENABLED = os.getenv("PROFILING_ENABLED", "0") == "1"
+PROFILE_SAMPLE_RATE = int(os.getenv("PROFILE_SAMPLE_RATE", "0"))
+PROFILE_KEEP = int(os.getenv("PROFILE_KEEP", "10"))
+PROFILE_TOP_N = int(os.getenv("PROFILE_TOP_N", "30"))
+# Valores aceitos em ?profile=; qualquer outro é ignorado (resposta normal)
+PROFILE_MODES = ("1", "prof")
+
+
+@dataclass(order=True)
+class ProfileTrace:
+    """Perfil de uma requisição amostrada"""
+
+    duration: float
+    id: int = field(compare=False)
+    route: str = field(compare=False)
+    started_at: float = field(compare=False)
+    stats: dict = field(compare=False, repr=False)
+
+    def summary(self) -> dict:
+        return {
+            "id": self.id,
+            "route": self.route,
+            "durationMs": round(self.duration * 1000, 3),
+            "startedAt": self.started_at,
+        }
+
+
+def stats_text(stats: pstats.Stats, header: str, limit: int = PROFILE_TOP_N) -> str:
+    """Top funções por tempo acumulado em texto"""
+    out = io.StringIO()
+    out.write(header + "\n\n")
+    stats.stream = out
+    stats.sort_stats("cumulative").print_stats(limit)
+    return out.getvalue()
+
+
+def prof_bytes(stats: pstats.Stats) -> bytes:
+    """Mesmo conteúdo que pstats.Stats.dump_stats gravaria em um .prof"""
+    return marshal.dumps(stats.stats)
+
+
+class WorstTraces:
+    """Guarda os N perfis mais lentos (heap mínimo pela duração)"""
+
+    def __init__(self, keep: int):
+        self.keep = keep
+        self._heap: List[ProfileTrace] = []
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+
+    def offer(self, duration: float, route: str, started_at: float, stats: dict) -> None:
+        with self._lock:
+            if len(self._heap) >= self.keep and duration <= self._heap[0].duration:
+                return
+            trace = ProfileTrace(duration, next(self._ids), route, started_at, stats)
+            if len(self._heap) < self.keep:
+                heapq.heappush(self._heap, trace)
+            else:
+                heapq.heapreplace(self._heap, trace)
+
+    def list(self) -> List[ProfileTrace]:
+        with self._lock:
+            return sorted(self._heap, reverse=True)
+
+    def get(self, trace_id: int) -> Optional[ProfileTrace]:
+        with self._lock:
+            return next((t for t in self._heap if t.id == trace_id), None)
+
+
+def _authorized() -> bool:
+    if PROFILING_ENABLED:
+        return True
+    if not PROFILE_TOKEN:
+        return False
+    token = request.headers.get("X-Profile-Token") or request.args.get("profile_token", "")
+    return hmac.compare_digest(token, PROFILE_TOKEN)
+
+
+def is_profiling() -> bool:
+    """True se a requisição atual está sendo perfilada sob demanda (?profile=)"""
+    return g.get("profile_mode") is not None
+
+
+def init_app(app: Flask) -> Optional[WorstTraces]:
+    """
+    Registra os hooks de profiling se algum modo estiver configurado
+
+    Returns:
+        O registro dos perfis mais lentos (None se a amostragem está desligada)
+    """
+    on_demand = PROFILING_ENABLED or bool(PROFILE_TOKEN)
+    if not on_demand and PROFILE_SAMPLE_RATE <= 0:
+        return None
+
+    busy = threading.Lock()
+    counter = itertools.count()
+    worst = WorstTraces(PROFILE_KEEP) if PROFILE_SAMPLE_RATE > 0 else None
+
+    @app.before_request
+    def _start_profiler():
+        if not request.path.startswith("/api/") or request.path.startswith("/api/debug/"):
+            return None
+        mode = request.args.get("profile") if on_demand else None
+        if mode not in PROFILE_MODES or not _authorized():
+            mode = None
+        sampled = worst is not None and next(counter) % PROFILE_SAMPLE_RATE == 0
+        if mode is None and not sampled:
+            return None
+        if not busy.acquire(blocking=False):
+            return None
+        profiler = cProfile.Profile()
+        g.profile_mode = mode
+        g.profiler = profiler
+        g.profile_started = (time.time(), time.perf_counter())
+        profiler.enable()
+        return None
+
+    @app.after_request
+    def _stop_profiler(response: Response) -> Response:
+        profiler = g.pop("profiler", None)
+        if profiler is None:
+            return response
+        profiler.disable()
+        busy.release()
+        started_at, start = g.profile_started
+        duration = time.perf_counter() - start
+        route = request.url_rule.rule if request.url_rule else request.path
+        stats = pstats.Stats(profiler)
+
+        mode = g.get("profile_mode")
+        if mode is None:
+            worst.offer(duration, route, started_at, stats.stats)
+            return response
+
+        if mode == "prof":
+            profiled = Response(prof_bytes(stats), mimetype="application/octet-stream")
+            profiled.headers["Content-Disposition"] = (
+                f'attachment; filename="{route.strip("/").replace("/", "_")}.prof"'
+            )
+        else:
+            header = (
+                f"{request.method} {request.full_path} -> {response.status_code}"
+                f" em {duration * 1000:.1f} ms"
+            )
+            profiled = Response(stats_text(stats, header), mimetype="text/plain")
+        profiled.headers["Cache-Control"] = "no-store"
+        return profiled
+
+    @app.teardown_request
+    def _release_profiler(exc):
+        # Exceções não tratadas podem pular o after_request
+        profiler = g.pop("profiler", None)
+        if profiler is not None:
+            profiler.disable()
+            busy.release()
+
+    if worst is not None:
+
+        @app.route("/api/debug/profiles", methods=["GET"])
+        def list_profiles():
+            if not _authorized():
+                return jsonify({"success": False, "error": "Unauthorized"}), 401
+            return jsonify({"success": True, "data": [t.summary() for t in worst.list()]})
+
+        @app.route("/api/debug/profiles/<int:trace_id>", methods=["GET"])
+        def get_profile(trace_id: int):
+            if not _authorized():
+                return jsonify({"success": False, "error": "Unauthorized"}), 401
+            trace = worst.get(trace_id)
+            if trace is None:
+                return jsonify({"success": False, "error": "Profile not found"}), 404
+            stats = pstats.Stats()
+            stats.stats = trace.stats
+            stats.get_top_level_stats()
+            if request.args.get("format") == "prof":
+                response = Response(prof_bytes(stats), mimetype="application/octet-stream")
+                response.headers["Content-Disposition"] = (
+                    f'attachment; filename="profile_{trace.id}.prof"'
+                )
+                return response
+            header = f"{trace.route} em {trace.duration * 1000:.1f} ms"
+            return Response(stats_text(stats, header), mimetype="text/plain")
+
+    return worst
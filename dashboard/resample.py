@@ -0,0 +1,61 @@
+"""
+Reamostragem do eixo de datas em períodos (semana, mês, trimestre)
+Cada data recebe a chave inteira do seu período; como o eixo é ordenado, os
+períodos viram trechos contíguos [starts[k], starts[k + 1]) e o rótulo de
+cada período é a última data dele presente no eixo
+"""
+
+from typing import Tuple
+
+import numpy as np
+
+GRANULARITIES = ("day", "week", "month", "quarter")
+
+
+def period_keys(dates: np.ndarray, granularity: str) -> np.ndarray:
+    """Chave do período de cada data YYYY-MM-DD (semanas começam na segunda)"""
+    days = np.array(dates, dtype="datetime64[D]")
+    if granularity == "day":
+        return days.astype(np.int64)
+    if granularity == "week":
+        # 1970-01-01 foi uma quinta-feira
+        return (days.astype(np.int64) + 3) // 7
+    months = days.astype("datetime64[M]").astype(np.int64)
+    if granularity == "month":
+        return months
+    if granularity == "quarter":
+        return months // 3
+    raise ValueError(f"Unknown granularity: {granularity}")
+
+
+def period_bounds(keys: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Limites dos períodos de um eixo ordenado
+
+    Returns:
+        (início de cada período, última posição de cada período)
+    """
+    if not len(keys):
+        empty = np.zeros(0, dtype=np.int64)
+        return empty, empty
+    starts = np.flatnonzero(np.r_[True, keys[1:] != keys[:-1]])
+    ends = np.r_[starts[1:], len(keys)] - 1
+    return starts, ends
+
+
+def last_valid_by_period(
+    values: np.ndarray, valid: np.ndarray, starts: np.ndarray, ends: np.ndarray
+) -> np.ndarray:
+    """
+    Último valor válido de cada linha em cada período (NaN se nenhum)
+
+    Um laço por período com fatias da matriz, sem cópias do tamanho dela
+    """
+    out = np.full((values.shape[0], len(starts)), np.nan, dtype=np.float64)
+    rows = np.arange(values.shape[0])
+    for k, (lo, hi) in enumerate(zip(starts.tolist(), (ends + 1).tolist())):
+        block = valid[:, lo:hi]
+        has = block.any(axis=1)
+        last = hi - 1 - block[:, ::-1].argmax(axis=1)
+        out[has, k] = values[rows[has], last[has]]
+    return out
@@ -0,0 +1,72 @@
+"""
+Serialização JSON das respostas da API
+Usa orjson quando disponível e cai para o json da biblioteca padrão caso
+contrário; as duas saídas têm o mesmo formato (chaves ordenadas, compacto,
+UTF-8)
+"""
+
+import json
+import struct
+from typing import Any, Dict
+
+import numpy as np
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - depende do ambiente
+    orjson = None
+
+ENCODER = "orjson" if orjson is not None else "json"
+
+# Formato binário das séries (?format=binary)
+BINARY_MAGIC = b"DSHB"
+BINARY_MIMETYPE = "application/octet-stream"
+
+
+def _default(obj: Any) -> Any:
+    if isinstance(obj, np.ndarray):
+        return obj.tolist()
+    if isinstance(obj, np.generic):
+        return obj.item()
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+def dumps(payload: Any) -> bytes:
+    """Serializa um payload em bytes JSON compactos com chaves ordenadas"""
+    if orjson is not None:
+        return orjson.dumps(
+            payload,
+            default=_default,
+            option=orjson.OPT_SORT_KEYS | orjson.OPT_SERIALIZE_NUMPY,
+        )
+    return json.dumps(
+        payload,
+        default=_default,
+        sort_keys=True,
+        separators=(",", ":"),
+        ensure_ascii=False,
+    ).encode("utf-8")
+
+
+def round2(values: np.ndarray) -> list:
+    """Arredonda um array para 2 casas de forma vetorizada e devolve floats Python"""
+    return np.round(values, 2).tolist()
+
+
+def dumps_binary(payload: Dict[str, Any]) -> bytes:
+    """
+    Serializa um payload colunar com a matriz em payload["values"] em binário
+
+    Layout: BINARY_MAGIC | tamanho do cabeçalho (uint32 little-endian) |
+    cabeçalho JSON (o payload sem "values", com "shape" e "dtype"), completado
+    com espaços até múltiplo de 8 | matriz float64 little-endian linha a linha
+    (NaN = sem valor). A matriz começa alinhada em 8 bytes, então o cliente
+    pode lê-la direto como Float64Array.
+    """
+    values = np.ascontiguousarray(payload["values"], dtype="<f8")
+    header = {k: v for k, v in payload.items() if k != "values"}
+    header["shape"] = list(values.shape)
+    header["dtype"] = "<f8"
+    header_bytes = dumps(header)
+    header_bytes += b" " * (-(len(BINARY_MAGIC) + 4 + len(header_bytes)) % 8)
+    return BINARY_MAGIC + struct.pack("<I", len(header_bytes)) + header_bytes + values.tobytes()
@@ -0,0 +1,169 @@
+"""
+Coalescência entre workers das respostas calculadas (single-flight)
+Cada worker do gunicorn tem o seu cache em memória; quando a versão dos dados
+muda, todos recalculam as mesmas respostas ao mesmo tempo. Aqui o cálculo de
+uma chave (versão, painel, janela) é serializado por um flock em um arquivo de
+lock: o primeiro worker calcula e grava o resultado ao lado do lock, e os que
+estavam esperando (ou chegam depois) leem o arquivo em vez de recalcular.
+
+Os arquivos ficam em <root>/<boot>/<versão>/, onde <boot> identifica o master
+que carregou o app (preload_app): workers do mesmo master compartilham o
+diretório, e um deploy novo (código novo) não reaproveita respostas antigas.
+Sem fcntl (ex.: Windows) cada processo calcula sozinho.
+"""
+
+import hashlib
+import os
+import shutil
+import threading
+import time
+from typing import Callable, Dict, Optional, Tuple
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - depende da plataforma
+    fcntl = None
+
+Rendered = Tuple[bytes, int]
+
+# Versões dos dados mantidas em disco por boot (a atual e a anterior)
+KEEP_VERSIONS = 2
+# Respostas e bytes gravados por processo e versão (parâmetros arbitrários
+# não enchem o disco)
+MAX_ENTRIES = 4096
+MAX_BYTES = 256 * 1024 * 1024
+_POLL_SECONDS = 0.01
+
+
+def _pid_alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except OSError:
+        return True
+    return True
+
+
+class SharedRenders:
+    """
+    Respostas calculadas compartilhadas entre processos via arquivos + flock
+
+    Attributes:
+        shared_hits: respostas lidas do disco (calculadas por outro processo)
+        timeouts: esperas que passaram de `timeout` e calcularam localmente
+    """
+
+    def __init__(self, root: str, timeout: float = 30.0):
+        self.root = root
+        self.timeout = timeout
+        self.shared_hits = 0
+        self.timeouts = 0
+        # Criado no import do app: com preload, herdado por todos os workers
+        self.boot_dir = os.path.join(root, f"{os.getpid()}-{int(time.time())}")
+        # Respostas e bytes gravados por este processo em cada versão
+        self._written: Dict[str, int] = {}
+        self._written_bytes: Dict[str, int] = {}
+        self._lock = threading.Lock()
+        self._remove_dead_boots()
+
+    @property
+    def enabled(self) -> bool:
+        return fcntl is not None
+
+    def _remove_dead_boots(self) -> None:
+        """Apaga diretórios de masters que já terminaram"""
+        try:
+            entries = os.listdir(self.root)
+        except OSError:
+            return
+        for entry in entries:
+            pid, _, _ = entry.partition("-")
+            if pid.isdigit() and int(pid) != os.getpid() and not _pid_alive(int(pid)):
+                shutil.rmtree(os.path.join(self.root, entry), ignore_errors=True)
+
+    def _version_dir(self, version: str) -> str:
+        path = os.path.join(self.boot_dir, version)
+        if version in self._written:
+            return path
+        with self._lock:
+            os.makedirs(path, exist_ok=True)
+            self._written.setdefault(version, 0)
+            # Versões mais antigas que as KEEP_VERSIONS mais recentes
+            entries = [os.path.join(self.boot_dir, e) for e in os.listdir(self.boot_dir)]
+            entries.sort(key=lambda p: os.stat(p).st_mtime if os.path.exists(p) else 0)
+            for old in entries[:-KEEP_VERSIONS]:
+                if old != path:
+                    shutil.rmtree(old, ignore_errors=True)
+        return path
+
+    @staticmethod
+    def _read(path: str) -> Optional[Rendered]:
+        try:
+            with open(path, "rb") as f:
+                raw = f.read()
+        except OSError:
+            return None
+        status, _, body = raw.partition(b"\n")
+        return body, int(status)
+
+    def _acquire(self, fd: int) -> bool:
+        deadline = time.monotonic() + self.timeout
+        while True:
+            try:
+                fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                return True
+            except BlockingIOError:
+                if time.monotonic() >= deadline:
+                    return False
+                time.sleep(_POLL_SECONDS)
+
+    def run(self, version: str, key: str, compute: Callable[[], Rendered]) -> Rendered:
+        """
+        Resultado de compute() para (versão, chave), calculado por um só processo
+
+        Erros (status >= 500) não são gravados: cada processo recalcula.
+        """
+        if not self.enabled:
+            return compute()
+        digest = hashlib.sha256(key.encode("utf-8")).hexdigest()[:32]
+        try:
+            base = os.path.join(self._version_dir(version), digest)
+            done = self._read(base + ".out")
+            if done is not None:
+                self.shared_hits += 1
+                return done
+            fd = os.open(base + ".lock", os.O_RDWR | os.O_CREAT, 0o644)
+        except OSError as e:
+            print(f"Erro no single-flight em disco: {e}")
+            return compute()
+
+        try:
+            if not self._acquire(fd):
+                self.timeouts += 1
+                return compute()
+            # Quem segurava o lock pode ter acabado de gravar o resultado
+            done = self._read(base + ".out")
+            if done is not None:
+                self.shared_hits += 1
+                return done
+            body, status = compute()
+            written_bytes = self._written_bytes.get(version, 0) + len(body)
+            if (
+                status < 500
+                and self._written.get(version, 0) < MAX_ENTRIES
+                and written_bytes <= MAX_BYTES
+            ):
+                self._written[version] = self._written.get(version, 0) + 1
+                self._written_bytes[version] = written_bytes
+                try:
+                    tmp = f"{base}.{os.getpid()}.{threading.get_ident()}.tmp"
+                    with open(tmp, "wb") as f:
+                        f.write(b"%d\n" % status + body)
+                    os.replace(tmp, base + ".out")
+                except OSError as e:
+                    print(f"Erro ao gravar resposta compartilhada: {e}")
+            return body, status
+        finally:
+            # Fechar o descritor libera o flock
+            os.close(fd)
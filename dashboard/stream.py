@@ -0,0 +1,117 @@
+"""
+Server-Sent Events com a versão dos dados
+Cada snapshot novo é publicado uma única vez (mensagens já serializadas) e
+repassado a todos os clientes conectados ao /api/stream, que só refazem as
+requisições quando a versão muda em vez de fazer polling
+"""
+
+import threading
+import time
+from typing import Callable, Iterator, Optional, Tuple
+
+
+def format_event(event: str, event_id: str, data: bytes) -> bytes:
+    """Mensagem SSE; `data` precisa ser JSON compacto (uma linha)"""
+    return (
+        f"id: {event_id}\nevent: {event}\n".encode("utf-8")
+        + b"data: "
+        + data
+        + b"\n\n"
+    )
+
+
+class StreamSlots:
+    """
+    Limite de conexões SSE abertas ao mesmo tempo neste processo
+
+    Nos workers gthread (e no adaptador ASGI) cada conexão ocupa uma thread
+    até STREAM_MAX_SECONDS; sem limite, poucas abas abertas tomam todas as
+    threads e a API para de responder. Acima do limite o cliente recebe 503 e
+    passa a consultar a versão por polling.
+    """
+
+    def __init__(self, limit: int):
+        self.limit = limit
+        self.active = 0
+        self.rejected = 0
+        self._lock = threading.Lock()
+
+    def acquire(self) -> Optional[Callable[[], None]]:
+        """Reserva uma vaga; retorna a função que a libera (None se lotado)"""
+        with self._lock:
+            if self.active >= self.limit:
+                self.rejected += 1
+                return None
+            self.active += 1
+        released = []
+
+        def release() -> None:
+            with self._lock:
+                # close() pode ser chamado mais de uma vez pelo servidor
+                if not released:
+                    released.append(True)
+                    self.active -= 1
+
+        return release
+
+
+class VersionBroadcaster:
+    """Última versão publicada e espera eficiente por versões novas"""
+
+    def __init__(self):
+        self._cond = threading.Condition()
+        self.version: Optional[str] = None
+        # (mensagem simples, mensagem com as métricas principais)
+        self._messages: Tuple[bytes, bytes] = (b"", b"")
+
+    def publish(self, version: str, message: bytes, message_with_metrics: bytes) -> None:
+        with self._cond:
+            self.version = version
+            self._messages = (message, message_with_metrics)
+            self._cond.notify_all()
+
+    def current(self, include_metrics: bool) -> Tuple[Optional[str], bytes]:
+        with self._cond:
+            return self.version, self._messages[1 if include_metrics else 0]
+
+    def wait(self, known_version: Optional[str], timeout: float) -> bool:
+        """Espera até haver uma versão diferente de known_version (ou timeout)"""
+        with self._cond:
+            return self._cond.wait_for(lambda: self.version != known_version, timeout)
+
+
+def event_stream(
+    broadcaster: VersionBroadcaster,
+    include_metrics: bool,
+    last_event_id: Optional[str],
+    poll: Callable[[], object],
+    keepalive_seconds: float,
+    max_seconds: float,
+    retry_ms: int = 5000,
+) -> Iterator[bytes]:
+    """
+    Corpo de uma resposta text/event-stream
+
+    Envia a versão atual (a menos que o cliente já a tenha, via Last-Event-ID),
+    depois uma mensagem a cada versão nova e comentários de keepalive nos
+    intervalos. A conexão é encerrada após max_seconds; o EventSource do
+    navegador reconecta sozinho.
+
+    Args:
+        poll: chamado a cada keepalive para dar chance de recarga dos dados
+            quando não há watcher em segundo plano
+    """
+    yield f"retry: {retry_ms}\n\n".encode("utf-8")
+    deadline = time.monotonic() + max_seconds
+    sent = last_event_id
+    while True:
+        version, message = broadcaster.current(include_metrics)
+        if version is not None and version != sent:
+            yield message
+            sent = version
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            return
+        if not broadcaster.wait(sent, min(keepalive_seconds, remaining)):
+            poll()
+            yield b": keepalive\n\n"
@@ -0,0 +1,274 @@
+"""
+Métricas internas da API no formato texto do Prometheus
+Contadores e histogramas em memória (por processo), atualizados no caminho
+das requisições com um lock curto por métrica, e gauges calculados na hora
+da coleta. Exposto pela rota /api/metrics/internal do app, que exige
+INTERNAL_METRICS_TOKEN ou, sem token configurado, uma conexão local
+"""
+
+import os
+import resource
+import threading
+import time
+from bisect import bisect_left
+from typing import Callable, Dict, Iterable, List, Sequence, Tuple
+
+from flask import Flask, Response, g, request
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304)
+
+LabelValues = Tuple[str, ...]
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(names: Sequence[str], values: Sequence[str]) -> str:
+    if not names:
+        return ""
+    pairs = ",".join(f'{n}="{_escape(str(v))}"' for n, v in zip(names, values))
+    return "{" + pairs + "}"
+
+
+def _number(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Metric:
+    kind = "untyped"
+
+    def __init__(self, name: str, documentation: str, labels: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.label_names = tuple(labels)
+        self._lock = threading.Lock()
+
+    def header(self) -> List[str]:
+        return [
+            f"# HELP {self.name} {self.documentation}",
+            f"# TYPE {self.name} {self.kind}",
+        ]
+
+    def render(self) -> List[str]:
+        raise NotImplementedError
+
+
+class Counter(Metric):
+    kind = "counter"
+
+    def __init__(self, name: str, documentation: str, labels: Sequence[str] = ()):
+        super().__init__(name, documentation, labels)
+        self._values: Dict[LabelValues, float] = {}
+
+    def inc(self, *labels: str, amount: float = 1) -> None:
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0) + amount
+
+    def value(self, *labels: str) -> float:
+        return self._values.get(labels, 0)
+
+    def render(self) -> List[str]:
+        with self._lock:
+            items = sorted(self._values.items())
+        return self.header() + [
+            f"{self.name}{_labels(self.label_names, k)} {_number(v)}" for k, v in items
+        ]
+
+
+class Histogram(Metric):
+    kind = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        buckets: Sequence[float],
+        labels: Sequence[str] = (),
+    ):
+        super().__init__(name, documentation, labels)
+        self.buckets = tuple(buckets)
+        # Por combinação de labels: [contagem por bucket (não cumulativa), soma, total]
+        self._series: Dict[LabelValues, list] = {}
+
+    def observe(self, value: float, *labels: str) -> None:
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(labels)
+            if series is None:
+                series = self._series[labels] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            series[0][index] += 1
+            series[1] += value
+            series[2] += 1
+
+    def render(self) -> List[str]:
+        with self._lock:
+            items = sorted((k, (list(v[0]), v[1], v[2])) for k, v in self._series.items())
+        lines = self.header()
+        names = self.label_names + ("le",)
+        for labels, (counts, total, count) in items:
+            cumulative = 0
+            for bound, n in zip(self.buckets + (float("inf"),), counts):
+                cumulative += n
+                le = _labels(names, labels + (_number(bound),))
+                lines.append(f"{self.name}_bucket{le} {cumulative}")
+            base = _labels(self.label_names, labels)
+            lines.append(f"{self.name}_sum{base} {_number(total)}")
+            lines.append(f"{self.name}_count{base} {count}")
+        return lines
+
+
+class Gauge(Metric):
+    """Gauge calculado na coleta: `collect` devolve pares (labels, valor)"""
+
+    kind = "gauge"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        collect: Callable[[], Iterable[Tuple[LabelValues, float]]],
+        labels: Sequence[str] = (),
+    ):
+        super().__init__(name, documentation, labels)
+        self.collect = collect
+
+    def render(self) -> List[str]:
+        return self.header() + [
+            f"{self.name}{_labels(self.label_names, k)} {_number(v)}"
+            for k, v in self.collect()
+        ]
+
+
+class CounterFunc(Gauge):
+    """Contador mantido por outro componente, lido na coleta"""
+
+    kind = "counter"
+
+
+class Registry:
+    def __init__(self):
+        self.metrics: List[Metric] = []
+
+    def register(self, metric: Metric) -> Metric:
+        self.metrics.append(metric)
+        return metric
+
+    def render(self) -> str:
+        lines: List[str] = []
+        for metric in self.metrics:
+            try:
+                lines.extend(metric.render())
+            except Exception as e:
+                lines.append(f"# erro ao coletar {metric.name}: {_escape(str(e))}")
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = Registry()
+
+REQUEST_LATENCY = REGISTRY.register(
+    Histogram(
+        "dashboard_http_request_duration_seconds",
+        "Tempo de processamento das requisições por rota",
+        LATENCY_BUCKETS,
+        ("route", "method"),
+    )
+)
+RESPONSE_SIZE = REGISTRY.register(
+    Histogram(
+        "dashboard_http_response_size_bytes",
+        "Tamanho do corpo das respostas por rota",
+        SIZE_BUCKETS,
+        ("route",),
+    )
+)
+REQUESTS = REGISTRY.register(
+    Counter(
+        "dashboard_http_requests_total",
+        "Requisições atendidas por rota e status HTTP",
+        ("route", "status"),
+    )
+)
+REQUEST_ERRORS = REGISTRY.register(
+    Counter(
+        "dashboard_http_errors_total",
+        "Respostas 5xx por rota",
+        ("route",),
+    )
+)
+PANEL_ERRORS = REGISTRY.register(
+    Counter(
+        "dashboard_panel_errors_total",
+        "Exceções ao calcular painéis (viram respostas 500)",
+        ("panel",),
+    )
+)
+DATA_LOAD_SECONDS = REGISTRY.register(
+    Histogram(
+        "dashboard_data_load_duration_seconds",
+        "Tempo para reler os arquivos e montar um snapshot novo dos dados",
+        LATENCY_BUCKETS,
+    )
+)
+
+_START_TIME = time.time()
+
+
+def process_rss_bytes() -> int:
+    """Memória residente atual do processo (pico, se /proc não existir)"""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        # ru_maxrss vem em KB no Linux
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+
+REGISTRY.register(
+    Gauge(
+        "process_resident_memory_bytes",
+        "Memória residente do processo em bytes",
+        lambda: [((), process_rss_bytes())],
+    )
+)
+REGISTRY.register(
+    Gauge(
+        "process_start_time_seconds",
+        "Início do processo em segundos desde a epoch",
+        lambda: [((), _START_TIME)],
+    )
+)
+
+
+def init_app(app: Flask, skip_paths: Iterable[str] = ()) -> None:
+    """
+    Mede latência, tamanho e status de todas as requisições do app
+
+    Deve ser registrado antes de qualquer before_request que possa encerrar a
+    requisição cedo (ex.: 304 do http_cache), para que o início seja medido.
+    """
+    skip = set(skip_paths)
+
+    @app.before_request
+    def _start_timer():
+        g.request_start = time.perf_counter()
+
+    @app.after_request
+    def _record(response: Response) -> Response:
+        start = g.get("request_start")
+        if start is None or request.path in skip:
+            return response
+        rule = request.url_rule.rule if request.url_rule else "<unmatched>"
+        status = response.status_code
+        REQUEST_LATENCY.observe(time.perf_counter() - start, rule, request.method)
+        REQUESTS.inc(rule, str(status))
+        if status >= 500:
+            REQUEST_ERRORS.inc(rule)
+        if not response.is_streamed:
+            RESPONSE_SIZE.observe(response.content_length or 0, rule)
+        return response
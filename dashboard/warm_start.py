@@ -0,0 +1,214 @@
+"""
+Estado montado dos dados persistido em disco para partidas a quente
+Depois de montar um snapshot a partir dos JSON, o DataStore grava as colunas
+já convertidas (eixo de datas, matriz do P&L, rollup por banker, colunas do
+NetInflow) em um .npz e um manifest.json com a versão e o hash de cada arquivo
+de origem. Um processo novo (worker, deploy) carrega esse estado em vez de
+parsear os JSON, desde que os hashes ainda batam com os arquivos em disco.
+As últimas diferenças do P&L (?since=) vão junto; um estado de uma versão
+anterior ainda serve de snapshot anterior para a primeira recarga depois de
+um deploy, que assim calcula a diferença em relação a ele.
+
+Layout do diretório:
+    manifest.json        versão, formato, hash dos arquivos, nome do .npz
+    state-<versão>.npz   arrays numéricos + campos de texto em JSON (objects);
+                         células das diferenças concatenadas (diff_rows/diff_dates)
+"""
+
+import json
+import os
+import time
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from dashboard.deltas import PLDiff
+from dashboard.netinflow_store import CATEGORICAL_COLUMNS, Categorical, NetInflowStore
+from dashboard.pl_store import BankerRollup, PLStore
+
+MANIFEST_NAME = "manifest.json"
+# Incrementar quando o layout do .npz mudar (estados antigos são ignorados)
+FORMAT_VERSION = 2
+
+
+@dataclass
+class WarmState:
+    """Stores reconstruídos a partir do estado em disco"""
+
+    version: str
+    # sha256 de cada arquivo de origem (None = arquivo ausente)
+    sources: Dict[str, Optional[str]]
+    pl: PLStore
+    netinflow: NetInflowStore
+    cliente_perfil: List[List[str]]
+    # Momento em que o snapshot gravado foi montado
+    loaded_at: float
+    pl_diffs: Tuple[PLDiff, ...] = ()
+
+
+def _read_manifest(directory: str) -> Optional[Dict[str, Any]]:
+    try:
+        with open(os.path.join(directory, MANIFEST_NAME)) as f:
+            manifest = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if manifest.get("format") != FORMAT_VERSION:
+        return None
+    return manifest
+
+
+def saved_version(directory: str) -> Optional[str]:
+    """Versão dos dados do estado gravado (None se não há estado válido)"""
+    manifest = _read_manifest(directory)
+    return manifest.get("version") if manifest else None
+
+
+def save(
+    directory: str,
+    version: str,
+    sources: Dict[str, Optional[str]],
+    pl: PLStore,
+    netinflow: NetInflowStore,
+    cliente_perfil: List[List[str]],
+    loaded_at: float,
+    pl_diffs: Sequence[PLDiff] = (),
+) -> str:
+    """
+    Grava o estado de uma versão e troca o manifesto atomicamente
+
+    Arquivos temporários levam o pid: workers gravando ao mesmo tempo não se
+    atrapalham, e o último manifesto trocado vence.
+
+    Returns:
+        Caminho do .npz gravado
+    """
+    os.makedirs(directory, exist_ok=True)
+    objects = {
+        "clients": pl.clients.tolist(),
+        "cpfs": pl.cpfs.tolist(),
+        "bankers": pl.bankers.tolist(),
+        "categories": {
+            name: getattr(netinflow, name).categories for name in CATEGORICAL_COLUMNS
+        },
+        "cliente_perfil": cliente_perfil,
+        "diffs": [
+            {
+                "from": d.from_version,
+                "to": d.to_version,
+                "fromLoadedAt": d.from_loaded_at,
+                "toLoadedAt": d.to_loaded_at,
+                # Quantidade de células (None = diferença inutilizável)
+                "cells": None if d.rows is None else len(d.rows),
+            }
+            for d in pl_diffs
+        ],
+    }
+    usable = [d for d in pl_diffs if d.rows is not None]
+    arrays = {
+        "pl_dates": pl.dates,
+        "pl_values": pl.values,
+        "rollup_totals": pl.rollup.totals,
+        "rollup_counts": pl.rollup.counts,
+        "ni_day": netinflow.day,
+        "ni_usd": netinflow.usd,
+        "ni_brl": netinflow.brl,
+        "diff_rows": np.concatenate([d.rows for d in usable] or [np.zeros(0, np.int32)]),
+        "diff_dates": np.concatenate([d.dates for d in usable] or [np.zeros(0, "U10")]),
+        "objects": np.frombuffer(json.dumps(objects).encode("utf-8"), dtype=np.uint8),
+    }
+    for name in CATEGORICAL_COLUMNS:
+        arrays[f"ni_{name}_codes"] = getattr(netinflow, name).codes
+
+    name = f"state-{version}.npz"
+    tmp = os.path.join(directory, f".{name}.{os.getpid()}.tmp")
+    with open(tmp, "wb") as f:
+        np.savez_compressed(f, **arrays)
+    os.replace(tmp, os.path.join(directory, name))
+
+    manifest = {
+        "format": FORMAT_VERSION,
+        "version": version,
+        "sources": sources,
+        "state": name,
+        "loadedAt": loaded_at,
+        "savedAt": time.time(),
+    }
+    tmp = os.path.join(directory, f".{MANIFEST_NAME}.{os.getpid()}.tmp")
+    with open(tmp, "w") as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+    os.replace(tmp, os.path.join(directory, MANIFEST_NAME))
+
+    for entry in os.listdir(directory):
+        if entry.startswith("state-") and entry.endswith(".npz") and entry != name:
+            try:
+                os.remove(os.path.join(directory, entry))
+            except OSError:
+                pass
+    return os.path.join(directory, name)
+
+
+def _diffs(objects: Dict[str, Any], arrays: Dict[str, np.ndarray]) -> Tuple[PLDiff, ...]:
+    diffs = []
+    offset = 0
+    for d in objects["diffs"]:
+        rows = dates = None
+        if d["cells"] is not None:
+            end = offset + d["cells"]
+            rows, dates = arrays["diff_rows"][offset:end], arrays["diff_dates"][offset:end]
+            offset = end
+        diffs.append(
+            PLDiff(d["from"], d["to"], d["fromLoadedAt"], d["toLoadedAt"], rows, dates)
+        )
+    return tuple(diffs)
+
+
+def load(directory: str) -> Optional[WarmState]:
+    """
+    Carrega o estado gravado, qualquer que seja a versão dos arquivos
+
+    O chamador compara WarmState.sources com o hash atual dos arquivos: se
+    batem, o estado é o snapshot atual; se não, é o snapshot anterior.
+
+    Returns:
+        O estado, ou None se não existe ou é de outro formato
+    """
+    manifest = _read_manifest(directory)
+    if manifest is None:
+        return None
+    with np.load(os.path.join(directory, manifest["state"]), allow_pickle=False) as npz:
+        arrays = {key: npz[key] for key in npz.files}
+    objects = json.loads(arrays["objects"].tobytes().decode("utf-8"))
+
+    pl = PLStore(
+        arrays["pl_dates"].tolist(),
+        arrays["pl_values"],
+        objects["clients"],
+        objects["cpfs"],
+        objects["bankers"],
+    )
+    rollup = BankerRollup(arrays["rollup_totals"], arrays["rollup_counts"])
+    if rollup.totals.shape != (len(pl.banker_names), pl.n_dates):
+        return None
+    pl.rollup = rollup
+
+    netinflow = NetInflowStore.from_columns(
+        arrays["ni_day"],
+        arrays["ni_usd"],
+        arrays["ni_brl"],
+        {
+            name: Categorical.from_codes(
+                objects["categories"][name], arrays[f"ni_{name}_codes"]
+            )
+            for name in CATEGORICAL_COLUMNS
+        },
+    )
+    return WarmState(
+        version=manifest["version"],
+        sources=manifest["sources"],
+        pl=pl,
+        netinflow=netinflow,
+        cliente_perfil=objects["cliente_perfil"],
+        loaded_at=manifest["loadedAt"],
+        pl_diffs=_diffs(objects, arrays),
+    )
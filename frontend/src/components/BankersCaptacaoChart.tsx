@@ -3,6 +3,7 @@ import { useEffect, useState } from 'react';
 import { ChevronDown } from 'lucide-react';
 import { useTheme } from '@/contexts/ThemeContext';
 import { fetchAPI } from '@/lib/apiConfig';
+import { useDataVersion } from '@/hooks/use-data-version';
 import { BANKER_COLORS } from '@/lib/colors';
 import { 
   LineChart, 
@@ -36,6 +37,9 @@ interface BankerCaptacaoData {
 
 interface BankersEvolutionChartProps {
   bankerOrder?: string[];
+  // Resposta do endpoint já buscada pela página; null enquanto ela busca,
+  // ausente para o componente buscar sozinho
+  payload?: { success: boolean; data: BankerCaptacaoApiData[] } | null;
 }
 
 interface ChartTooltipPayload {
@@ -44,8 +48,9 @@ interface ChartTooltipPayload {
   color: string;
 }
 
-const BankersCaptacaoChart = ({ bankerOrder }: BankersEvolutionChartProps) => {
+const BankersCaptacaoChart = ({ bankerOrder, payload }: BankersEvolutionChartProps) => {
   const { isDarkMode } = useTheme();
+  const dataVersion = useDataVersion();
   const [data, setData] = useState<BankerCaptacaoData[]>([]);
   const [bankers, setBankers] = useState<string[]>([]);
   const [selectedBankers, setSelectedBankers] = useState<string[]>([]);
@@ -54,16 +59,21 @@ const BankersCaptacaoChart = ({ bankerOrder }: BankersEvolutionChartProps) => {
   const [error, setError] = useState<string | null>(null);
 
   useEffect(() => {
+    // A página ainda está buscando o painel
+    if (payload === null) return;
+
     const fetchData = async () => {
       try {
         setLoading(true);
-        const response = await fetchAPI('/api/bankers/captacao');
-        
-        if (!response.ok) {
-          throw new Error(`Erro: ${response.status}`);
+        // Resposta já buscada pela página (/api/dashboard) ou busca própria
+        let result = payload;
+        if (!result) {
+          const response = await fetchAPI('/api/bankers/captacao');
+          if (!response.ok) {
+            throw new Error(`Erro: ${response.status}`);
+          }
+          result = await response.json();
         }
-
-        const result = await response.json();
         if (result.success && Array.isArray(result.data)) {
           // Formata dados para o gráfico
           const bankerNames = result.data.map((b: BankerCaptacaoApiData) => b.nome);
@@ -128,7 +138,7 @@ const BankersCaptacaoChart = ({ bankerOrder }: BankersEvolutionChartProps) => {
     };
 
     fetchData();
-  }, [bankerOrder]);
+  }, [bankerOrder, dataVersion, payload]);
 
   const CustomTooltip = ({ active, payload, label }: TooltipProps<number, string>) => {
     if (active && payload && payload.length) {
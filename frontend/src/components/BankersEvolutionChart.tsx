@@ -22,9 +22,12 @@ interface BankerCaptacaoData {
 
 interface BankersEvolutionChartProps {
   bankerOrder?: string[];
+  // Resposta do endpoint já buscada pela página; null enquanto ela busca,
+  // ausente para o componente buscar sozinho
+  payload?: { success: boolean; data: any[] } | null;
 }
 
-const BankersEvolutionChart = ({ bankerOrder }: BankersEvolutionChartProps) => {
+const BankersEvolutionChart = ({ bankerOrder, payload }: BankersEvolutionChartProps) => {
   const { isDarkMode } = useTheme();
   const [data, setData] = useState<BankerCaptacaoData[]>([]);
   const [bankers, setBankers] = useState<string[]>([]);
@@ -34,16 +37,21 @@ const BankersEvolutionChart = ({ bankerOrder }: BankersEvolutionChartProps) => {
   const [error, setError] = useState<string | null>(null);
 
   useEffect(() => {
+    // A página ainda está buscando o painel
+    if (payload === null) return;
+
     const fetchData = async () => {
       try {
         setLoading(true);
-        const response = await fetchAPI('/api/bankers/evolution');
-        
-        if (!response.ok) {
-          throw new Error(`Erro: ${response.status}`);
+        // Resposta já buscada pela página (/api/dashboard) ou busca própria
+        let result = payload;
+        if (!result) {
+          const response = await fetchAPI('/api/bankers/evolution');
+          if (!response.ok) {
+            throw new Error(`Erro: ${response.status}`);
+          }
+          result = await response.json();
         }
-
-        const result = await response.json();
         if (result.success && Array.isArray(result.data)) {
           // Formata dados para o gráfico
           const bankerNames = result.data.map(b => b.nome);
@@ -87,7 +95,7 @@ const BankersEvolutionChart = ({ bankerOrder }: BankersEvolutionChartProps) => {
     };
 
     fetchData();
-  }, []);
+  }, [bankerOrder, payload]);
 
   const CustomTooltip = ({ active, payload, label }: any) => {
     if (active && payload && payload.length) {
@@ -23,7 +23,13 @@ interface ChartTooltipPayload {
   date: string;
 }
 
-const CaptacaoEvolutionChart = () => {
+interface CaptacaoEvolutionChartProps {
+  // Resposta do endpoint já buscada pela página; null enquanto ela busca,
+  // ausente para o componente buscar sozinho
+  payload?: { success: boolean; data: EvolutionPoint[]; captacao_total?: number } | null;
+}
+
+const CaptacaoEvolutionChart = ({ payload }: CaptacaoEvolutionChartProps) => {
   const { isDarkMode } = useTheme();
   const [data, setData] = useState<EvolutionPoint[]>([]);
   const [loading, setLoading] = useState(true);
@@ -31,16 +37,21 @@ const CaptacaoEvolutionChart = () => {
   const [captacaoTotal, setCaptacaoTotal] = useState(0);
 
   useEffect(() => {
+    // A página ainda está buscando o painel
+    if (payload === null) return;
+
     const fetchData = async () => {
       try {
         setLoading(true);
-        const response = await fetchAPI('/api/captacao/evolucao');
-        
-        if (!response.ok) {
-          throw new Error(`Erro: ${response.status}`);
+        // Resposta já buscada pela página (/api/dashboard) ou busca própria
+        let result = payload;
+        if (!result) {
+          const response = await fetchAPI('/api/captacao/evolucao');
+          if (!response.ok) {
+            throw new Error(`Erro: ${response.status}`);
+          }
+          result = await response.json();
         }
-
-        const result = await response.json();
         if (result.success && Array.isArray(result.data)) {
           setData(result.data);
           setCaptacaoTotal(result.captacao_total || 0);
@@ -59,7 +70,7 @@ const CaptacaoEvolutionChart = () => {
     };
 
     fetchData();
-  }, []);
+  }, [payload]);
 
   const CustomTooltip = ({ active, payload }: TooltipProps<number, string>) => {
     if (active && payload && payload[0]) {
@@ -3,6 +3,7 @@ import { TrendingUp, TrendingDown, MoreHorizontal } from 'lucide-react';
 import { useEffect, useState } from 'react';
 import { useTheme } from '@/contexts/ThemeContext';
 import { fetchAPI } from '@/lib/apiConfig';
+import { useDataVersion } from '@/hooks/use-data-version';
 
 interface ClientData {
   nome: string;
@@ -36,25 +37,37 @@ const allocationColors: Record<string, string> = {
   'Conservador PF': 'bg-green-500/20 text-green-400 border-green-500/30',
 };
 
-const ClientsTable = () => {
+interface ClientsTableProps {
+  // Resposta do endpoint já buscada pela página; null enquanto ela busca,
+  // ausente para o componente buscar sozinho
+  payload?: { success: boolean; data: ClientData[]; lastDate: string } | null;
+}
+
+const ClientsTable = ({ payload }: ClientsTableProps) => {
   const { isDarkMode } = useTheme();
+  const dataVersion = useDataVersion();
   const [clients, setClients] = useState<ClientData[]>([]);
   const [loading, setLoading] = useState(true);
   const [error, setError] = useState<string | null>(null);
   const [lastDate, setLastDate] = useState<string>('');
 
   useEffect(() => {
+    // A página ainda está buscando o painel
+    if (payload === null) return;
+
     const fetchClients = async () => {
       try {
         setLoading(true);
-        const response = await fetchAPI('/api/clients/pl');
-        
-        if (!response.ok) {
-          throw new Error(`Erro: ${response.status}`);
+        // Resposta já buscada pela página (/api/dashboard) ou busca própria
+        let result = payload;
+        if (!result) {
+          const response = await fetchAPI('/api/clients/pl');
+          if (!response.ok) {
+            throw new Error(`Erro: ${response.status}`);
+          }
+          result = await response.json();
         }
 
-        const result = await response.json();
-
         if (result.success && Array.isArray(result.data)) {
           setClients(result.data);
           setLastDate(result.lastDate);
@@ -73,7 +86,7 @@ const ClientsTable = () => {
     };
 
     fetchClients();
-  }, []);
+  }, [dataVersion, payload]);
   return (
     <motion.div
       initial={{ opacity: 0, y: 20 }}
@@ -12,6 +12,7 @@ import {
 } from 'recharts';
 
 import { fetchAPI } from '@/lib/apiConfig';
+import { useDataVersion } from '@/hooks/use-data-version';
 
 interface ChartData {
   date: string;
@@ -40,26 +41,35 @@ const CustomTooltip = ({ active, payload, label, isDarkMode }: any) => {
 
 interface EvolutionChartProps {
   clientName: string;
+  // Resposta do endpoint já buscada pela página; null enquanto ela busca,
+  // ausente para o componente buscar sozinho
+  payload?: { success: boolean; data: ChartData[] } | null;
 }
 
-const EvolutionChart = ({ clientName }: EvolutionChartProps) => {
+const EvolutionChart = ({ clientName, payload }: EvolutionChartProps) => {
   const { isDarkMode } = useTheme();
+  const dataVersion = useDataVersion();
   const [data, setData] = useState<ChartData[]>([]);
   const [loading, setLoading] = useState(true);
   const [error, setError] = useState<string | null>(null);
 
   useEffect(() => {
+    // A página ainda está buscando o painel
+    if (payload === null) return;
+
     const fetchData = async () => {
       try {
         setLoading(true);
-        const response = await fetchAPI('/api/pl/total');
-        
-        if (!response.ok) {
-          throw new Error(`Erro: ${response.status}`);
+        // Resposta já buscada pela página (/api/dashboard) ou busca própria
+        let result = payload;
+        if (!result) {
+          const response = await fetchAPI('/api/pl/total');
+          if (!response.ok) {
+            throw new Error(`Erro: ${response.status}`);
+          }
+          result = await response.json();
         }
 
-        const result = await response.json();
-
         if (result.success && Array.isArray(result.data)) {
           // Filtra APENAS dados de 2025-12-01 em diante e soma 1 dia em cada data
           const filtered = result.data
@@ -96,7 +106,7 @@ const EvolutionChart = ({ clientName }: EvolutionChartProps) => {
     };
 
     fetchData();
-  }, []);
+  }, [dataVersion, payload]);
 
   return (
     <motion.div
@@ -0,0 +1,84 @@
+import * as React from "react";
+import { API_URL } from "@/lib/apiConfig";
+
+// Uma única conexão SSE com /api/stream, compartilhada por todos os componentes.
+// Se o servidor recusar a conexão (503: limite de streams abertos), a versão
+// passa a ser consultada em /api/health por polling
+let source: EventSource | null = null;
+let pollTimer: ReturnType<typeof setInterval> | null = null;
+let currentVersion: string | null = null;
+const listeners = new Set<(version: string) => void>();
+
+const POLL_INTERVAL_MS = 60_000;
+
+function receive(version: string | null) {
+  if (!version) return;
+  const previous = currentVersion;
+  currentVersion = version;
+  // As respostas da API são no-cache (sempre revalidadas com o servidor), então
+  // a primeira versão recebida é a que os componentes acabaram de carregar
+  if (previous !== null && previous !== version) {
+    listeners.forEach((notify) => notify(version));
+  }
+}
+
+async function pollVersion() {
+  try {
+    const response = await fetch(`${API_URL}/api/health`, { cache: "no-store" });
+    if (response.ok) {
+      const health = await response.json();
+      receive(health.data?.version ?? null);
+    }
+  } catch {
+    // Tenta de novo no próximo intervalo
+  }
+}
+
+function startPolling() {
+  if (pollTimer) return;
+  pollVersion();
+  pollTimer = setInterval(pollVersion, POLL_INTERVAL_MS);
+}
+
+function subscribe(listener: (version: string) => void) {
+  listeners.add(listener);
+  if (!source && !pollTimer) {
+    if (typeof EventSource === "undefined") {
+      startPolling();
+    } else {
+      source = new EventSource(`${API_URL}/api/stream`);
+      source.addEventListener("version", (event) => {
+        receive(JSON.parse((event as MessageEvent).data).version);
+      });
+      source.addEventListener("error", () => {
+        // Erros de rede reconectam sozinhos; uma resposta HTTP de erro fecha
+        if (source && source.readyState === EventSource.CLOSED) {
+          source = null;
+          startPolling();
+        }
+      });
+    }
+  }
+  return () => {
+    listeners.delete(listener);
+    if (listeners.size === 0) {
+      source?.close();
+      source = null;
+      if (pollTimer) clearInterval(pollTimer);
+      pollTimer = null;
+    }
+  };
+}
+
+/**
+ * Versão atual dos dados do backend, atualizada por Server-Sent Events.
+ * Use como dependência de um useEffect para recarregar quando o pipeline
+ * publicar dados novos, sem polling.
+ */
+export function useDataVersion() {
+  const [version, setVersion] = React.useState<string | null>(null);
+
+  React.useEffect(() => subscribe(setVersion), []);
+
+  return version;
+}
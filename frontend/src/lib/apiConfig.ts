@@ -3,8 +3,22 @@
 
 export const API_URL = import.meta.env.VITE_API_URL || 'http://localhost:5000';
 
-export const fetchAPI = async (endpoint: string) => {
-  const url = `${API_URL}${endpoint}?t=${Date.now()}`;
+// Responses carry an ETag tied to the data version, so the browser cache
+// revalidates them (304) instead of busting the cache on every request
+export const fetchAPI = async (endpoint: string, init?: RequestInit) => {
+  const url = `${API_URL}${endpoint}`;
   console.log(`Fetching from: ${url}`);
-  return fetch(url);
+  return fetch(url, init);
+};
+
+// Several panels in one request (/api/dashboard): one data pass on the server
+// and one round trip. Each entry has the same body as the panel's own endpoint
+// (e.g. panels.pl_total is the /api/pl/total response)
+export const fetchPanels = async (panels: string[], init?: RequestInit) => {
+  const response = await fetchAPI(`/api/dashboard?panels=${panels.join(',')}`, init);
+  if (!response.ok) {
+    throw new Error(`Erro: ${response.status}`);
+  }
+  const result = await response.json();
+  return result.panels as Record<string, any>;
 };
@@ -1,6 +1,7 @@
 import { motion, AnimatePresence } from 'framer-motion';
 import { useEffect, useState } from 'react';
-import { fetchAPI } from '@/lib/apiConfig';
+import { fetchPanels } from '@/lib/apiConfig';
+import { useDataVersion } from '@/hooks/use-data-version';
 import BankersEvolutionChart from '../components/BankersEvolutionChart';
 import BankerCard from '../components/BankerCard';
 import BankersCaptacaoChart from '../components/BankersCaptacaoChart';
@@ -29,6 +30,9 @@ interface BankerPL {
 }
 
 const Bankers = () => {
+  const dataVersion = useDataVersion();
+  // Respostas dos painéis, repassadas aos gráficos (que não buscam de novo)
+  const [panels, setPanels] = useState<Record<string, any> | null>(null);
   const [bankersCaptacao, setBankersCaptacao] = useState<BankerCaptacao[]>([]);
   const [bankersPL, setBankersPL] = useState<BankerPL[]>([]);
   const [allBankersInOrder, setAllBankersInOrder] = useState<string[]>([]);
@@ -39,20 +43,11 @@ const Bankers = () => {
   useEffect(() => {
     const fetchBankers = async () => {
       try {
-        setLoading(true);
-        
-        // Fetch ambos os endpoints em paralelo
-        const [captacaoRes, plRes] = await Promise.all([
-          fetchAPI('/api/bankers/captacao'),
-          fetchAPI('/api/bankers/evolution')
-        ]);
-        
-        if (!captacaoRes.ok || !plRes.ok) {
-          throw new Error(`Erro ao carregar dados`);
-        }
-
-        const captacaoResult = await captacaoRes.json();
-        const plResult = await plRes.json();
+        // Busca os dois painéis em uma única requisição; com dados novos
+        // (dataVersion) recarrega sem voltar para a tela de carregamento
+        const result = await fetchPanels(['bankers_captacao', 'bankers_evolution']);
+        const captacaoResult = result.bankers_captacao;
+        const plResult = result.bankers_evolution;
         
         if (captacaoResult.success && Array.isArray(captacaoResult.data) &&
             plResult.success && Array.isArray(plResult.data)) {
@@ -71,7 +66,8 @@ const Bankers = () => {
           // Ordena bankers por P&L final decrescente
           const sortedPL = [...plResult.data].sort((a, b) => b.pl_final - a.pl_final);
           setBankersPL(sortedPL);
-          
+
+          setPanels(result);
           setError(null);
         } else {
           throw new Error('Formato inválido da API');
@@ -88,7 +84,7 @@ const Bankers = () => {
     };
 
     fetchBankers();
-  }, []);
+  }, [dataVersion]);
 
   if (loading) {
     return (
@@ -168,7 +164,10 @@ const Bankers = () => {
             className="space-y-6"
           >
             {/* Gráfico Grande de Captação */}
-            <BankersCaptacaoChart bankerOrder={allBankersInOrder} />
+            <BankersCaptacaoChart
+              bankerOrder={allBankersInOrder}
+              payload={panels?.bankers_captacao}
+            />
           </motion.div>
         ) : (
           <motion.div
@@ -180,7 +179,10 @@ const Bankers = () => {
             className="space-y-6"
           >
             {/* Gráfico Grande de P&L */}
-            <BankersEvolutionChart bankerOrder={allBankersInOrder} />
+            <BankersEvolutionChart
+              bankerOrder={allBankersInOrder}
+              payload={panels?.bankers_evolution}
+            />
 
             {/* Cards de P&L por Banker */}
             <motion.div
@@ -1,6 +1,7 @@
 import { useState, useEffect } from 'react';
 import { Users, DollarSign, TrendingUp, Briefcase } from 'lucide-react';
-import { fetchAPI } from '@/lib/apiConfig';
+import { fetchPanels } from '@/lib/apiConfig';
+import { useDataVersion } from '@/hooks/use-data-version';
 import AnimatedBackground from '@/components/AnimatedBackground';
 import Sidebar from '@/components/Sidebar';
 import Header from '@/components/Header';
@@ -27,27 +28,39 @@ interface Metrics {
 
 const Index = () => {
   const [activeTab, setActiveTab] = useState('dashboard');
+  const dataVersion = useDataVersion();
   const [metrics, setMetrics] = useState<Metrics | null>(null);
+  // Respostas dos painéis do dashboard, repassadas aos gráficos e à tabela;
+  // null enquanto a requisição está em andamento
+  const [panels, setPanels] = useState<Record<string, any> | null>(null);
   const [loading, setLoading] = useState(true);
   const [isSettingsOpen, setIsSettingsOpen] = useState(false);
 
   useEffect(() => {
-    const fetchMetrics = async () => {
+    const fetchDashboard = async () => {
       try {
-        const response = await fetchAPI('/api/metrics');
-        const result = await response.json();
-        if (result.success) {
-          setMetrics(result.metrics);
+        // Métricas, gráficos e tabela em uma única requisição
+        const result = await fetchPanels([
+          'metrics',
+          'pl_total',
+          'captacao_evolucao',
+          'clients_pl',
+        ]);
+        if (result.metrics?.success) {
+          setMetrics(result.metrics.metrics);
         }
+        setPanels(result);
       } catch (err) {
-        console.error('Erro ao carregar métricas:', err);
+        console.error('Erro ao carregar o dashboard:', err);
+        // Sem o lote, cada componente busca o seu endpoint
+        setPanels({});
       } finally {
         setLoading(false);
       }
     };
 
-    fetchMetrics();
-  }, []);
+    fetchDashboard();
+  }, [dataVersion]);
 
   const formatCurrency = (value: number | undefined) => {
     if (value === undefined || value === null) return '$0';
@@ -122,7 +135,7 @@ const Index = () => {
         {/* Charts Row 1 - Only visible on dashboard tab */}
         {activeTab === 'dashboard' && (
         <div className="grid grid-cols-1 gap-6 mb-6">
-          <EvolutionChart clientName="Todos os Clientes" />
+          <EvolutionChart clientName="Todos os Clientes" payload={panels && panels.pl_total} />
         </div>
         )}
 
@@ -130,7 +143,7 @@ const Index = () => {
         {activeTab === 'dashboard' && (
         <div className="grid grid-cols-1 lg:grid-cols-3 gap-6 mb-6">
           <div className="lg:col-span-2">
-            <CaptacaoEvolutionChart />
+            <CaptacaoEvolutionChart payload={panels && panels.captacao_evolucao} />
           </div>
           <AllocationPieChart />
         </div>
@@ -140,7 +153,7 @@ const Index = () => {
         {activeTab === 'dashboard' && (
           <>
             {/* Clients Table */}
-            <ClientsTable />
+            <ClientsTable payload={panels && panels.clients_pl} />
           </>
         )}
 
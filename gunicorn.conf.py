@@ -0,0 +1,124 @@
+"""
+Configuração do gunicorn para produção
+
+O app é carregado no master (preload_app) e os dados são lidos, indexados e
+pré-renderizados antes do fork; em seguida o gc é congelado para que os
+workers compartilhem essas páginas copy-on-write em vez de cada um manter a
+sua cópia.
+
+Os dados novos também são carregados só no master: o watcher roda nele e, a
+cada snapshot novo, o master recongela o gc e recebe um HUP, que cria
+workers novos a partir do snapshot atual e encerra os antigos depois das
+requisições em andamento (até graceful_timeout). Os workers não recarregam
+por conta própria (DataStore.pin), então a memória continua sendo uma cópia
+dos dados mais o que cada worker calcula depois do fork.
+
+Variáveis de ambiente:
+    PORT: porta HTTP (padrão 5000)
+    WEB_CONCURRENCY: número de workers (padrão: CPUs disponíveis, o menor
+        entre a afinidade do processo e a cota de CPU do cgroup)
+    GUNICORN_THREADS: threads por worker; acima de 1 usa o worker gthread,
+        com as threads compartilhando o snapshot dos dados (padrão 4). Cada
+        conexão aberta no /api/stream ocupa uma thread; acima de
+        STREAM_MAX_CONNECTIONS por worker (padrão: metade das threads) o
+        stream responde 503 e o frontend passa a fazer polling
+    GUNICORN_TIMEOUT: timeout dos workers em segundos (padrão 60)
+    DATA_WATCH_INTERVAL: intervalo do watcher de dados do master em segundos
+        (padrão 5; 0 desliga, e os dados só mudam com um restart)
+    WARM_START_DIR: estado montado dos dados gravado pelo app; com ele o master
+        parte do .npz em vez de parsear os JSON e as diferenças do P&L (?since=)
+        sobrevivem ao deploy. Desligado por padrão; usar um diretório fora do
+        repositório que persista entre deploys (ex.: volume do Railway)
+"""
+
+import gc
+import math
+import os
+import signal
+from typing import Optional
+
+
+def _cgroup_cpu_limit() -> Optional[float]:
+    """
+    CPUs permitidas pela cota do CFS do cgroup (None se não há cota)
+
+    Containers (Railway, Docker com --cpus) limitam CPU por cota de tempo,
+    não por afinidade: o processo enxerga todos os núcleos do host.
+    """
+    try:
+        # cgroup v2: "<cota> <período>" ou "max <período>"
+        with open("/sys/fs/cgroup/cpu.max") as f:
+            quota, period = f.read().split()[:2]
+        if quota != "max":
+            return int(quota) / int(period)
+        return None
+    except (OSError, ValueError):
+        pass
+    try:
+        # cgroup v1: cota -1 = sem limite
+        with open("/sys/fs/cgroup/cpu/cpu.cfs_quota_us") as f:
+            quota = int(f.read())
+        with open("/sys/fs/cgroup/cpu/cpu.cfs_period_us") as f:
+            period = int(f.read())
+    except (OSError, ValueError):
+        return None
+    return quota / period if quota > 0 and period > 0 else None
+
+
+def _cpu_count() -> int:
+    try:
+        # Núcleos em que o processo pode rodar (taskset/cpuset)
+        count = len(os.sched_getaffinity(0))
+    except AttributeError:
+        count = os.cpu_count() or 1
+    limit = _cgroup_cpu_limit()
+    if limit is not None:
+        # Cota de 1,5 CPU comporta 2 workers; nunca menos de 1
+        count = min(count, max(1, math.ceil(limit)))
+    return count
+
+
+bind = f"0.0.0.0:{os.getenv('PORT', '5000')}"
+workers = int(os.getenv("WEB_CONCURRENCY", _cpu_count()))
+threads = int(os.getenv("GUNICORN_THREADS", "4"))
+timeout = int(os.getenv("GUNICORN_TIMEOUT", "60"))
+preload_app = True
+
+
+def when_ready(server):
+    """Carrega os dados no master, congela o gc e liga o watcher de dados"""
+    from app import data_store, start_background_reload
+
+    # Os hooks de preparo do app já pré-renderizam os painéis
+    snapshot = data_store.snapshot()
+    server.log.info(
+        "Dados carregados (versão %s%s)",
+        snapshot.version,
+        ", warm start" if snapshot.warm_start else "",
+    )
+
+    # Objetos já existentes saem das gerações do gc: as coletas dos workers
+    # não tocam nos contadores de referência dessas páginas
+    gc.collect()
+    gc.freeze()
+
+    def recycle_workers(snapshot):
+        server.log.info("Dados novos (versão %s), trocando os workers", snapshot.version)
+        # Libera o snapshot anterior (ciclos congelados não são coletados) e
+        # congela o novo antes dos forks
+        gc.unfreeze()
+        gc.collect()
+        gc.freeze()
+        # Com preload_app o HUP mantém o app do master: workers novos herdam o
+        # snapshot atual e os antigos terminam as requisições em andamento
+        os.kill(server.pid, signal.SIGHUP)
+
+    data_store.publish_hooks.append(recycle_workers)
+    start_background_reload()
+
+
+def post_fork(server, worker):
+    """Os workers ficam no snapshot herdado; o master recarrega e os troca"""
+    from app import data_store
+
+    data_store.pin()
@@ -0,0 +1,60 @@
+#!/usr/bin/env python3
+"""
+Testes do limite em bytes do LRUCache (maxbytes/weigh)
+Respostas de janelas arbitrárias não podem crescer o cache sem limite: as
+entradas menos usadas saem até o total caber, e um valor que sozinho passa
+do limite é devolvido sem ser guardado
+
+    python -m pytest -q test_cache.py
+"""
+
+from dashboard.cache import LRUCache
+
+
+def _cache(maxbytes: int = 10) -> LRUCache:
+    return LRUCache(maxsize=100, maxbytes=maxbytes, weigh=len)
+
+
+def test_evicts_least_recently_used_by_bytes():
+    cache = _cache()
+    cache.put("a", b"xxxx")
+    cache.put("b", b"xxxx")
+    assert cache.get("a") == b"xxxx"
+
+    cache.put("c", b"xxxx")
+
+    # "b" era a menos usada
+    assert cache.get("b") is None
+    assert cache.get("a") == cache.get("c") == b"xxxx"
+    assert cache.nbytes == 8
+
+
+def test_oversized_value_is_returned_but_not_stored():
+    cache = _cache()
+    cache.put("a", b"xxxx")
+
+    assert cache.get_or_compute("big", lambda: b"x" * 11) == b"x" * 11
+
+    assert "big" not in cache._data
+    # Não derruba o que já estava guardado
+    assert cache.get("a") == b"xxxx"
+    assert cache.nbytes == 4
+
+
+def test_nbytes_follows_replace_pop_and_clear():
+    cache = _cache()
+    cache.put("a", b"xxxx")
+    cache.put("a", b"xx")
+    assert cache.nbytes == 2
+    cache.put("b", b"xxx")
+    assert cache.pop("a") == b"xx"
+    assert cache.nbytes == 3
+    cache.clear()
+    assert cache.nbytes == 0 and len(cache) == 0
+
+
+def test_without_maxbytes_only_entries_count():
+    cache = LRUCache(maxsize=2)
+    for key in "abc":
+        cache.put(key, b"x" * 1000)
+    assert len(cache) == 2 and cache.get("a") is None
@@ -0,0 +1,184 @@
+#!/usr/bin/env python3
+"""
+Teste de concorrência da API
+Dispara requisições em paralelo (threads e ASGI) contra o mesmo snapshot dos
+dados e confere que toda resposta é idêntica à obtida sequencialmente
+
+    python -m pytest -q test_concurrency.py
+    python test_concurrency.py
+"""
+
+import asyncio
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Tuple
+
+import pytest
+
+from app import app, data_store
+from dashboard import panels
+from dashboard.asgi import WSGIToASGI
+from dashboard.single_flight import SharedRenders, fcntl
+
+ROUTES = [
+    "/api/pl/total",
+    "/api/pl/stats",
+    "/api/clients/pl",
+    "/api/clients/evolution",
+    "/api/bankers/evolution",
+    "/api/bankers/captacao",
+    "/api/captacao/evolucao",
+    "/api/metrics",
+    "/api/dashboard",
+    "/api/pl/total?start=2025-12-15&end=2026-01-10",
+    "/api/bankers/captacao?as_of=2026-01-01",
+    "/api/metrics?start=2025-12-10&end=2026-01-15",
+]
+THREADS = 16
+ROUNDS = 20
+
+
+def _get(path: str) -> Tuple[int, bytes]:
+    with app.test_client() as client:
+        response = client.get(path)
+        return response.status_code, response.data
+
+
+def _expected() -> Dict[str, Tuple[int, bytes]]:
+    """Respostas sequenciais; descarta o contexto depois, para que as
+    requisições paralelas também disputem a construção dos índices e caches"""
+    expected = {path: _get(path) for path in ROUTES}
+    panels._contexts = ()
+    return expected
+
+
+async def _asgi_get(application: WSGIToASGI, path: str) -> Tuple[int, bytes]:
+    route, _, query = path.partition("?")
+    scope = {
+        "type": "http",
+        "http_version": "1.1",
+        "method": "GET",
+        "scheme": "http",
+        "path": route,
+        "root_path": "",
+        "query_string": query.encode(),
+        "headers": [(b"host", b"localhost")],
+        "server": ("localhost", 5000),
+        "client": ("127.0.0.1", 50000),
+    }
+    messages: List[dict] = []
+    requests = [{"type": "http.request", "body": b"", "more_body": False}]
+
+    async def receive():
+        if requests:
+            return requests.pop()
+        # Como um servidor real: depois do corpo, espera até a desconexão
+        await asyncio.Event().wait()
+
+    async def send(message):
+        messages.append(message)
+
+    await application(scope, receive, send)
+    body = b"".join(m.get("body", b"") for m in messages[1:])
+    return messages[0]["status"], body
+
+
+def test_threaded_requests_are_consistent():
+    expected = _expected()
+    version = data_store.snapshot().version
+    paths = ROUTES * ROUNDS
+
+    with ThreadPoolExecutor(max_workers=THREADS) as pool:
+        results = list(pool.map(_get, paths))
+
+    for path, result in zip(paths, results):
+        assert result == expected[path], path
+    assert data_store.snapshot().version == version
+
+
+def test_concurrent_misses_are_coalesced():
+    """Requisições simultâneas da mesma URL calculam o painel uma única vez"""
+    path = "/api/metrics?start=2025-12-10&end=2026-01-15"
+    expected = _expected()[path]
+    builder, default_start = panels.PANELS["metrics"]
+    calls = []
+
+    def slow_builder(ctx, window):
+        calls.append(window)
+        # Segura o cálculo para que as outras threads cheguem durante ele
+        time.sleep(0.2)
+        return builder(ctx, window)
+
+    # Sem o single-flight em disco, que já tem a resposta de _expected()
+    shared = panels.shared_renders
+    panels.shared_renders = None
+    panels.PANELS["metrics"] = (slow_builder, default_start)
+    barrier = threading.Barrier(THREADS)
+
+    def get_together(path: str) -> Tuple[int, bytes]:
+        barrier.wait()
+        return _get(path)
+
+    try:
+        with ThreadPoolExecutor(max_workers=THREADS) as pool:
+            results = list(pool.map(get_together, [path] * THREADS))
+    finally:
+        panels.PANELS["metrics"] = (builder, default_start)
+        panels.shared_renders = shared
+
+    ctx = panels.get_context(data_store.snapshot())
+    assert all(result == expected for result in results)
+    assert len(calls) == 1
+    assert ctx.rendered.misses == 1
+    assert ctx.rendered.coalesced == THREADS - 1
+
+
+@pytest.mark.skipif(not hasattr(os, "fork") or fcntl is None, reason="requer fork e flock")
+def test_shared_renders_compute_once_across_processes(tmp_path):
+    """Processos com a mesma chave esperam o cálculo do primeiro (flock)"""
+    shared = SharedRenders(str(tmp_path), timeout=10)
+    counter = tmp_path / "computed"
+
+    def compute() -> Tuple[bytes, int]:
+        with open(counter, "a") as f:
+            f.write("x")
+        time.sleep(0.3)
+        return b"body", 200
+
+    pids = []
+    for _ in range(4):
+        pid = os.fork()
+        if pid == 0:
+            ok = shared.run("v1", "metrics|window", compute) == (b"body", 200)
+            os._exit(0 if ok else 1)
+        pids.append(pid)
+    statuses = [os.waitpid(pid, 0)[1] for pid in pids]
+
+    assert statuses == [0] * len(pids)
+    assert counter.read_text() == "x"
+
+
+def test_asgi_requests_are_consistent():
+    expected = _expected()
+    application = WSGIToASGI(app, max_threads=THREADS)
+    paths = ROUTES * ROUNDS
+
+    async def fetch_all() -> List[Tuple[int, bytes]]:
+        return await asyncio.gather(*(_asgi_get(application, path) for path in paths))
+
+    try:
+        results = asyncio.run(fetch_all())
+    finally:
+        application.executor.shutdown()
+
+    for path, result in zip(paths, results):
+        assert result == expected[path], path
+
+
+if __name__ == "__main__":
+    test_threaded_requests_are_consistent()
+    test_concurrent_misses_are_coalesced()
+    test_asgi_requests_are_consistent()
+    print(f"OK: {len(ROUTES) * ROUNDS} requisições por modo, respostas consistentes")
@@ -0,0 +1,60 @@
+#!/usr/bin/env python3
+"""
+Testes da rota em lote /api/dashboard
+Cada painel da resposta em lote precisa ser idêntico ao corpo (e ao status)
+da rota individual correspondente, com e sem parâmetros
+
+    python -m pytest -q test_dashboard.py
+"""
+
+import json
+
+import pytest
+
+from app import app
+from dashboard import panels
+
+# Rota individual de cada painel
+PANEL_ROUTES = {
+    "metrics": "/api/metrics",
+    "pl_total": "/api/pl/total",
+    "pl_stats": "/api/pl/stats",
+    "captacao_evolucao": "/api/captacao/evolucao",
+    "bankers_captacao": "/api/bankers/captacao",
+    "bankers_evolution": "/api/bankers/evolution",
+    "clients_pl": "/api/clients/pl",
+    "clients_evolution": "/api/clients/evolution",
+}
+
+
+def test_every_panel_has_a_route():
+    assert set(PANEL_ROUTES) == set(panels.PANELS)
+
+
+@pytest.mark.parametrize(
+    "query",
+    [
+        "",
+        "start=2025-12-15&end=2026-01-10",
+        "as_of=2026-01-01",
+        "granularity=week",
+        "points=20",
+    ],
+)
+def test_panels_match_single_endpoints(query):
+    with app.test_client() as client:
+        batched = client.get(f"/api/dashboard?{query}")
+        assert batched.status_code == 200
+        payload = json.loads(batched.data)
+        assert list(payload["panels"]) == list(panels.PANELS)
+
+        for name, route in PANEL_ROUTES.items():
+            single = client.get(f"{route}?{query}")
+            assert payload["panels"][name] == json.loads(single.data), name
+            assert payload["status"][name] == single.status_code, name
+
+
+def test_selected_panels_in_requested_order():
+    with app.test_client() as client:
+        response = client.get("/api/dashboard?panels=clients_pl,metrics,clients_pl")
+    assert list(json.loads(response.data)["panels"]) == ["clients_pl", "metrics"]
@@ -0,0 +1,153 @@
+#!/usr/bin/env python3
+"""
+Testes das diferenças do P&L (?since=)
+Confere as células que PLDiff.between registra entre dois stores, a resolução
+de changed_cells por versão e por data, e que as diferenças sobrevivem a um
+processo novo via warm start (inclusive quando os arquivos mudaram no deploy)
+
+    python -m pytest -q test_deltas.py
+"""
+
+import json
+from datetime import datetime
+from typing import Any, Dict, List, Set, Tuple
+
+import numpy as np
+
+from dashboard.datastore import DataStore
+from dashboard.deltas import PLDiff, changed_cells
+from dashboard.pl_store import PLStore
+
+Records = List[Dict[str, Any]]
+
+
+def _records() -> Records:
+    return [
+        {"Cliente": "A", "CPF": "1", "Banker": "X", "2026-01-01": 1.0, "2026-01-02": 2.0},
+        {"Cliente": "B", "CPF": "2", "Banker": "Y", "2026-01-01": 3.0, "2026-01-02": None},
+        {"Cliente": "C", "CPF": "3", "Banker": "X", "2026-01-01": 4.0, "2026-01-02": 5.0},
+    ]
+
+
+def _cells(store: PLStore, rows: np.ndarray, cols: np.ndarray) -> Set[Tuple[str, str]]:
+    """(cliente, data) de cada célula"""
+    return {(store.clients[r], store.dates[c]) for r, c in zip(rows.tolist(), cols.tolist())}
+
+
+def _ts(day: str) -> float:
+    return datetime.fromisoformat(day).timestamp()
+
+
+def test_between_records_new_and_changed_cells():
+    old = PLStore.from_records(_records())
+    records = _records()
+    records[0]["2026-01-02"] = 2.5
+    records[1]["2026-01-02"] = 7.0
+    for record in records:
+        record["2026-01-03"] = 1.0
+    new = PLStore.from_records(records)
+
+    diff = PLDiff.between(old, new, "v1", "v2", 1.0, 2.0)
+
+    cells = {(new.clients[r], d) for r, d in zip(diff.rows.tolist(), diff.dates.tolist())}
+    assert cells == {
+        ("A", "2026-01-02"),
+        ("B", "2026-01-02"),
+        ("A", "2026-01-03"),
+        ("B", "2026-01-03"),
+        ("C", "2026-01-03"),
+    }
+    assert (diff.from_version, diff.to_version) == ("v1", "v2")
+
+
+def test_between_same_store_is_empty():
+    store = PLStore.from_records(_records())
+    diff = PLDiff.between(store, PLStore.from_records(_records()), "v1", "v2", 1.0, 2.0)
+    assert diff.rows is not None and len(diff.rows) == 0
+
+
+def test_between_unusable_when_rows_or_dates_change():
+    old = PLStore.from_records(_records())
+    without_client = PLStore.from_records(_records()[:2])
+    without_date = PLStore.from_records(
+        [{k: v for k, v in r.items() if k != "2026-01-01"} for r in _records()]
+    )
+    for new in (without_client, without_date):
+        assert PLDiff.between(old, new, "v1", "v2", 1.0, 2.0).rows is None
+
+
+def test_changed_cells_by_version():
+    s1 = PLStore.from_records(_records())
+    records = _records()
+    records[2]["2026-01-01"] = 9.0
+    s2 = PLStore.from_records(records)
+    records[1]["2026-01-02"] = 6.0
+    s3 = PLStore.from_records(records)
+    diffs = (
+        PLDiff.between(s1, s2, "v1", "v2", 1.0, 2.0),
+        PLDiff.between(s2, s3, "v2", "v3", 2.0, 3.0),
+    )
+
+    assert _cells(s3, *changed_cells(diffs, "v1", "v3", s3)) == {
+        ("C", "2026-01-01"),
+        ("B", "2026-01-02"),
+    }
+    assert _cells(s3, *changed_cells(diffs, "v2", "v3", s3)) == {("B", "2026-01-02")}
+    rows, cols = changed_cells(diffs, "v3", "v3", s3)
+    assert len(rows) == len(cols) == 0
+    # Versão fora do buffer: resposta completa
+    assert changed_cells(diffs, "v0", "v3", s3) is None
+
+
+def test_changed_cells_by_date():
+    s1 = PLStore.from_records(_records())
+    records = _records()
+    records[0]["2026-01-01"] = 1.5
+    for record in records:
+        record["2026-01-03"] = 1.0
+    s2 = PLStore.from_records(records)
+    diffs = (PLDiff.between(s1, s2, "v1", "v2", _ts("2026-01-02"), _ts("2026-01-04")),)
+
+    # Pontos depois de 2026-01-02 mais os reapresentados na recarga de 01-04
+    assert _cells(s2, *changed_cells(diffs, "2026-01-02", "v2", s2)) == {
+        ("A", "2026-01-01"),
+        ("A", "2026-01-03"),
+        ("B", "2026-01-03"),
+        ("C", "2026-01-03"),
+    }
+    # O buffer começa depois da data pedida: resposta completa
+    assert changed_cells(diffs, "2026-01-01", "v2", s2) is None
+
+
+def test_diffs_survive_a_new_process(tmp_path):
+    paths = {name: str(tmp_path / name) for name in ("pl.json", "ni.json", "perfil.txt")}
+    (tmp_path / "ni.json").write_text("[]")
+    (tmp_path / "perfil.txt").write_text("")
+
+    def boot(records: Records) -> DataStore:
+        (tmp_path / "pl.json").write_text(json.dumps(records))
+        store = DataStore(
+            paths["pl.json"],
+            paths["ni.json"],
+            paths["perfil.txt"],
+            diff_history=5,
+            warm_start_dir=str(tmp_path / "warm_start"),
+        )
+        store.reload()
+        return store
+
+    v1 = boot(_records()).snapshot().version
+    # Deploy com dados novos: o estado gravado vira o snapshot anterior
+    records = _records()
+    records[1]["2026-01-02"] = 6.0
+    deployed = boot(records).snapshot()
+    assert not deployed.warm_start
+    cells = changed_cells(deployed.pl_diffs, v1, deployed.version, deployed.pl)
+    assert _cells(deployed.pl, *cells) == {("B", "2026-01-02")}
+
+    # Outro worker com os mesmos arquivos parte do estado, com as diferenças
+    restarted = boot(records).snapshot()
+    assert restarted.warm_start
+    assert restarted.version == deployed.version
+    cells = changed_cells(restarted.pl_diffs, v1, restarted.version, restarted.pl)
+    assert _cells(restarted.pl, *cells) == {("B", "2026-01-02")}
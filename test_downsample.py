@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+"""
+Testes do downsampling LTTB (?points=)
+Compara lttb_mask com uma implementação de referência ponto a ponto do
+algoritmo e confere as garantias usadas pelos gráficos: primeiro e último
+ponto mantidos e exatamente o número de pontos pedido
+
+    python -m pytest -q test_downsample.py
+"""
+
+from typing import List
+
+import numpy as np
+import pytest
+
+from dashboard.downsample import lttb_mask
+
+
+def _reference(x: np.ndarray, y: np.ndarray, threshold: int) -> List[int]:
+    """LTTB clássico (Steinarsson), um bucket e um candidato por vez"""
+    n = len(x)
+    if threshold >= n:
+        return list(range(n))
+    buckets = threshold - 2
+    selected = [0]
+    anchor = 0
+    for i in range(buckets):
+        lo, hi = i * (n - 2) // buckets + 1, (i + 1) * (n - 2) // buckets + 1
+        next_hi = min((i + 2) * (n - 2) // buckets + 1, n)
+        avg_x, avg_y = x[hi:next_hi].mean(), y[hi:next_hi].mean()
+        best, best_area = lo, -1.0
+        for j in range(lo, hi):
+            area = abs(
+                (x[anchor] - avg_x) * (y[j] - y[anchor])
+                - (x[anchor] - x[j]) * (avg_y - y[anchor])
+            )
+            if area > best_area:
+                best, best_area = j, area
+        selected.append(best)
+        anchor = best
+    selected.append(n - 1)
+    return selected
+
+
+@pytest.mark.parametrize(
+    "n, threshold", [(10, 3), (32, 13), (32, 24), (62, 46), (230, 215), (1000, 50), (731, 97)]
+)
+def test_matches_reference(n, threshold):
+    rng = np.random.default_rng(n)
+    x = np.arange(n, dtype=np.float64)
+    y = rng.normal(size=n).cumsum()
+
+    picked = np.flatnonzero(lttb_mask(x, y, threshold)).tolist()
+
+    assert picked == _reference(x, y, threshold)
+    assert len(picked) == threshold
+    assert picked[0] == 0 and picked[-1] == n - 1
+
+
+def test_rows_match_single_series():
+    rng = np.random.default_rng(1)
+    x = np.arange(400, dtype=np.float64)
+    y = rng.normal(size=(5, 400)).cumsum(axis=1)
+
+    mask = lttb_mask(x, y, 40)
+
+    for row in range(len(y)):
+        assert np.array_equal(mask[row], lttb_mask(x, y[row], 40))
+        assert np.flatnonzero(mask[row]).tolist() == _reference(x, y[row], 40)
+
+
+def test_keeps_first_and_last_valid_points():
+    rng = np.random.default_rng(2)
+    y = rng.normal(size=300).cumsum()
+    y[:20] = np.nan
+    y[-15:] = np.nan
+    y[100:130] = np.nan
+
+    picked = np.flatnonzero(lttb_mask(np.arange(300, dtype=np.float64), y, 30))
+
+    assert picked[0] == 20 and picked[-1] == 284
+    assert len(picked) <= 30
+    assert not np.isnan(y[picked]).any()
+
+
+def test_short_series_is_unchanged():
+    y = np.array([1.0, np.nan, 3.0, 4.0])
+    assert lttb_mask(np.arange(4, dtype=np.float64), y, 10).tolist() == [True, False, True, True]
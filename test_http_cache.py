@@ -0,0 +1,60 @@
+#!/usr/bin/env python3
+"""
+Testes do cache HTTP das rotas /api (ETag e Cache-Control)
+Respostas 200 levam ETag e no-cache, If-None-Match correspondente devolve 304
+sem corpo, e rotas de estado do processo ou respostas de erro não são
+cacheadas
+
+    python -m pytest -q test_http_cache.py
+"""
+
+from app import app
+from dashboard.http_cache import compute_etag
+
+
+def test_ok_response_has_etag_and_no_cache():
+    with app.test_client() as client:
+        response = client.get("/api/pl/stats")
+
+    assert response.status_code == 200
+    assert response.headers["ETag"]
+    assert response.headers["Cache-Control"] == "no-cache"
+
+
+def test_matching_if_none_match_returns_304():
+    with app.test_client() as client:
+        etag = client.get("/api/pl/total").headers["ETag"]
+        response = client.get("/api/pl/total", headers={"If-None-Match": etag})
+
+    assert response.status_code == 304
+    assert response.data == b""
+    assert response.headers["ETag"] == etag
+    assert response.headers["Cache-Control"] == "no-cache"
+
+
+def test_stale_etag_returns_full_body():
+    with app.test_client() as client:
+        response = client.get("/api/pl/total", headers={"If-None-Match": '"stale"'})
+
+    assert response.status_code == 200
+    assert response.data
+
+
+def test_etag_depends_on_query_and_version():
+    with app.test_client() as client:
+        default = client.get("/api/pl/total").headers["ETag"]
+        windowed = client.get("/api/pl/total?start=2025-12-15").headers["ETag"]
+    assert default != windowed
+
+    assert compute_etag("v1", "/api/pl/total", b"") != compute_etag("v2", "/api/pl/total", b"")
+
+
+def test_process_routes_and_errors_are_not_cached():
+    with app.test_client() as client:
+        health = client.get("/api/health")
+        error = client.get("/api/dashboard?panels=unknown")
+
+    assert "ETag" not in health.headers and "Cache-Control" not in health.headers
+    assert error.status_code == 400
+    assert "ETag" not in error.headers
+    assert error.headers["Cache-Control"] == "no-store"
@@ -0,0 +1,40 @@
+#!/usr/bin/env python3
+"""
+Testes do acesso a /api/metrics/internal
+Sem INTERNAL_METRICS_TOKEN a rota só atende conexões locais; com o token,
+exige o token (header Authorization ou ?token=) de qualquer origem
+
+    python -m pytest -q test_internal_metrics.py
+"""
+
+import app as app_module
+from app import app
+
+REMOTE = {"REMOTE_ADDR": "203.0.113.7"}
+
+
+def _get(path: str = "/api/metrics/internal", **kwargs):
+    with app.test_client() as client:
+        return client.get(path, **kwargs)
+
+
+def test_without_token_only_local_connections(monkeypatch):
+    monkeypatch.setattr(app_module, "INTERNAL_METRICS_TOKEN", "")
+
+    assert _get(environ_base={"REMOTE_ADDR": "127.0.0.1"}).status_code == 200
+    assert _get(environ_base={"REMOTE_ADDR": "::1"}).status_code == 200
+    response = _get(environ_base=REMOTE)
+    assert response.status_code == 403
+    assert response.get_json()["success"] is False
+
+
+def test_with_token(monkeypatch):
+    monkeypatch.setattr(app_module, "INTERNAL_METRICS_TOKEN", "s3cret")
+
+    assert _get(environ_base=REMOTE).status_code == 401
+    # O token vale também para conexões locais
+    assert _get(environ_base={"REMOTE_ADDR": "127.0.0.1"}).status_code == 401
+    authorized = _get(environ_base=REMOTE, headers={"Authorization": "Bearer s3cret"})
+    assert authorized.status_code == 200
+    assert b"# TYPE" in authorized.data
+    assert _get("/api/metrics/internal?token=s3cret", environ_base=REMOTE).status_code == 200
@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+"""
+Testes de /api/metrics com janela (?start=, ?end=, ?as_of=)
+Sem parâmetros, "Captação do Período" e Top 3 Bankers usam os períodos fixos
+do dashboard; com qualquer data pedida, os dois seguem a janela. Os dados são
+pequenos e montados à mão para que os totais esperados sejam evidentes
+
+    python -m pytest -q test_metrics.py
+"""
+
+import json
+from typing import Any, Dict, List
+
+import pytest
+
+from dashboard.datastore import DataStore
+from dashboard.panels import PanelContext, PanelParams, run_panel
+
+DATES = [
+    "2025-12-01",
+    "2026-01-31",
+    "2026-03-01",
+    "2026-05-31",
+    "2026-08-01",
+    "2026-08-31",
+    "2026-09-30",
+]
+# (data, cliente, USD); saídas (negativas) não contam como captação
+FLOWS = [
+    ("2025-11-15", "A", 100.0),
+    ("2026-01-10", "A", 50.0),
+    ("2026-03-10", "B", 300.0),
+    ("2026-04-01", "B", -80.0),
+    ("2026-08-10", "B", 20.0),
+    ("2026-08-15", "C", 70.0),
+    ("2026-09-10", "C", 1000.0),
+]
+
+
+@pytest.fixture(scope="module")
+def ctx(tmp_path_factory) -> PanelContext:
+    root = tmp_path_factory.mktemp("metrics")
+    # Todos os clientes já estão na carteira inicial (sem aportes de novos)
+    pl: List[Dict[str, Any]] = [
+        {"Cliente": name, "CPF": str(i), "Banker": banker, **{d: 1000.0 for d in DATES}}
+        for i, (name, banker) in enumerate([("A", "X"), ("B", "Y"), ("C", "Z")])
+    ]
+    netinflow = [
+        {
+            "net_inflow.date": day,
+            "net_inflow.client_name": client,
+            "net_inflow.kind": "C" if usd > 0 else "D",
+            "net_inflow.net_inflow_usd": usd,
+            "net_inflow.net_inflow_brl": usd * 5,
+        }
+        for day, client, usd in FLOWS
+    ]
+    (root / "pl.json").write_text(json.dumps(pl))
+    (root / "ni.json").write_text(json.dumps(netinflow))
+    (root / "perfil.txt").write_text("")
+    store = DataStore(str(root / "pl.json"), str(root / "ni.json"), str(root / "perfil.txt"))
+    store.reload()
+    return PanelContext(store.snapshot())
+
+
+def _metrics(ctx: PanelContext, **args: str) -> Dict[str, Any]:
+    payload, status = run_panel("metrics", ctx, PanelParams.from_args(args))
+    assert status == 200, payload
+    return payload["metrics"]
+
+
+def _top(metrics: Dict[str, Any]) -> List[tuple]:
+    return [(b["nome"], b["captacao"]) for b in metrics["top3Bankers"]]
+
+
+def test_default_uses_fixed_periods(ctx):
+    metrics = _metrics(ctx)
+    # Captação de 01/12 a 31/01; ranking desde 01/11
+    assert metrics["captacaoPeriodo"] == 50.0
+    assert _top(metrics) == [("X", 150.0)]
+    assert (metrics["periodoInicio"], metrics["periodoFim"]) == ("2025-12-01", "2026-09-30")
+
+
+def test_start_only_follows_the_window(ctx):
+    metrics = _metrics(ctx, start="2026-03-01")
+    assert metrics["captacaoPeriodo"] == 1390.0
+    assert _top(metrics) == [("Z", 1070.0), ("Y", 320.0)]
+    assert (metrics["periodoInicio"], metrics["periodoFim"]) == ("2026-03-01", "2026-09-30")
+    # Igual a pedir o fim explicitamente
+    assert metrics == _metrics(ctx, start="2026-03-01", end="2026-09-30")
+
+
+def test_start_and_end(ctx):
+    metrics = _metrics(ctx, start="2026-08-01", end="2026-08-31")
+    assert metrics["captacaoPeriodo"] == 90.0
+    assert _top(metrics) == [("Z", 70.0), ("Y", 20.0)]
+    assert (metrics["periodoInicio"], metrics["periodoFim"]) == ("2026-08-01", "2026-08-31")
+
+
+def test_as_of_only(ctx):
+    metrics = _metrics(ctx, as_of="2026-05-31")
+    # Janela a partir do início padrão (01/12) até as_of
+    assert metrics["captacaoPeriodo"] == 350.0
+    assert _top(metrics) == [("Y", 300.0), ("X", 50.0)]
@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+"""
+Testes da reamostragem do P&L em semana, mês e trimestre (?granularity=)
+Compara PLStore.resample com um agrupamento feito com datetime: cada período
+fica com o último valor válido de cada cliente e é rotulado pela última data
+dele presente no eixo
+
+    python -m pytest -q test_resample.py
+"""
+
+from datetime import date, timedelta
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+import pytest
+
+from dashboard.pl_store import PLStore
+from dashboard.resample import period_bounds, period_keys
+
+
+def _period(day: date, granularity: str) -> Tuple[int, int]:
+    if granularity == "week":
+        # Semana começando na segunda-feira
+        monday = day - timedelta(days=day.weekday())
+        return monday.toordinal(), 0
+    if granularity == "month":
+        return day.year, day.month
+    return day.year, (day.month - 1) // 3
+
+
+def _reference(
+    dates: List[str], values: List[List[Optional[float]]], granularity: str
+) -> Tuple[List[str], List[List[Optional[float]]]]:
+    """(rótulos, último valor válido de cada cliente por período)"""
+    labels: List[str] = []
+    rows: List[List[Optional[float]]] = [[] for _ in values]
+    last_key = None
+    for col, day in enumerate(dates):
+        key = _period(date.fromisoformat(day), granularity)
+        if key != last_key:
+            labels.append(day)
+            for row in rows:
+                row.append(None)
+            last_key = key
+        labels[-1] = day
+        for row, series in zip(rows, values):
+            if series[col] is not None:
+                row[-1] = series[col]
+    return labels, rows
+
+
+def _store() -> Tuple[PLStore, List[str], List[List[Optional[float]]]]:
+    rng = np.random.default_rng(7)
+    start = date(2025, 9, 20)
+    # Eixo com buracos (fins de semana e dias sem arquivo)
+    dates = [
+        (start + timedelta(days=i)).isoformat()
+        for i in range(200)
+        if (start + timedelta(days=i)).weekday() < 5 and rng.random() > 0.1
+    ]
+    values: List[List[Optional[float]]] = []
+    for _ in range(6):
+        series = rng.normal(1000, 100, size=len(dates)).round(2).tolist()
+        values.append([v if rng.random() > 0.3 else None for v in series])
+    # Cliente que só aparece no fim e cliente sem nenhum valor
+    values.append([None] * (len(dates) - 3) + [5.0, None, 7.0])
+    values.append([None] * len(dates))
+
+    records: List[Dict[str, Any]] = []
+    for i, series in enumerate(values):
+        record: Dict[str, Any] = {"Cliente": f"C{i}", "CPF": str(i), "Banker": f"B{i % 2}"}
+        record.update(zip(dates, series))
+        records.append(record)
+    return PLStore.from_records(records), dates, values
+
+
+@pytest.mark.parametrize("granularity", ["week", "month", "quarter"])
+def test_last_valid_by_period(granularity):
+    store, dates, values = _store()
+
+    resampled = store.resample(granularity)
+
+    labels, expected = _reference(dates, values, granularity)
+    assert resampled.date_list == labels
+    for row, series in enumerate(expected):
+        got = [None if np.isnan(v) else float(v) for v in resampled.values[row]]
+        assert got == series, f"C{row}"
+
+
+def test_weeks_start_on_monday():
+    # 2026-01-04 é um domingo, 2026-01-05 uma segunda
+    dates = np.array(["2026-01-02", "2026-01-04", "2026-01-05", "2026-01-11", "2026-01-12"])
+    starts, ends = period_bounds(period_keys(dates, "week"))
+    assert starts.tolist() == [0, 2, 4]
+    assert ends.tolist() == [1, 3, 4]
+
+
+def test_day_is_identity():
+    dates = np.array(["2026-01-01", "2026-01-02", "2026-01-05"])
+    starts, ends = period_bounds(period_keys(dates, "day"))
+    assert starts.tolist() == ends.tolist() == [0, 1, 2]
@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+"""
+Testes da rollup por banker (BankerRollup)
+A versão incremental (update) precisa ser idêntica, bit a bit, à rollup
+refeita do zero (build), tanto quando o arquivo novo só acrescenta datas
+quanto quando poucos clientes mudam; e cair para build() quando a mudança
+não permite reaproveitar a anterior
+
+    python -m pytest -q test_rollup.py
+"""
+
+from datetime import date, timedelta
+from typing import Any, Dict, List
+
+import numpy as np
+import pytest
+
+from dashboard.pl_store import BankerRollup, PLStore
+
+Records = List[Dict[str, Any]]
+DATES = [(date(2025, 11, 1) + timedelta(days=i)).isoformat() for i in range(90)]
+
+
+def _records(n_clients: int = 60, n_dates: int = len(DATES)) -> Records:
+    """Mesmos valores nas datas em comum, qualquer que seja n_dates"""
+    rng = np.random.default_rng(3)
+    records = []
+    for i in range(n_clients):
+        record: Dict[str, Any] = {"Cliente": f"C{i}", "CPF": str(i), "Banker": f"B{i % 7}"}
+        # Valores com casas decimais arbitrárias: a ordem da soma importa
+        values = rng.normal(1e5, 3e4, size=len(DATES))
+        missing = rng.random(len(DATES)) < 0.2
+        for day, value, skip in list(zip(DATES, values.tolist(), missing.tolist()))[:n_dates]:
+            record[day] = None if skip else value
+        records.append(record)
+    return records
+
+
+def _assert_same(rollup: BankerRollup, store: PLStore) -> None:
+    expected = BankerRollup.build(store)
+    assert np.array_equal(rollup.totals, expected.totals)
+    assert np.array_equal(rollup.counts, expected.counts)
+    assert np.array_equal(rollup.has_value, expected.has_value)
+
+
+@pytest.fixture
+def builds(monkeypatch) -> List[PLStore]:
+    """Stores passados a BankerRollup.build (fallback de update)"""
+    calls: List[PLStore] = []
+    build = BankerRollup.build.__func__
+
+    def spy(cls, store):
+        calls.append(store)
+        return build(cls, store)
+
+    monkeypatch.setattr(BankerRollup, "build", classmethod(spy))
+    return calls
+
+
+def test_update_with_appended_dates(builds):
+    previous = PLStore.from_records(_records(n_dates=80))
+    previous.rollup = BankerRollup.build(previous)
+    store = PLStore.from_records(_records())
+    builds.clear()
+
+    rollup = BankerRollup.update(previous, store)
+
+    assert builds == []
+    _assert_same(rollup, store)
+
+
+def test_update_with_few_changed_clients(builds):
+    previous = PLStore.from_records(_records())
+    previous.rollup = BankerRollup.build(previous)
+    records = _records()
+    records[4][DATES[10]] = 123.45
+    records[17][DATES[50]] = None
+    records[30][DATES[0]] = 9.5e5
+    store = PLStore.from_records(records)
+    builds.clear()
+
+    rollup = BankerRollup.update(previous, store)
+
+    assert builds == []
+    _assert_same(rollup, store)
+
+
+def test_update_with_changed_clients_and_new_dates(builds):
+    previous = PLStore.from_records(_records(n_dates=85))
+    previous.rollup = BankerRollup.build(previous)
+    records = _records()
+    records[8][DATES[3]] = -42.0
+    store = PLStore.from_records(records)
+    builds.clear()
+
+    rollup = BankerRollup.update(previous, store)
+
+    assert builds == []
+    _assert_same(rollup, store)
+
+
+def test_update_rebuilds_when_rows_change(builds):
+    previous = PLStore.from_records(_records())
+    previous.rollup = BankerRollup.build(previous)
+    store = PLStore.from_records(_records(n_clients=61))
+    builds.clear()
+
+    rollup = BankerRollup.update(previous, store)
+
+    assert builds == [store]
+    _assert_same(rollup, store)
+
+
+def test_update_rebuilds_when_many_clients_change(builds):
+    previous = PLStore.from_records(_records())
+    previous.rollup = BankerRollup.build(previous)
+    records = _records()
+    for record in records[:20]:
+        record[DATES[5]] = 1.0
+    store = PLStore.from_records(records)
+    builds.clear()
+
+    rollup = BankerRollup.update(previous, store)
+
+    assert builds == [store]
+    _assert_same(rollup, store)